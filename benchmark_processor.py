@@ -0,0 +1,719 @@
+#!/usr/bin/env python3
+"""
+Benchmark script for the ticket data processor
+
+Generates synthetic tickets shaped like the ones server.js stores and
+times the processor's analysis paths against each other.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+
+from ticket_processor import (TicketProcessor, TicketAnalyzer, IncrementalTicketAnalyzer, TicketFrame,
+                              DeviceClassifier, TimestampParser, SqliteTicketSource, TicketRecord,
+                              TicketTimeSeries, TicketSnapshot, TicketSearchIndex, TicketDuplicateDetector,
+                              analyze_parallel,
+                              convert_tickets_json, np)
+
+DEVICE_NAMES = [
+    "iPhone 12 Pro", "iPhone 14", "iPad Air (iOS 17)", "Samsung Galaxy S23",
+    "Google Pixel 7 (Android)", "Galaxy Tab S8", "Dell Laptop XPS 13",
+    "HP EliteBook 840", "Lenovo ThinkPad T14", "MacBook Pro 2023",
+    "MacBook Air M2", "Custom Gaming PC", "Office Desktop", "Dell Server Rack",
+    "Surface Pro 9", "Chromebook", "Brother Printer", "Test Device",
+]
+EMAIL_DOMAINS = [
+    "example.com", "company.com", "email.com", "business.org", "gmail.com",
+    "yahoo.com", "outlook.com", "school.edu",
+]
+STATUSES = ['open', 'in-progress', 'resolved', 'closed']
+PRIORITIES = ['low', 'medium', 'high', 'urgent']
+DESCRIPTIONS = [
+    "Screen is cracked and touch is not responsive",
+    "Laptop won't boot up, blue screen error",
+    "Computer keeps freezing when running multiple applications",
+    "Need help setting up email",
+    "Network connectivity issues affecting entire office",
+    "Battery drains within an hour of unplugging",
+]
+
+
+def generate_tickets(count: int, seed: int = 42) -> list:
+    """Generate synthetic tickets matching the server.js ticket schema"""
+    rng = random.Random(seed)
+    start = datetime.datetime(2023, 1, 1, tzinfo=datetime.timezone.utc)
+    tickets = []
+    for i in range(count):
+        created = start + datetime.timedelta(seconds=rng.randint(0, 2 * 365 * 86400),
+                                             milliseconds=rng.randint(0, 999))
+        updated = created + datetime.timedelta(seconds=rng.randint(0, 7 * 86400))
+        user = f"user{rng.randint(0, count // 3 + 1)}"
+        tickets.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "name": f"Customer {i}",
+            "phone": rng.choice(["555-{:03d}-{:04d}", "1-555-{:03d}-{:04d}", "{:03d}-{:04d}"]).format(
+                rng.randint(0, 999), rng.randint(0, 9999)),
+            "email": f"{user}@{rng.choice(EMAIL_DOMAINS)}",
+            "deviceName": rng.choice(DEVICE_NAMES),
+            "description": rng.choice(DESCRIPTIONS),
+            "status": rng.choice(STATUSES),
+            "priority": rng.choice(PRIORITIES),
+            "assignedTo": rng.choice([None, "John Smith", "Jane Doe"]),
+            "notes": [],
+            "createdAt": created.strftime('%Y-%m-%dT%H:%M:%S.') + f"{created.microsecond // 1000:03d}Z",
+            "updatedAt": updated.strftime('%Y-%m-%dT%H:%M:%S.') + f"{updated.microsecond // 1000:03d}Z",
+        })
+    return tickets
+
+
+def _time_call(func, repeat: int = 3) -> float:
+    """Return the best wall-clock time of several runs, in seconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _peak_memory(func) -> int:
+    """Return the peak traced allocation of a single call, in bytes"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark_fused_analysis(sizes: list) -> None:
+    """Compare the four-pass analyzers with the single-pass TicketAnalyzer"""
+    print("\n⚡ Fused analysis vs. per-section passes")
+    print("-" * 50)
+    processor = TicketProcessor()
+
+    for size in sizes:
+        tickets = generate_tickets(size)
+
+        def multi_pass():
+            return {
+                "status_distribution": processor._analyze_status_distribution(tickets),
+                "device_analysis": processor._analyze_devices(tickets),
+                "time_analysis": processor._analyze_time_patterns(tickets),
+                "contact_analysis": processor._analyze_contact_info(tickets),
+            }
+
+        def single_pass():
+            return TicketAnalyzer(device_classifier=processor.device_classifier,
+                                  timestamp_parser=processor.timestamp_parser).add_many(tickets).result()
+
+        expected = multi_pass()
+        actual = single_pass()
+        matches = all(actual[key] == value for key, value in expected.items())
+
+        multi_time = _time_call(multi_pass)
+        single_time = _time_call(single_pass)
+        multi_peak = _peak_memory(multi_pass)
+        single_peak = _peak_memory(single_pass)
+        print(f"  {size:>9,} tickets: multi-pass {multi_time:.3f}s, "
+              f"single-pass {single_time:.3f}s "
+              f"({multi_time / single_time:.2f}x) {'✅' if matches else '❌ MISMATCH'}")
+        print(f"  {'':>9}  peak memory: multi-pass {multi_peak / 1024:,.0f} KiB, "
+              f"single-pass {single_peak / 1024:,.0f} KiB")
+
+
+def benchmark_incremental_analysis(sizes: list) -> None:
+    """Compare a full re-analysis with syncing a small delta"""
+    print("\n🔁 Incremental sync vs. full re-analysis (1% of tickets changed)")
+    print("-" * 50)
+
+    for size in sizes:
+        tickets = generate_tickets(size)
+        analyzer = IncrementalTicketAnalyzer()
+        analyzer.sync(tickets)
+
+        # Touch 1% of tickets, delete a few and add a few new ones
+        rng = random.Random(size)
+        refreshed = [dict(ticket) for ticket in tickets]
+        for index in rng.sample(range(size), max(1, size // 100)):
+            refreshed[index]['status'] = rng.choice(STATUSES)
+            refreshed[index]['updatedAt'] = '2099-01-01T00:00:00.000Z'
+        del refreshed[:max(1, size // 1000)]
+        refreshed.extend(generate_tickets(max(1, size // 1000), seed=size))
+
+        full_time = _time_call(lambda: TicketAnalyzer().add_many(refreshed).result(), repeat=1)
+        start = time.perf_counter()
+        delta = analyzer.sync(refreshed)
+        incremental = analyzer.result()
+        sync_time = time.perf_counter() - start
+
+        expected = TicketAnalyzer().add_many(refreshed).result()
+        matches = incremental["status_distribution"] == expected["status_distribution"]
+        print(f"  {size:>9,} tickets: full {full_time:.3f}s, incremental {sync_time:.3f}s "
+              f"({full_time / sync_time:.1f}x) {delta} {'✅' if matches else '❌ MISMATCH'}")
+
+
+def benchmark_streaming_ingestion(sizes: list) -> None:
+    """Compare json.load of tickets.json with streaming the same file"""
+    print("\n🌊 Streaming ingestion vs. json.load (tickets.json -> analysis)")
+    print("-" * 50)
+    processor = TicketProcessor()
+
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'tickets.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(generate_tickets(size), f, indent=2)
+
+            def load_all():
+                with open(path, 'r', encoding='utf-8') as f:
+                    return TicketAnalyzer().add_many(json.load(f)).result()
+
+            def stream_all():
+                return TicketAnalyzer().add_many(processor.stream_tickets(path)).result()
+
+            matches = load_all() == stream_all()
+            load_time = _time_call(load_all, repeat=1)
+            stream_time = _time_call(stream_all, repeat=1)
+            load_peak = _peak_memory(load_all)
+            stream_peak = _peak_memory(stream_all)
+            print(f"  {size:>9,} tickets: json.load {load_time:.3f}s / {load_peak / 1024 / 1024:,.1f} MiB, "
+                  f"streaming {stream_time:.3f}s / {stream_peak / 1024 / 1024:,.1f} MiB "
+                  f"{'✅' if matches else '❌ MISMATCH'}")
+
+
+def benchmark_columnar_analysis(sizes: list) -> None:
+    """Compare the dict-based analyzer with the numpy TicketFrame"""
+    print("\n🧮 Columnar TicketFrame vs. dict analysis")
+    print("-" * 50)
+    if np is None:
+        print("  ⚠️  numpy is not installed; skipping")
+        return
+
+    for size in sizes:
+        tickets = generate_tickets(size)
+        frame = TicketFrame.from_tickets(tickets)
+        matches = frame.result() == TicketAnalyzer().add_many(tickets).result()
+
+        dict_time = _time_call(lambda: TicketAnalyzer().add_many(tickets).result())
+        build_time = _time_call(lambda: TicketFrame.from_tickets(tickets), repeat=1)
+        frame_time = _time_call(frame.result)
+        print(f"  {size:>9,} tickets: dict {dict_time:.3f}s, frame build {build_time:.3f}s, "
+              f"frame analysis {frame_time:.4f}s ({dict_time / frame_time:.0f}x) "
+              f"{'✅' if matches else '❌ MISMATCH'}")
+
+
+DEVICE_TEMPLATES = [
+    "iPhone {n}", "iPhone {n} Pro Max", "Apple iPhone {n} mini", "iPad Pro {n} (iOS {n})",
+    "Samsung Galaxy S{n}", "samsung galaxy a{n}", "Galaxy Tab S{n}", "Android tablet {n}",
+    "Google Pixel {n} Android", "Dell XPS {n}", "Dell Latitude {n}", "Dell Inspiron {n} laptop",
+    "HP EliteBook {n}", "HP Pavilion {n}", "hp{n} notebook", "Lenovo ThinkPad T{n}",
+    "Lenovo IdeaPad {n}", "MacBook Pro {n}", "MacBook Air M{n}", "Custom Gaming PC {n}",
+    "Office Desktop {n}", "Surface Laptop {n}", "Chromebook {n}", "Brother Printer HL-{n}",
+    "Card reader with chip {n}", "Studio monitor {n}", "PCIe NVMe drive {n}", "BIOS update on desktop {n}",
+]
+
+
+def _legacy_classify_device(device: str) -> tuple:
+    """The original any()-chain classifier, kept as the benchmark baseline"""
+    if any(term in device for term in ['iphone', 'ios']):
+        return 'iPhone', 'Apple'
+    elif any(term in device for term in ['android', 'samsung', 'galaxy']):
+        return 'Android', 'Samsung' if 'samsung' in device else None
+    elif any(term in device for term in ['laptop', 'dell', 'hp', 'lenovo', 'macbook']):
+        for term, brand in [('dell', 'Dell'), ('hp', 'HP'), ('lenovo', 'Lenovo'), ('macbook', 'Apple')]:
+            if term in device:
+                return 'Laptop', brand
+        return 'Laptop', None
+    elif any(term in device for term in ['desktop', 'pc']):
+        return 'Desktop', None
+    return None, None
+
+
+def generate_device_names(count: int, distinct: int = 2000, seed: int = 7) -> list:
+    """Generate a device-name corpus with realistic repetition (Zipf-like)"""
+    rng = random.Random(seed)
+    vocabulary = []
+    for _ in range(distinct):
+        name = rng.choice(DEVICE_TEMPLATES).format(n=rng.randint(1, 20))
+        vocabulary.append(name.upper() if rng.random() < 0.05 else name)
+    weights = [1 / (rank + 1) for rank in range(distinct)]
+    return [name.lower() for name in rng.choices(vocabulary, weights, k=count)]
+
+
+def benchmark_device_classification(sizes: list) -> None:
+    """Compare the any()-chain classifier with the compiled, memoized one"""
+    print("\n📱 Device classification: any() chains vs. compiled rule table")
+    print("-" * 50)
+
+    for size in sizes:
+        names = generate_device_names(size)
+        uncached = DeviceClassifier(cache_size=0)
+        cached = DeviceClassifier()
+
+        legacy_time = _time_call(lambda: [_legacy_classify_device(name) for name in names])
+        compiled_time = _time_call(lambda: [uncached.classify(name) for name in names])
+        cached_time = _time_call(lambda: [cached.classify(name) for name in names])
+        changed = sum(_legacy_classify_device(name) != cached.classify(name) for name in set(names))
+        info = cached.classify.cache_info()
+        print(f"  {size:>9,} names: any() {legacy_time:.3f}s, compiled {compiled_time:.3f}s, "
+              f"compiled+LRU {cached_time:.3f}s ({legacy_time / cached_time:.1f}x)")
+        print(f"  {'':>9}  LRU hit rate {info.hits / (info.hits + info.misses):.1%}, "
+              f"{changed} distinct names reclassified by whole-word matching")
+
+
+def benchmark_timestamp_parsing(sizes: list) -> None:
+    """Compare fromisoformat()+strftime() with the cached fast-path parser"""
+    print("\n🕒 Timestamp parsing: fromisoformat() vs. TimestampParser")
+    print("-" * 50)
+
+    for size in sizes:
+        values = [ticket['createdAt'] for ticket in generate_tickets(size)]
+
+        def general():
+            for value in values:
+                dt = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+                dt.hour, dt.strftime('%A')
+
+        def fast_cold():
+            parse = TimestampParser().parse
+            for value in values:
+                parse(value)
+
+        warm = TimestampParser()
+        fast_cold()
+        for value in values:
+            warm.parse(value)
+
+        def fast_warm():
+            parse = warm.parse
+            for value in values:
+                parse(value)
+
+        general_time = _time_call(general)
+        cold_time = _time_call(fast_cold)
+        warm_time = _time_call(fast_warm)
+        print(f"  {size:>9,} timestamps: fromisoformat {general_time:.3f}s, "
+              f"fast parser {cold_time:.3f}s ({general_time / cold_time:.1f}x), "
+              f"cached {warm_time:.3f}s ({general_time / warm_time:.1f}x)")
+
+
+def benchmark_parallel_analysis(sizes: list) -> None:
+    """Measure how process-parallel analysis scales from 1 to N workers"""
+    print("\n🧵 Parallel analysis: scaling across worker processes")
+    print("-" * 50)
+    cpus = os.cpu_count() or 1
+    worker_counts = sorted({1, cpus} | {2 ** power for power in range(cpus.bit_length()) if 2 ** power <= cpus})
+
+    for size in sizes:
+        tickets = generate_tickets(size)
+        chunk_size = max(1_000, size // (4 * cpus))
+        expected = TicketAnalyzer().add_many(tickets).result()
+        serial_time = _time_call(lambda: TicketAnalyzer().add_many(tickets).result(), repeat=1)
+        print(f"  {size:>9,} tickets: serial {serial_time:.3f}s (chunks of {chunk_size:,})")
+
+        for workers in worker_counts:
+            matches = analyze_parallel(tickets, workers, chunk_size).result() == expected
+            parallel_time = _time_call(lambda: analyze_parallel(tickets, workers, chunk_size).result(),
+                                       repeat=1)
+            print(f"    {workers:>3} worker(s): {parallel_time:.3f}s "
+                  f"({serial_time / parallel_time:.2f}x) {'✅' if matches else '❌ MISMATCH'}")
+
+
+def benchmark_sqlite_analysis(sizes: list) -> None:
+    """Compare loading tickets.json into Python with SQL aggregates in SQLite"""
+    print("\n🗄️  SQLite aggregates vs. loading tickets into Python")
+    print("-" * 50)
+
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            json_path = os.path.join(tmp, 'tickets.json')
+            db_path = os.path.join(tmp, 'tickets.db')
+            tickets = generate_tickets(size)
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(tickets, f)
+            source = SqliteTicketSource(db_path)
+            import_time = _time_call(lambda: source.import_tickets(tickets), repeat=1)
+            del tickets
+
+            def load_all():
+                with open(json_path, 'r', encoding='utf-8') as f:
+                    return TicketAnalyzer().add_many(json.load(f)).result()
+
+            matches = source.result() == load_all()
+            load_time = _time_call(load_all, repeat=1)
+            sql_time = _time_call(source.result)
+            load_peak = _peak_memory(load_all)
+            sql_peak = _peak_memory(source.result)
+            print(f"  {size:>9,} tickets: json.load + analyze {load_time:.3f}s / {load_peak / 1024 / 1024:,.1f} MiB, "
+                  f"SQL {sql_time:.3f}s / {sql_peak / 1024 / 1024:,.2f} MiB "
+                  f"({load_time / sql_time:.1f}x) {'✅' if matches else '❌ MISMATCH'}")
+            print(f"             one-off import {import_time:.3f}s")
+
+
+def _retained_memory(func) -> int:
+    """Return how much memory a call's result keeps allocated, in bytes"""
+    tracemalloc.start()
+    try:
+        result = func()
+        retained = tracemalloc.get_traced_memory()[0]
+        del result
+        return retained
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark_compact_records(sizes: list) -> None:
+    """Compare memory held by decoded ticket dicts with TicketRecords"""
+    print("\n🗜️  Compact records vs. ticket dicts")
+    print("-" * 50)
+
+    for size in sizes:
+        tickets = generate_tickets(size)
+        # Real tickets accumulate staff notes, which the analyses never read
+        for index, ticket in enumerate(tickets):
+            ticket["notes"] = [{"id": str(uuid.UUID(int=index * 2 + n)), "text": DESCRIPTIONS[n],
+                                "author": "Staff", "timestamp": ticket["updatedAt"]} for n in range(2)]
+        payload = json.dumps(tickets)
+        del tickets
+
+        def as_dicts():
+            return json.loads(payload)
+
+        def as_records():
+            tickets = json.loads(payload)
+            for index, ticket in enumerate(tickets):
+                tickets[index] = TicketRecord(ticket)
+            return tickets
+
+        dict_memory = _retained_memory(as_dicts)
+        record_memory = _retained_memory(as_records)
+        dicts, records = as_dicts(), as_records()
+        matches = TicketAnalyzer().add_many(dicts).result() == TicketAnalyzer().add_many(records).result()
+        dict_time = _time_call(lambda: TicketAnalyzer().add_many(dicts).result())
+        record_time = _time_call(lambda: TicketAnalyzer().add_many(records).result())
+        convert_time = _time_call(lambda: [TicketRecord(ticket) for ticket in dicts], repeat=1)
+        print(f"  {size:>9,} tickets: dicts {dict_memory / 1024 / 1024:,.1f} MiB, "
+              f"records {record_memory / 1024 / 1024:,.1f} MiB ({dict_memory / record_memory:.1f}x smaller) "
+              f"{'✅' if matches else '❌ MISMATCH'}")
+        print(f"             analysis {dict_time:.3f}s on dicts, {record_time:.3f}s on records; "
+              f"conversion {convert_time:.3f}s")
+
+
+def benchmark_time_series(sizes: list) -> None:
+    """Compare rescanning tickets per time range with querying TicketTimeSeries rollups"""
+    print("\n📈 Time-series rollups vs. rescanning per range (weekly volume, 104 weeks)")
+    print("-" * 50)
+
+    parser = TimestampParser()
+    weeks = [datetime.datetime(2023, 1, 2) + datetime.timedelta(weeks=n) for n in range(104)]
+
+    def rescan(tickets):
+        # What answering each range without rollups costs: one pass per range
+        rows = []
+        for week_start in weeks:
+            start_us = int(week_start.replace(tzinfo=datetime.timezone.utc).timestamp()) * 1_000_000
+            end_us = start_us + 7 * 86_400_000_000
+            created, statuses = 0, Counter()
+            for ticket in tickets:
+                if start_us <= parser.parse(ticket["createdAt"]).epoch_us < end_us:
+                    created += 1
+                    statuses[ticket["status"]] += 1
+            rows.append((created, dict(statuses)))
+        return rows
+
+    for size in sizes:
+        tickets = generate_tickets(size)
+        series = TicketTimeSeries(parser)
+        build_time = _time_call(lambda: TicketTimeSeries(parser).sync(tickets), repeat=1)
+        series.sync(tickets)
+        end = weeks[-1] + datetime.timedelta(weeks=1)
+        weekly = [(row["created"], row["statuses"]) for row in series.buckets("week", weeks[0], end)]
+        query_time = _time_call(lambda: series.buckets("week", weeks[0], end))
+        window_time = _time_call(lambda: series.sliding_window(7, "day"))
+        scan_time = _time_call(lambda: rescan(tickets), repeat=1)
+        matches = [(created, dict(sorted(statuses.items()))) for created, statuses in weekly] == \
+            [(created, dict(sorted(statuses.items()))) for created, statuses in rescan(tickets)]
+        print(f"  {size:>9,} tickets: rescan {scan_time:.3f}s, build rollups {build_time:.3f}s, "
+              f"weekly query {query_time * 1000:.2f}ms, 7-day sliding window {window_time * 1000:.2f}ms "
+              f"{'✅' if matches else '❌ MISMATCH'}")
+
+
+def generate_archive_tickets(count: int, seed: int = 11) -> list:
+    """Generate tickets whose device names and email domains keep growing, like a multi-year archive"""
+    rng = random.Random(seed)
+    tickets = generate_tickets(count, seed)
+    distinct = max(1, count // 4)
+    # Zipf-like ranks over a vocabulary that grows with the archive
+    ranks = rng.choices(range(distinct), [1 / (rank + 1) for rank in range(distinct)], k=2 * count)
+    for index, ticket in enumerate(tickets):
+        template = DEVICE_TEMPLATES[ranks[index] % len(DEVICE_TEMPLATES)]
+        ticket["deviceName"] = template.format(n=ranks[index])
+        ticket["email"] = f"customer{rng.randint(0, count)}@corp{ranks[count + index]}.example"
+    return tickets
+
+
+def benchmark_approximate_analysis(sizes: list) -> None:
+    """Compare exact Counters with bounded-memory sketches on high-cardinality fields"""
+    print("\n🎯 Approximate sketches vs. exact counts (top devices/domains, distinct emails)")
+    print("-" * 50)
+
+    def high_cardinality_state(analyzer):
+        # The parts of an analysis that grow with the number of distinct values
+        return analyzer.device_counts, analyzer.domain_counts, analyzer.email_sketch, analyzer.phone_sketch
+
+    for size in sizes:
+        tickets = generate_archive_tickets(size)
+        # A classifier that remembers every name keeps its cache out of the memory figures
+        classifier = DeviceClassifier(cache_size=None)
+        TicketAnalyzer(device_classifier=classifier).add_many(tickets)
+        exact_emails = len({ticket["email"].lower() for ticket in tickets})
+        exact = TicketAnalyzer(device_classifier=classifier).add_many(tickets)
+        exact_memory = _retained_memory(lambda: (
+            high_cardinality_state(TicketAnalyzer(device_classifier=classifier).add_many(tickets)),
+            {ticket["email"].lower() for ticket in tickets}))
+        exact_time = _time_call(lambda: TicketAnalyzer(device_classifier=classifier).add_many(tickets).result(),
+                                repeat=1)
+        exact_devices = exact.device_counts.most_common(5)
+        exact_domains = exact.domain_counts.most_common(10)
+        print(f"  {size:>9,} tickets: exact {exact_memory / 1024:,.0f} KiB, {exact_time:.3f}s "
+              f"({len(exact.device_counts):,} devices, {len(exact.domain_counts):,} domains, "
+              f"{exact_emails:,} emails)")
+
+        for capacity in (64, 256, 1024):
+            def sketched():
+                return TicketAnalyzer(device_classifier=classifier, sketch_capacity=capacity).add_many(tickets)
+
+            approximate = sketched()
+            memory = _retained_memory(lambda: high_cardinality_state(sketched()))
+            elapsed = _time_call(lambda: sketched().result(), repeat=1)
+            top_devices = approximate.device_counts.most_common(5)
+            top_domains = approximate.domain_counts.most_common(10)
+            recall = (len({key for key, _ in top_devices} & {key for key, _ in exact_devices}) +
+                      len({key for key, _ in top_domains} & {key for key, _ in exact_domains})) / 15
+            # Largest gap between a reported count and the true one, against the guaranteed bound
+            device_gap = max(exact.device_counts[key] - count for key, count in top_devices)
+            domain_gap = max(exact.domain_counts[key] - count for key, count in top_domains)
+            within = (0 <= device_gap <= approximate.device_counts.error and
+                      0 <= domain_gap <= approximate.domain_counts.error)
+            email_error = approximate.email_sketch.estimate() / exact_emails - 1
+            print(f"      capacity {capacity:>5}: {memory / 1024:,.0f} KiB, {elapsed:.3f}s, "
+                  f"top-k recall {recall:.0%}, undercount {device_gap}/{domain_gap} "
+                  f"(bound {approximate.device_counts.error}/{approximate.domain_counts.error}) "
+                  f"{'✅' if within else '❌ OUT OF BOUNDS'}, distinct emails {email_error:+.1%} "
+                  f"(±{approximate.email_sketch.relative_error:.1%})")
+
+
+def benchmark_snapshot_startup(sizes: list) -> None:
+    """Compare a cold start from tickets.json with one from a binary snapshot"""
+    print("\n💾 Binary snapshot vs. tickets.json (cold start -> analysis)")
+    print("-" * 50)
+
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            json_path = os.path.join(tmp, 'tickets.json')
+            snapshot_path = os.path.join(tmp, 'tickets.snap')
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(generate_tickets(size), f, indent=2)
+            convert_time = _time_call(lambda: convert_tickets_json(json_path, snapshot_path), repeat=1)
+
+            def from_json():
+                with open(json_path, 'r', encoding='utf-8') as f:
+                    return TicketAnalyzer().add_many(json.load(f)).result()
+
+            def from_snapshot():
+                with TicketSnapshot(snapshot_path) as snapshot:
+                    return snapshot.result()
+
+            def from_snapshot_fields():
+                # The path taken without numpy: decode only the analyzed fields
+                with TicketSnapshot(snapshot_path) as snapshot:
+                    fields = ('status', 'deviceName', 'createdAt', 'email', 'phone')
+                    return TicketAnalyzer().add_many(snapshot.iter_tickets(fields)).result()
+
+            def load_json():
+                with open(json_path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+
+            def load_snapshot():
+                with TicketSnapshot(snapshot_path) as snapshot:
+                    return snapshot.tickets()
+
+            expected = from_json()
+            matches = (load_snapshot() == load_json() and from_snapshot_fields() == expected and
+                       (np is None or from_snapshot() == expected))
+            json_time = _time_call(from_json, repeat=1)
+            fields_time = _time_call(from_snapshot_fields, repeat=1)
+            mapped = (f", mapped columns {_time_call(from_snapshot):.3f}s" if np is not None else "")
+            print(f"  {size:>9,} tickets: tickets.json {os.path.getsize(json_path) / 1024 / 1024:,.1f} MiB, "
+                  f"snapshot {os.path.getsize(snapshot_path) / 1024 / 1024:,.1f} MiB "
+                  f"(converted in {convert_time:.3f}s) {'✅' if matches else '❌ MISMATCH'}")
+            print(f"             analysis: json.load {json_time:.3f}s, "
+                  f"snapshot fields {fields_time:.3f}s{mapped}")
+            print(f"             full decode: json.load {_time_call(load_json, repeat=1):.3f}s, "
+                  f"snapshot {_time_call(load_snapshot, repeat=1):.3f}s")
+
+
+def generate_search_tickets(count: int, seed: int = 5) -> list:
+    """Generate tickets with varied descriptions and staff notes for search benchmarks"""
+    rng = random.Random(seed)
+    vocabulary = [f"term{rank}" for rank in range(5000)]
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    tickets = generate_tickets(count, seed)
+    for ticket in tickets:
+        words = rng.choices(vocabulary, weights, k=rng.randint(5, 30))
+        ticket["description"] = f"{ticket['description']}. {' '.join(words)}"
+        ticket["notes"] = [{"text": f"{rng.choice(DESCRIPTIONS)} {' '.join(rng.choices(vocabulary, weights, k=8))}",
+                            "author": "Staff", "timestamp": ticket["updatedAt"]}
+                           for _ in range(rng.randint(0, 2))]
+    return tickets
+
+
+def benchmark_search_index(sizes: list) -> None:
+    """Compare substring scans with TicketSearchIndex queries"""
+    print("\n🔎 Search index vs. substring scan (descriptions and notes)")
+    print("-" * 50)
+    if np is None:
+        print("  numpy is not installed; skipping")
+        return
+
+    queries = ['"blue screen"', '"won\'t boot"', 'battery drains', 'term42 term977']
+
+    def scan(tickets, phrase):
+        # The only option without an index: lowercase and search every text
+        phrase = phrase.lower()
+        return [ticket["id"] for ticket in tickets
+                if phrase in ticket["description"].lower() or
+                any(phrase in note["text"].lower() for note in ticket["notes"])]
+
+    for size in sizes:
+        tickets = generate_search_tickets(size)
+        index = TicketSearchIndex()
+        start = time.perf_counter()
+        index.sync(tickets)
+        build_time = time.perf_counter() - start
+        scan_time = _time_call(lambda: scan(tickets, "blue screen"), repeat=1)
+        matches = ({match["id"] for match in index.search('"blue screen"', limit=size)} ==
+                   set(scan(tickets, "blue screen")))
+        timings = ", ".join(f"{query} {_time_call(lambda: index.search(query), repeat=5) * 1000:.1f}ms"
+                            for query in queries)
+
+        # Edit tickets one at a time, as the change feed would
+        rng = random.Random(size)
+        start = time.perf_counter()
+        for number in range(1000):
+            ticket = dict(rng.choice(tickets), updatedAt=f"2099-01-01T00:00:{number % 60:02d}.{number:03d}Z")
+            ticket["notes"] = ticket["notes"] + [{"text": "customer reports blue screen again"}]
+            index.apply_changes([ticket])
+        update_time = (time.perf_counter() - start) / 1000
+        print(f"  {size:>9,} tickets: build {build_time:.2f}s, substring scan {scan_time * 1000:.0f}ms "
+              f"{'✅' if matches else '❌ MISMATCH'}")
+        print(f"             queries: {timings}")
+        print(f"             incremental update {update_time * 1e6:.0f}µs/ticket, "
+              f"then \"blue screen\" {_time_call(lambda: index.search(queries[0]), repeat=5) * 1000:.1f}ms")
+
+
+def generate_resubmitted_tickets(count: int, share: float = 0.05, seed: int = 6) -> tuple:
+    """Generate tickets where a share of customers submitted their issue again, reworded
+
+    Returns (tickets, [(original id, resubmitted id), ...]).
+    """
+    rng = random.Random(seed)
+    tickets = generate_search_tickets(count - int(count * share), seed)
+    pairs = []
+    for original in rng.sample(tickets, int(count * share)):
+        words = original["description"].split()
+        words[rng.randrange(len(words))] = rng.choice(["still", "again", "urgent"])
+        resubmitted = dict(original, id=str(uuid.UUID(int=rng.getrandbits(128))),
+                           description=" ".join(words), email=original["email"].upper(),
+                           phone=original["phone"].replace("-", " "))
+        tickets.append(resubmitted)
+        pairs.append((original["id"], resubmitted["id"]))
+    return tickets, pairs
+
+
+def benchmark_duplicate_detection(sizes: list) -> None:
+    """Compare pairwise similarity checks with MinHash/LSH duplicate grouping"""
+    print("\n👯 Duplicate detection: pairwise comparison vs. MinHash/LSH")
+    print("-" * 50)
+    if np is None:
+        print("  numpy is not installed; skipping")
+        return
+
+    # Exact pairwise Jaccard on a sample, to extrapolate the quadratic cost
+    sample, _ = generate_resubmitted_tickets(2_000)
+    features = [set(TicketDuplicateDetector()._features(ticket)) for ticket in sample]
+    start = time.perf_counter()
+    for position, first in enumerate(features):
+        for second in features[position + 1:]:
+            len(first & second) / len(first | second)
+    pair_time = (time.perf_counter() - start) / (len(features) * (len(features) - 1) / 2)
+
+    for size in sizes:
+        tickets, pairs = generate_resubmitted_tickets(size)
+        extra = tickets[-1000:]
+        detector = TicketDuplicateDetector()
+        start = time.perf_counter()
+        detector.sync(tickets[:-1000])
+        sign_time = time.perf_counter() - start
+        start = time.perf_counter()
+        for ticket in extra:
+            detector.apply_changes([ticket])
+        insert_time = (time.perf_counter() - start) / len(extra)
+        start = time.perf_counter()
+        groups = detector.groups()
+        group_time = time.perf_counter() - start
+
+        group_of = {ticket_id: number for number, group in enumerate(groups) for ticket_id in group["ids"]}
+        found = sum(1 for original, resubmitted in pairs
+                    if original in group_of and group_of[original] == group_of.get(resubmitted))
+        pairwise = pair_time * size * (size - 1) / 2
+        print(f"  {size:>9,} tickets: pairwise ~{pairwise:,.0f}s (estimated), "
+              f"signatures {sign_time:.2f}s + groups {group_time:.2f}s")
+        print(f"             {len(groups):,} groups, {found / len(pairs):.1%} of resubmissions found, "
+              f"incremental insert {insert_time * 1e6:.0f}µs/ticket")
+
+
+BENCHMARKS = {
+    "fused": benchmark_fused_analysis,
+    "incremental": benchmark_incremental_analysis,
+    "streaming": benchmark_streaming_ingestion,
+    "columnar": benchmark_columnar_analysis,
+    "devices": benchmark_device_classification,
+    "timestamps": benchmark_timestamp_parsing,
+    "parallel": benchmark_parallel_analysis,
+    "sqlite": benchmark_sqlite_analysis,
+    "records": benchmark_compact_records,
+    "timeseries": benchmark_time_series,
+    "sketches": benchmark_approximate_analysis,
+    "snapshot": benchmark_snapshot_startup,
+    "search": benchmark_search_index,
+    "duplicates": benchmark_duplicate_detection,
+}
+
+
+def main():
+    """Run the selected benchmarks"""
+    parser = argparse.ArgumentParser(description="Benchmark the ticket data processor")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000],
+                        help="ticket counts to benchmark")
+    parser.add_argument("--only", choices=sorted(BENCHMARKS), nargs="+",
+                        help="run only the named benchmarks")
+    args = parser.parse_args()
+
+    print("🏁 Ticket Processor Benchmarks")
+    print("=" * 50)
+    for name in args.only or BENCHMARKS:
+        BENCHMARKS[name](args.sizes)
+
+
+if __name__ == "__main__":
+    main()
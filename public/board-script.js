@@ -4,14 +4,17 @@ class TicketDashboard {
         this.tickets = [];
         this.filteredTickets = [];
         this.currentView = 'grid';
+        // Change-feed state: events that arrive while a full load is in flight wait here
+        this.loading = false;
+        this.pendingChanges = [];
+        this.refreshTimer = null;
         this.init();
     }
 
     init() {
         this.bindEvents();
         this.checkAuth();
-        this.loadTickets();
-        this.setupAutoRefresh();
+        this.loadTickets().then(() => this.setupChangeFeed());
     }
 
     bindEvents() {
@@ -80,11 +83,57 @@ class TicketDashboard {
         }
     }
 
-    setupAutoRefresh() {
-        // Auto-refresh every 30 seconds
-        setInterval(() => {
-            this.loadTickets(false); // Silent refresh
-        }, 30000);
+    setupChangeFeed() {
+        if (!window.EventSource) {
+            // Auto-refresh every 30 seconds
+            setInterval(() => {
+                this.loadTickets(false); // Silent refresh
+            }, 30000);
+            return;
+        }
+
+        // Pick up right after the loaded list; reconnects resume via Last-Event-ID
+        const since = this.changeId ? `?since=${encodeURIComponent(this.changeId)}` : '';
+        const feed = new EventSource(`${this.apiBase}/changes${since}`);
+        ['created', 'updated', 'deleted'].forEach(type => {
+            feed.addEventListener(type, event => this.handleChange(type, JSON.parse(event.data)));
+        });
+        // The server no longer has every missed change, so start over from a full list
+        feed.addEventListener('reset', () => this.loadTickets(false));
+    }
+
+    handleChange(type, change) {
+        if (this.loading) {
+            this.pendingChanges.push([type, change]);
+            return;
+        }
+        this.applyChange(type, change.ticket);
+    }
+
+    applyChange(type, ticket) {
+        const index = this.tickets.findIndex(t => t.id === ticket.id);
+        if (type === 'deleted') {
+            if (index !== -1) {
+                this.tickets.splice(index, 1);
+            }
+        } else if (index !== -1) {
+            this.tickets[index] = ticket;
+        } else {
+            this.tickets.push(ticket);
+        }
+        this.scheduleRefresh();
+    }
+
+    scheduleRefresh() {
+        // Coalesce bursts of changes into one render
+        if (this.refreshTimer) {
+            return;
+        }
+        this.refreshTimer = setTimeout(() => {
+            this.refreshTimer = null;
+            this.applyFilters();
+            this.updateStats();
+        }, 100);
     }
 
     async loadTickets(showLoading = true) {
@@ -92,12 +141,19 @@ class TicketDashboard {
             this.showLoading(true);
         }
 
+        this.loading = true;
         try {
             const response = await fetch(`${this.apiBase}/tickets`);
             const result = await response.json();
 
             if (result.success) {
                 this.tickets = result.data;
+                this.changeId = response.headers.get('X-Change-Id');
+                const loadedSeq = this.changeId ? Number(this.changeId.split(':')[1]) : 0;
+                // Changes newer than the list were queued while it downloaded
+                this.pendingChanges
+                    .filter(([, change]) => change.seq > loadedSeq)
+                    .forEach(([type, change]) => this.applyChange(type, change.ticket));
                 this.applyFilters();
                 this.updateStats();
             } else {
@@ -107,6 +163,8 @@ class TicketDashboard {
             console.error('Error loading tickets:', error);
             this.showMessage('Network error loading tickets', 'error');
         } finally {
+            this.loading = false;
+            this.pendingChanges = [];
             if (showLoading) {
                 this.showLoading(false);
             }
@@ -372,7 +430,7 @@ class TicketDashboard {
 
             if (result.success) {
                 this.showMessage('Ticket updated successfully', 'success');
-                this.loadTickets(false); // Refresh data silently
+                this.applyChange('updated', result.data);
             } else {
                 this.showMessage(result.message || 'Error updating ticket', 'error');
             }
@@ -410,10 +468,8 @@ class TicketDashboard {
                 noteInput.value = '';
 
                 // Refresh the modal with updated data
-                this.loadTickets(false);
-                setTimeout(() => {
-                    this.openTicketModal(ticketId);
-                }, 500);
+                this.applyChange('updated', result.data);
+                this.openTicketModal(ticketId);
             } else {
                 this.showMessage(result.message || 'Error adding note', 'error');
             }
@@ -442,16 +498,22 @@ class TicketDashboard {
         this.renderTickets();
     }
 
-    updateStats() {
-        const total = this.tickets.length;
-        const open = this.tickets.filter(t => t.status === 'open').length;
-        const inProgress = this.tickets.filter(t => t.status === 'in-progress').length;
-        const resolved = this.tickets.filter(t => t.status === 'resolved').length;
+    async updateStats() {
+        // The server keeps these counts up to date, so nothing is recounted here
+        try {
+            const response = await fetch(`${this.apiBase}/stats`);
+            const result = await response.json();
 
-        document.getElementById('totalTickets').textContent = total;
-        document.getElementById('openTickets').textContent = open;
-        document.getElementById('inProgressTickets').textContent = inProgress;
-        document.getElementById('resolvedTickets').textContent = resolved;
+            if (result.success) {
+                const statuses = result.data.statuses;
+                document.getElementById('totalTickets').textContent = result.data.total;
+                document.getElementById('openTickets').textContent = statuses['open'] || 0;
+                document.getElementById('inProgressTickets').textContent = statuses['in-progress'] || 0;
+                document.getElementById('resolvedTickets').textContent = statuses['resolved'] || 0;
+            }
+        } catch (error) {
+            console.error('Error loading stats:', error);
+        }
     }
 
     showLoading(show) {
@@ -18,6 +18,8 @@ const ADMIN_CREDENTIALS = {
 
 // Middleware
 app.use(cors());
+// Bulk requests carry many tickets, so they get a larger body limit than the default 100kb
+app.use('/api/tickets/bulk', bodyParser.json({ limit: '10mb' }));
 app.use(bodyParser.json());
 app.use(bodyParser.urlencoded({ extended: true }));
 
@@ -130,19 +132,383 @@ if (fs.existsSync(publicDir)) {
 }
 
 // Data persistence setup
-const DATA_FILE = path.join(__dirname, 'tickets.json');
+// tickets.json is a compacted snapshot; every mutation since then is one
+// JSON line appended to tickets.journal, replayed on top of it at startup.
+const DATA_DIR = process.env.TICKET_DATA_DIR || __dirname;
+const DATA_FILE = path.join(DATA_DIR, 'tickets.json');
+const JOURNAL_FILE = path.join(DATA_DIR, 'tickets.journal');
+// Journal being folded into a new snapshot; replayed too if compaction was cut short
+const COMPACTING_FILE = JOURNAL_FILE + '.compacting';
+const JOURNAL_COMPACT_THRESHOLD = parseInt(process.env.JOURNAL_COMPACT_THRESHOLD, 10) || 1000;
 
 // Load tickets from file or initialize empty array
 let tickets = [];
 
-function loadTickets() {
+// Collection version for conditional GETs; the boot id keeps ETags unique across restarts
+const BOOT_ID = Date.now().toString(36);
+let ticketsVersion = 0;
+let ticketsLastModified = new Date();
+
+let journalStream = null;
+let journalEntries = 0;
+let compacting = false;
+
+function markTicketsChanged() {
+    ticketsVersion++;
+    ticketsLastModified = new Date();
+}
+
+function ticketsETag() {
+    return `"${BOOT_ID}-${ticketsVersion}"`;
+}
+
+// In-memory indexes, updated on every mutation: id -> position in `tickets`
+// and status/priority/assignee -> Set of tickets. A deleted ticket leaves a
+// null hole in `tickets` so nothing shifts; holes are compacted in bulk.
+const INDEXED_FIELDS = ['status', 'priority', 'assignedTo'];
+let ticketPositions = new Map();
+let secondaryIndexes = {};
+let ticketHoles = 0;
+// id -> creation sequence number, which orders tickets created in the same
+// millisecond (bulk creates share one createdAt). Numbers restart with the
+// server, so cursors carry the boot id they were issued under.
+let ticketSequence = new Map();
+let nextTicketSequence = 0;
+
+function indexKey(ticket, field) {
+    // Unassigned tickets are indexed under null, as the assignedTo filter expects
+    return field === 'assignedTo' ? (ticket.assignedTo || null) : ticket[field];
+}
+
+function indexTicket(ticket) {
+    INDEXED_FIELDS.forEach(field => {
+        const key = indexKey(ticket, field);
+        let bucket = secondaryIndexes[field].get(key);
+        if (!bucket) {
+            bucket = new Set();
+            secondaryIndexes[field].set(key, bucket);
+        }
+        bucket.add(ticket);
+    });
+}
+
+function unindexTicket(ticket) {
+    INDEXED_FIELDS.forEach(field => {
+        const key = indexKey(ticket, field);
+        const bucket = secondaryIndexes[field].get(key);
+        if (bucket) {
+            bucket.delete(ticket);
+            if (!bucket.size) {
+                secondaryIndexes[field].delete(key);
+            }
+        }
+    });
+}
+
+function rebuildTicketIndexes() {
+    ticketPositions = new Map();
+    secondaryIndexes = Object.fromEntries(INDEXED_FIELDS.map(field => [field, new Map()]));
+    ticketHoles = 0;
+    ticketSequence = new Map();
+    nextTicketSequence = 0;
+    resetTicketStats();
+    tickets.forEach((ticket, position) => {
+        ticketPositions.set(ticket.id, position);
+        ticketSequence.set(ticket.id, nextTicketSequence++);
+        indexTicket(ticket);
+        countTicket(ticket, 1);
+    });
+}
+
+function findTicket(id) {
+    const position = ticketPositions.get(id);
+    return position === undefined ? undefined : tickets[position];
+}
+
+function addTicket(ticket) {
+    ticketPositions.set(ticket.id, tickets.length);
+    ticketSequence.set(ticket.id, nextTicketSequence++);
+    tickets.push(ticket);
+    indexTicket(ticket);
+    countTicket(ticket, 1);
+    publishChange('created', ticket);
+}
+
+// Apply field changes, moving the ticket between index buckets and counters
+function updateTicket(ticket, changes) {
+    unindexTicket(ticket);
+    countTicket(ticket, -1);
+    Object.assign(ticket, changes);
+    indexTicket(ticket);
+    countTicket(ticket, 1);
+    publishChange('updated', ticket);
+}
+
+function removeTicket(id) {
+    const position = ticketPositions.get(id);
+    if (position === undefined) {
+        return undefined;
+    }
+    const ticket = tickets[position];
+    tickets[position] = null;
+    ticketPositions.delete(id);
+    ticketSequence.delete(id);
+    unindexTicket(ticket);
+    countTicket(ticket, -1);
+    publishChange('deleted', ticket);
+    ticketHoles++;
+    // Compacting only once holes make up half the array keeps deletes O(1) amortized
+    if (ticketHoles > tickets.length / 2) {
+        compactTickets();
+    }
+    return ticket;
+}
+
+function compactTickets() {
+    tickets = tickets.filter(ticket => ticket !== null);
+    ticketHoles = 0;
+    tickets.forEach((ticket, position) => ticketPositions.set(ticket.id, position));
+}
+
+// The live tickets in creation order, without holes. The array itself is
+// only compacted once holes pass a quarter of it; below that a filtered copy
+// is cheaper than renumbering every position after a delete
+function liveTickets() {
+    if (ticketHoles > tickets.length / 4) {
+        compactTickets();
+    }
+    return ticketHoles ? tickets.filter(ticket => ticket !== null) : tickets;
+}
+
+// Live counters behind GET /api/stats, kept up to date alongside the indexes
+// so the board and the Python processor can read totals without downloading
+// every ticket. Keys keep the order they were first seen in, as the Python
+// analysis does; a count that drops to zero is hidden but keeps its place.
+const STATS_FIELDS = ['statuses', 'priorities', 'deviceTypes', 'hours'];
+let ticketStats = {};
+
+// Keep in step with DEFAULT_DEVICE_RULES in ticket_processor.py (brands left
+// out): the first matching rule decides the type; terms match whole words,
+// digits may follow
+const DEVICE_RULES = [
+    ['iphone', 'iPhone'],
+    ['ios', 'iPhone'],
+    ['samsung', 'Android'],
+    ['android', 'Android'],
+    ['galaxy', 'Android'],
+    ['dell', 'Laptop'],
+    ['hp', 'Laptop'],
+    ['lenovo', 'Laptop'],
+    ['macbook', 'Laptop'],
+    ['laptop', 'Laptop'],
+    ['desktop', 'Desktop'],
+    ['pc', 'Desktop']
+];
+// Longer terms go first so a term is not shadowed by its own prefix
+const DEVICE_RULE_ORDER = DEVICE_RULES.map((rule, index) => index)
+    .sort((a, b) => DEVICE_RULES[b][0].length - DEVICE_RULES[a][0].length);
+const DEVICE_PATTERN = new RegExp(
+    `(?<![a-z])(?:${DEVICE_RULE_ORDER.map(index => `(${DEVICE_RULES[index][0]})`).join('|')})(?![a-z])`, 'g');
+const DEVICE_TYPE_CACHE_SIZE = 4096;
+const deviceTypeCache = new Map();
+
+function classifyDevice(deviceName) {
+    let deviceType = deviceTypeCache.get(deviceName);
+    if (deviceType !== undefined) {
+        return deviceType;
+    }
+    let first = DEVICE_RULES.length;
+    for (const match of deviceName.toLowerCase().matchAll(DEVICE_PATTERN)) {
+        first = Math.min(first, DEVICE_RULE_ORDER[match.slice(1).findIndex(group => group !== undefined)]);
+    }
+    deviceType = first < DEVICE_RULES.length ? DEVICE_RULES[first][1] : null;
+    if (deviceTypeCache.size >= DEVICE_TYPE_CACHE_SIZE) {
+        deviceTypeCache.clear();
+    }
+    deviceTypeCache.set(deviceName, deviceType);
+    return deviceType;
+}
+
+// Hour of an ISO createdAt in its own offset, or null when it does not parse
+function createdHour(createdAt) {
+    if (typeof createdAt !== 'string' || Number.isNaN(Date.parse(createdAt))) {
+        return null;
+    }
+    const match = /^\d{4}-\d{2}-\d{2}(?:[T ](\d{2}))?/.exec(createdAt);
+    return match ? Number(match[1] || 0) : null;
+}
+
+function countTicket(ticket, delta) {
+    const bump = (field, key) => {
+        const counts = ticketStats[field];
+        counts.set(key, (counts.get(key) || 0) + delta);
+    };
+    ticketStats.total += delta;
+    bump('statuses', ticket.status === undefined ? 'unknown' : ticket.status);
+    bump('priorities', ticket.priority === undefined ? 'unknown' : ticket.priority);
+    if (ticket.deviceName) {
+        const deviceType = classifyDevice(ticket.deviceName);
+        if (deviceType) {
+            bump('deviceTypes', deviceType);
+        }
+    }
+    const hour = createdHour(ticket.createdAt);
+    if (hour !== null) {
+        bump('hours', hour);
+    }
+}
+
+function resetTicketStats() {
+    ticketStats = { total: 0 };
+    STATS_FIELDS.forEach(field => {
+        ticketStats[field] = new Map();
+    });
+}
+
+function statsSnapshot() {
+    const snapshot = { total: ticketStats.total };
+    STATS_FIELDS.forEach(field => {
+        snapshot[field] = {};
+        ticketStats[field].forEach((count, key) => {
+            if (count) {
+                snapshot[field][key] = count;
+            }
+        });
+    });
+    return snapshot;
+}
+
+// Change feed behind GET /api/changes. Every create/update/delete gets the
+// next sequence number; the most recent events are kept so a client that
+// reconnects with Last-Event-ID is sent what it missed. Ids carry the boot
+// id, since sequence numbers restart with the server.
+const CHANGE_BACKLOG = parseInt(process.env.CHANGE_BACKLOG, 10) || 1000;
+const CHANGE_HEARTBEAT_MS = 15000;
+// A subscriber that stops reading is dropped rather than buffered without limit
+const CHANGE_CLIENT_BUFFER_LIMIT = 1024 * 1024;
+let changeSequence = 0;
+let recentChanges = [];
+const changeClients = new Set();
+
+function changeId(sequence) {
+    return `${BOOT_ID}:${sequence}`;
+}
+
+function formatChange(change) {
+    return `id: ${changeId(change.seq)}\nevent: ${change.type}\ndata: ${change.data}\n\n`;
+}
+
+function publishChange(type, ticket) {
+    changeSequence++;
+    // Serialized now, since the ticket object keeps changing after this
+    const change = {
+        seq: changeSequence,
+        type,
+        data: JSON.stringify({ seq: changeSequence, ticket })
+    };
+    recentChanges.push(change);
+    // Trimming in bulk keeps publishing O(1) amortized
+    if (recentChanges.length > 2 * CHANGE_BACKLOG) {
+        recentChanges = recentChanges.slice(-CHANGE_BACKLOG);
+    }
+
+    const message = formatChange(change);
+    changeClients.forEach(client => {
+        if (client.writableLength > CHANGE_CLIENT_BUFFER_LIMIT) {
+            changeClients.delete(client);
+            client.end();
+        } else {
+            client.write(message);
+        }
+    });
+}
+
+// Events after `lastId`, or null when they are no longer all available
+function changesSince(lastId) {
+    const [boot, sequence] = String(lastId).split(':');
+    const after = Number(sequence);
+    if (boot !== BOOT_ID || !Number.isInteger(after) || after > changeSequence) {
+        return null;
+    }
+    const oldest = recentChanges.length ? recentChanges[0].seq : changeSequence + 1;
+    if (after < oldest - 1) {
+        return null;
+    }
+    return recentChanges.slice(Math.max(0, after - oldest + 1));
+}
+
+// Apply journal lines to the loaded tickets; returns how many were applied
+function replayJournal(file, positions) {
+    if (!fs.existsSync(file)) {
+        return 0;
+    }
+    const lines = fs.readFileSync(file, 'utf8').split('\n');
+    let applied = 0;
+    lines.forEach((line, lineNumber) => {
+        if (!line) {
+            return;
+        }
+        let entry;
+        try {
+            entry = JSON.parse(line);
+        } catch (error) {
+            // A crash mid-append leaves a torn last line; anything else is corruption
+            if (lineNumber < lines.length - 1) {
+                console.error(`Skipping unreadable journal line ${lineNumber + 1} in ${file}`);
+            }
+            return;
+        }
+        if (entry.op === 'put') {
+            const index = positions.get(entry.ticket.id);
+            if (index === undefined) {
+                positions.set(entry.ticket.id, tickets.length);
+                tickets.push(entry.ticket);
+            } else {
+                tickets[index] = entry.ticket;
+            }
+        } else if (entry.op === 'delete') {
+            const index = positions.get(entry.id);
+            if (index !== undefined) {
+                // Holes are dropped once the whole journal has been replayed
+                tickets[index] = null;
+                positions.delete(entry.id);
+            }
+        }
+        applied++;
+    });
+    const mtime = fs.statSync(file).mtime;
+    if (mtime > ticketsLastModified) {
+        ticketsLastModified = mtime;
+    }
+    return applied;
+}
+
+function loadJsonTickets() {
     try {
         if (fs.existsSync(DATA_FILE)) {
             const data = fs.readFileSync(DATA_FILE, 'utf8');
             tickets = JSON.parse(data);
-            console.log(`📁 Loaded ${tickets.length} tickets from storage`);
+            ticketsLastModified = fs.statSync(DATA_FILE).mtime;
         } else {
             tickets = [];
+        }
+
+        const positions = new Map(tickets.map((ticket, index) => [ticket.id, index]));
+        const leftover = replayJournal(COMPACTING_FILE, positions);
+        journalEntries = leftover + replayJournal(JOURNAL_FILE, positions);
+        if (journalEntries) {
+            tickets = tickets.filter(ticket => ticket !== null);
+        }
+        if (leftover) {
+            // Finish the interrupted compaction before that file can be overwritten
+            fs.writeFileSync(DATA_FILE + '.tmp', JSON.stringify(tickets));
+            fs.renameSync(DATA_FILE + '.tmp', DATA_FILE);
+            fs.unlinkSync(COMPACTING_FILE);
+        }
+
+        if (tickets.length || journalEntries) {
+            console.log(`📁 Loaded ${tickets.length} tickets from storage (${journalEntries} journal entries replayed)`);
+        } else {
             console.log('📁 No existing ticket data found, starting fresh');
         }
     } catch (error) {
@@ -151,15 +517,234 @@ function loadTickets() {
     }
 }
 
-function saveTickets() {
+function openJournal() {
+    // Opened synchronously so the file exists before compaction renames it
+    journalStream = fs.createWriteStream(JOURNAL_FILE, { fd: fs.openSync(JOURNAL_FILE, 'a') });
+    journalStream.on('error', error => console.error('Error writing ticket journal:', error));
+}
+
+// Persist one change, or an array of changes as a single write
+// (one journal append, or one SQLite transaction)
+function saveTickets(changes) {
+    const batch = Array.isArray(changes) ? changes : [changes];
+    if (!batch.length) {
+        return;
+    }
+    markTicketsChanged();
+    if (sqliteStore) {
+        try {
+            if (batch.length === 1 && batch[0].op === 'delete') {
+                sqliteStore.remove(batch[0].id);
+            } else if (batch.length === 1) {
+                sqliteStore.put(batch[0].ticket);
+            } else {
+                sqliteStore.applyMany(batch);
+            }
+        } catch (error) {
+            console.error('Error saving tickets:', error);
+        }
+        return;
+    }
     try {
-        fs.writeFileSync(DATA_FILE, JSON.stringify(tickets, null, 2));
-        console.log(`💾 Saved ${tickets.length} tickets to storage`);
+        if (!journalStream) {
+            openJournal();
+        }
+        journalStream.write(batch.map(change => JSON.stringify(change) + '\n').join(''));
+        journalEntries += batch.length;
+        if (journalEntries >= JOURNAL_COMPACT_THRESHOLD) {
+            compactJournal();
+        }
     } catch (error) {
         console.error('Error saving tickets:', error);
     }
 }
 
+// Write the in-memory tickets as the snapshot, then drop the compacted
+// journal it supersedes; the file is kept if the write fails
+function writeSnapshot(snapshot, count) {
+    const tempFile = DATA_FILE + '.tmp';
+    fs.writeFile(tempFile, snapshot, error => {
+        if (!error) {
+            try {
+                fs.renameSync(tempFile, DATA_FILE);
+                fs.unlinkSync(COMPACTING_FILE);
+                console.log(`💾 Compacted ${count} tickets into ${path.basename(DATA_FILE)}`);
+            } catch (renameError) {
+                error = renameError;
+            }
+        }
+        if (error) {
+            console.error('Error writing ticket snapshot:', error);
+        }
+        compacting = false;
+    });
+}
+
+// Fold the journal into a fresh snapshot without blocking on the write
+function compactJournal() {
+    if (compacting) {
+        return;
+    }
+    compacting = true;
+    const snapshot = JSON.stringify(liveTickets());
+    const count = tickets.length;
+    if (fs.existsSync(COMPACTING_FILE)) {
+        // A failed snapshot left its journal behind; renaming over it would
+        // lose those changes, so only retry the snapshot. Replaying the live
+        // journal on top of it is harmless, and it is compacted next time
+        writeSnapshot(snapshot, count);
+        return;
+    }
+    const previousStream = journalStream;
+    try {
+        // Mutations from here on go to a new journal; buffered writes still
+        // land in the renamed file, which is replayed if we crash before the
+        // snapshot is in place
+        fs.renameSync(JOURNAL_FILE, COMPACTING_FILE);
+    } catch (error) {
+        console.error('Error compacting ticket journal:', error);
+        compacting = false;
+        return;
+    }
+    openJournal();
+    journalEntries = 0;
+
+    previousStream.end(() => writeSnapshot(snapshot, count));
+}
+
+// Optional SQLite backend (TICKET_STORE=sqlite; needs `npm install better-sqlite3`).
+// Tickets are still served from memory; the database replaces the snapshot
+// and journal files and is indexed for ad-hoc and analytics queries.
+const TICKET_STORE = process.env.TICKET_STORE || 'json';
+const SQLITE_FILE = process.env.TICKET_DB || path.join(DATA_DIR, 'tickets.db');
+
+// Keep in step with SQLITE_SCHEMA in ticket_processor.py
+const SQLITE_SCHEMA = `
+CREATE TABLE IF NOT EXISTS tickets (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    phone TEXT,
+    email TEXT,
+    device_name TEXT,
+    description TEXT,
+    status TEXT,
+    priority TEXT,
+    assigned_to TEXT,
+    notes TEXT,
+    created_at TEXT,
+    updated_at TEXT,
+    phone_digits INTEGER
+);
+CREATE INDEX IF NOT EXISTS tickets_status ON tickets (status);
+CREATE INDEX IF NOT EXISTS tickets_priority ON tickets (priority);
+CREATE INDEX IF NOT EXISTS tickets_assigned_to ON tickets (assigned_to);
+CREATE INDEX IF NOT EXISTS tickets_created_at ON tickets (created_at);
+`;
+
+function ticketToRow(ticket) {
+    return {
+        id: ticket.id,
+        name: ticket.name ?? null,
+        phone: ticket.phone ?? null,
+        email: ticket.email ?? null,
+        device_name: ticket.deviceName ?? null,
+        description: ticket.description ?? null,
+        status: ticket.status ?? null,
+        priority: ticket.priority ?? null,
+        assigned_to: ticket.assignedTo ?? null,
+        notes: JSON.stringify(ticket.notes || []),
+        created_at: ticket.createdAt ?? null,
+        updated_at: ticket.updatedAt ?? null,
+        // Stored so analytics can bucket phone formats without a regex in SQL
+        phone_digits: ticket.phone ? ticket.phone.replace(/\D/g, '').length : null
+    };
+}
+
+function rowToTicket(row) {
+    return {
+        id: row.id,
+        name: row.name,
+        phone: row.phone,
+        email: row.email,
+        deviceName: row.device_name,
+        description: row.description,
+        status: row.status,
+        priority: row.priority,
+        assignedTo: row.assigned_to,
+        notes: JSON.parse(row.notes || '[]'),
+        createdAt: row.created_at,
+        updatedAt: row.updated_at
+    };
+}
+
+function openSqliteStore(file) {
+    let Database;
+    try {
+        Database = require('better-sqlite3');
+    } catch (error) {
+        console.error('⚠️  TICKET_STORE=sqlite needs better-sqlite3 (npm install better-sqlite3); using tickets.json');
+        return null;
+    }
+
+    const db = new Database(file);
+    db.pragma('journal_mode = WAL');
+    db.exec(SQLITE_SCHEMA);
+    const columns = Object.keys(ticketToRow({}));
+    const upsert = db.prepare(
+        `INSERT INTO tickets (${columns.join(', ')}) VALUES (${columns.map(column => '@' + column).join(', ')}) ` +
+        // ON CONFLICT keeps the rowid, so the listing order survives updates
+        `ON CONFLICT (id) DO UPDATE SET ${columns.filter(column => column !== 'id')
+            .map(column => `${column} = excluded.${column}`).join(', ')}`
+    );
+    const remove = db.prepare('DELETE FROM tickets WHERE id = ?');
+    const selectAll = db.prepare('SELECT * FROM tickets ORDER BY rowid');
+    const count = db.prepare('SELECT COUNT(*) AS total FROM tickets');
+
+    return {
+        all: () => selectAll.all().map(rowToTicket),
+        count: () => count.get().total,
+        put: ticket => upsert.run(ticketToRow(ticket)),
+        putMany: db.transaction(list => list.forEach(ticket => upsert.run(ticketToRow(ticket)))),
+        applyMany: db.transaction(changes => changes.forEach(change => {
+            if (change.op === 'delete') {
+                remove.run(change.id);
+            } else {
+                upsert.run(ticketToRow(change.ticket));
+            }
+        })),
+        remove: id => remove.run(id)
+    };
+}
+
+const sqliteStore = TICKET_STORE === 'sqlite' ? openSqliteStore(SQLITE_FILE) : null;
+
+function loadTickets() {
+    if (sqliteStore) {
+        loadSqliteTickets();
+    } else {
+        loadJsonTickets();
+    }
+    rebuildTicketIndexes();
+}
+
+function loadSqliteTickets() {
+    try {
+        if (!sqliteStore.count() && (fs.existsSync(DATA_FILE) || fs.existsSync(JOURNAL_FILE))) {
+            // First start on SQLite: bring the JSON store across
+            loadJsonTickets();
+            sqliteStore.putMany(tickets);
+            console.log(`📁 Imported ${tickets.length} tickets into ${path.basename(SQLITE_FILE)}`);
+            return;
+        }
+        tickets = sqliteStore.all();
+        ticketsLastModified = fs.statSync(SQLITE_FILE).mtime;
+        console.log(`📁 Loaded ${tickets.length} tickets from ${path.basename(SQLITE_FILE)}`);
+    } catch (error) {
+        console.error('Error loading tickets:', error);
+        tickets = [];
+    }
+}
+
 // Load tickets on startup
 loadTickets();
 
@@ -188,15 +773,294 @@ function validateTicket(ticket) {
     return errors;
 }
 
+// Build a new ticket from validated submission fields
+function createTicket({ name, phone, email, deviceName, description }) {
+    const now = new Date().toISOString();
+    return {
+        id: uuidv4(),
+        name: name.trim(),
+        phone: phone.trim(),
+        email: email.trim(),
+        deviceName: deviceName.trim(),
+        description: description ? description.trim() : '',
+        status: 'open',
+        priority: 'medium',
+        assignedTo: null,
+        notes: [],
+        createdAt: now,
+        updatedAt: now
+    };
+}
+
+// Apply PATCH fields (status, assignedTo, priority, note) to a ticket;
+// returns whether anything changed
+function patchTicket(ticket, { status, assignedTo, priority, note, author }) {
+    // Indexed fields go through updateTicket so the indexes follow them
+    const changes = {};
+
+    if (status && ['open', 'in-progress', 'resolved', 'closed'].includes(status)) {
+        changes.status = status;
+    }
+
+    if (assignedTo !== undefined) {
+        changes.assignedTo = assignedTo;
+    }
+
+    if (priority && ['low', 'medium', 'high', 'urgent'].includes(priority)) {
+        changes.priority = priority;
+    }
+
+    let updated = Object.keys(changes).length > 0;
+
+    if (note && note.trim()) {
+        if (!ticket.notes) {
+            ticket.notes = [];
+        }
+        ticket.notes.push({
+            id: uuidv4(),
+            text: note.trim(),
+            author: author || 'Staff',
+            timestamp: new Date().toISOString()
+        });
+        updated = true;
+    }
+
+    if (updated) {
+        changes.updatedAt = new Date().toISOString();
+        updateTicket(ticket, changes);
+    }
+    return updated;
+}
+
+// Largest number of tickets accepted by one bulk request
+const MAX_BULK_SIZE = 1000;
+
+// Check a bulk request body; returns the items or sends a 400 and returns null
+function bulkItems(req, res, key) {
+    const items = req.body[key];
+    if (!Array.isArray(items) || items.length === 0) {
+        res.status(400).json({
+            success: false,
+            message: `${key} must be a non-empty array`
+        });
+        return null;
+    }
+    if (items.length > MAX_BULK_SIZE) {
+        res.status(400).json({
+            success: false,
+            message: `At most ${MAX_BULK_SIZE} ${key} per request`
+        });
+        return null;
+    }
+    return items;
+}
+
+// Ticket listing filters and pagination
+const MAX_PAGE_SIZE = 1000;
+const TICKET_RANGE_FILTERS = {
+    // query parameter: [ticket field, comparison]; "From" is inclusive, "To" exclusive
+    createdFrom: ['createdAt', (value, bound) => value >= bound],
+    createdTo: ['createdAt', (value, bound) => value < bound],
+    updatedFrom: ['updatedAt', (value, bound) => value >= bound],
+    updatedTo: ['updatedAt', (value, bound) => value < bound]
+};
+
+// Build a predicate from the listing query string, or return { error }
+function buildTicketFilter(query) {
+    const checks = [];
+
+    ['status', 'priority'].forEach(field => {
+        if (query[field]) {
+            const allowed = new Set(String(query[field]).split(','));
+            checks.push(ticket => allowed.has(ticket[field]));
+        }
+    });
+
+    if (query.assignedTo !== undefined) {
+        // An empty assignedTo selects unassigned tickets
+        const assignee = String(query.assignedTo) || null;
+        checks.push(ticket => (ticket.assignedTo || null) === assignee);
+    }
+
+    for (const [param, [field, compare]] of Object.entries(TICKET_RANGE_FILTERS)) {
+        if (query[param] === undefined) {
+            continue;
+        }
+        const bound = new Date(query[param]);
+        if (isNaN(bound.getTime())) {
+            return { error: `Invalid date for ${param}` };
+        }
+        // Timestamps are stored as toISOString(), so string comparison orders them
+        const isoBound = bound.toISOString();
+        checks.push(ticket => compare(ticket[field], isoBound));
+    }
+
+    return { predicate: ticket => checks.every(check => check(ticket)) };
+}
+
+function encodeCursor(ticket) {
+    const cursor = { id: ticket.id, createdAt: ticket.createdAt, boot: BOOT_ID, seq: ticketSequence.get(ticket.id) };
+    return Buffer.from(JSON.stringify(cursor)).toString('base64url');
+}
+
+function decodeCursor(cursor) {
+    try {
+        const decoded = JSON.parse(Buffer.from(String(cursor), 'base64url').toString('utf8'));
+        return decoded && decoded.id ? decoded : null;
+    } catch (error) {
+        return null;
+    }
+}
+
+// Index of the first ticket after the cursor; tickets are kept in creation order
+function cursorStartIndex(cursor) {
+    const position = ticketPositions.get(cursor.id);
+    if (position !== undefined) {
+        return position + 1;
+    }
+    // The cursor ticket was deleted; binary search for the first ticket
+    // created after it, stepping over holes. Tickets sharing its createdAt
+    // are ordered by creation sequence; a cursor from before a restart cannot
+    // place itself among them, so they are all returned again rather than skipped.
+    const sameBoot = cursor.boot === BOOT_ID && Number.isInteger(cursor.seq);
+    const isAfterCursor = ticket => ticket.createdAt > cursor.createdAt ||
+        (ticket.createdAt === cursor.createdAt && (!sameBoot || ticketSequence.get(ticket.id) > cursor.seq));
+    let low = 0;
+    let high = tickets.length;
+    while (low < high) {
+        const middle = (low + high) >> 1;
+        let probe = middle;
+        while (probe < high && tickets[probe] === null) {
+            probe++;
+        }
+        if (probe === high || isAfterCursor(tickets[probe])) {
+            high = middle;
+        } else {
+            low = probe + 1;
+        }
+    }
+    return low;
+}
+
+// Full listings use an index that narrows them to at most this share of the store
+const INDEX_SELECTIVITY = 0.25;
+
+// Tickets from position `start` on that can match the status/priority/assignee
+// filters, in creation order; null when no selective index applies.
+// With k matches out of n, a page of p costs about p * n / k to scan but
+// k log k to gather and sort, so pages use the index only when k < sqrt(p * n).
+function indexedCandidates(query, start, pageSize) {
+    let best = null;
+    let bestSize = Infinity;
+    INDEXED_FIELDS.forEach(field => {
+        if (query[field] === undefined || (field !== 'assignedTo' && !query[field])) {
+            return;
+        }
+        const keys = field === 'assignedTo' ? [String(query[field]) || null] : String(query[field]).split(',');
+        const buckets = keys.map(key => secondaryIndexes[field].get(key)).filter(Boolean);
+        const size = buckets.reduce((total, bucket) => total + bucket.size, 0);
+        if (size < bestSize) {
+            best = buckets;
+            bestSize = size;
+        }
+    });
+    const budget = pageSize
+        ? Math.sqrt((pageSize + 1) * tickets.length)
+        : tickets.length * INDEX_SELECTIVITY;
+    if (!best || bestSize > budget) {
+        return null;
+    }
+
+    const positions = [];
+    best.forEach(bucket => bucket.forEach(ticket => {
+        const position = ticketPositions.get(ticket.id);
+        if (position >= start) {
+            positions.push(position);
+        }
+    }));
+    return Array.from(new Float64Array(positions).sort(), position => tickets[position]);
+}
+
 // API Routes
 
-// Get all tickets
+// Get all tickets, optionally filtered and paginated
+// (?status=&priority=&assignedTo=&createdFrom=&createdTo=&updatedFrom=&updatedTo=&limit=&cursor=)
 app.get('/api/tickets', (req, res) => {
     try {
+        const { predicate, error } = buildTicketFilter(req.query);
+        if (error) {
+            return res.status(400).json({
+                success: false,
+                message: error
+            });
+        }
+
+        // Every listing is derived from the same collection version, so clients
+        // can revalidate with If-None-Match and skip the download when nothing changed
+        // X-Change-Id is where /api/changes picks up after this listing
+        res.set({
+            'ETag': ticketsETag(),
+            'Last-Modified': ticketsLastModified.toUTCString(),
+            'Cache-Control': 'no-cache',
+            'X-Change-Id': changeId(changeSequence)
+        });
+        if (req.fresh) {
+            return res.status(304).end();
+        }
+
+        if (req.query.limit === undefined && req.query.cursor === undefined) {
+            const data = Object.keys(req.query).length > 0
+                ? (indexedCandidates(req.query, 0, 0) || tickets).filter(ticket => ticket !== null && predicate(ticket))
+                : liveTickets();
+            return res.json({
+                success: true,
+                data,
+                count: data.length
+            });
+        }
+
+        const limit = req.query.limit === undefined ? MAX_PAGE_SIZE : parseInt(req.query.limit, 10);
+        if (!Number.isInteger(limit) || limit < 1) {
+            return res.status(400).json({
+                success: false,
+                message: 'limit must be a positive integer'
+            });
+        }
+
+        let start = 0;
+        if (req.query.cursor !== undefined) {
+            const cursor = decodeCursor(req.query.cursor);
+            if (!cursor) {
+                return res.status(400).json({
+                    success: false,
+                    message: 'Invalid cursor'
+                });
+            }
+            start = cursorStartIndex(cursor);
+        }
+
+        const pageSize = Math.min(limit, MAX_PAGE_SIZE);
+        const candidates = indexedCandidates(req.query, start, pageSize);
+        const source = candidates || tickets;
+        const data = [];
+        let index = candidates ? 0 : start;
+        for (; index < source.length && data.length < pageSize; index++) {
+            if (source[index] && predicate(source[index])) {
+                data.push(source[index]);
+            }
+        }
+
+        // Only hand out a cursor if another matching ticket exists
+        let hasMore = false;
+        for (; index < source.length && !hasMore; index++) {
+            hasMore = Boolean(source[index]) && predicate(source[index]);
+        }
+
         res.json({
             success: true,
-            data: tickets,
-            count: tickets.length
+            data,
+            count: data.length,
+            nextCursor: hasMore && data.length > 0 ? encodeCursor(data[data.length - 1]) : null
         });
     } catch (error) {
         res.status(500).json({
@@ -207,10 +1071,150 @@ app.get('/api/tickets', (req, res) => {
     }
 });
 
+// Ticket counts by status, priority, device type and creation hour
+app.get('/api/stats', (req, res) => {
+    // Counters change with the collection, so they share its ETag
+    res.set({
+        'ETag': ticketsETag(),
+        'Last-Modified': ticketsLastModified.toUTCString(),
+        'Cache-Control': 'no-cache'
+    });
+    if (req.fresh) {
+        return res.status(304).end();
+    }
+    res.json({
+        success: true,
+        data: statsSnapshot()
+    });
+});
+
+// Stream ticket changes as Server-Sent Events (created/updated/deleted).
+// Resumes after Last-Event-ID, or ?since= (an X-Change-Id from a listing);
+// a "reset" event means the gap is gone and the client should re-fetch.
+app.get('/api/changes', (req, res) => {
+    const lastId = req.get('Last-Event-ID') || req.query.since;
+    const missed = lastId ? changesSince(lastId) : [];
+
+    res.writeHead(200, {
+        'Content-Type': 'text/event-stream',
+        'Cache-Control': 'no-cache',
+        'Connection': 'keep-alive',
+        'X-Accel-Buffering': 'no'
+    });
+    res.write('retry: 2000\n\n');
+    if (missed === null) {
+        res.write(`id: ${changeId(changeSequence)}\nevent: reset\ndata: {"seq":${changeSequence}}\n\n`);
+    } else {
+        missed.forEach(change => res.write(formatChange(change)));
+    }
+
+    changeClients.add(res);
+    // Comments keep proxies and client read timeouts from closing an idle stream
+    const heartbeat = setInterval(() => res.write(': ping\n\n'), CHANGE_HEARTBEAT_MS);
+    req.on('close', () => {
+        clearInterval(heartbeat);
+        changeClients.delete(res);
+    });
+});
+
+// Create many tickets in one request (protected). Every ticket is
+// validated first; if any is invalid nothing is created.
+app.post('/api/tickets/bulk', requireAuth, (req, res) => {
+    try {
+        const items = bulkItems(req, res, 'tickets');
+        if (!items) {
+            return;
+        }
+
+        const errors = [];
+        items.forEach((item, index) => {
+            const itemErrors = item && typeof item === 'object' ? validateTicket(item) : ['Ticket must be an object'];
+            if (itemErrors.length > 0) {
+                errors.push({ index, errors: itemErrors });
+            }
+        });
+        if (errors.length > 0) {
+            return res.status(400).json({
+                success: false,
+                message: 'Validation failed',
+                errors
+            });
+        }
+
+        const created = items.map(createTicket);
+        created.forEach(addTicket);
+        saveTickets(created.map(ticket => ({ op: 'put', ticket }))); // One write for the batch
+
+        res.status(201).json({
+            success: true,
+            message: `${created.length} tickets created successfully`,
+            data: created,
+            count: created.length
+        });
+    } catch (error) {
+        res.status(500).json({
+            success: false,
+            message: 'Error creating tickets',
+            error: error.message
+        });
+    }
+});
+
+// Apply PATCH-style updates ({ id, status, assignedTo, priority, note, author })
+// to many tickets in one request (protected). If any id is unknown nothing is updated.
+app.patch('/api/tickets/bulk', requireAuth, (req, res) => {
+    try {
+        const items = bulkItems(req, res, 'updates');
+        if (!items) {
+            return;
+        }
+
+        const errors = [];
+        const targets = items.map((item, index) => {
+            const ticket = item && typeof item === 'object' ? findTicket(item.id) : undefined;
+            if (!ticket) {
+                errors.push({ index, errors: ['Ticket not found'] });
+            }
+            return ticket;
+        });
+        if (errors.length > 0) {
+            return res.status(400).json({
+                success: false,
+                message: 'Validation failed',
+                errors
+            });
+        }
+
+        // A ticket named twice is persisted once, in its final state
+        const changed = new Set();
+        items.forEach((item, index) => {
+            if (patchTicket(targets[index], item)) {
+                changed.add(targets[index]);
+            }
+        });
+        saveTickets([...changed].map(ticket => ({ op: 'put', ticket }))); // One write for the batch
+
+        // Each named ticket is reported once, in the order it was first named
+        const updated = [...new Set(targets)];
+        res.json({
+            success: true,
+            message: `${updated.length} tickets updated successfully`,
+            data: updated,
+            count: updated.length
+        });
+    } catch (error) {
+        res.status(500).json({
+            success: false,
+            message: 'Error updating tickets',
+            error: error.message
+        });
+    }
+});
+
 // Get a specific ticket by ID
 app.get('/api/tickets/:id', (req, res) => {
     try {
-        const ticket = tickets.find(t => t.id === req.params.id);
+        const ticket = findTicket(req.params.id);
         
         if (!ticket) {
             return res.status(404).json({
@@ -235,8 +1239,6 @@ app.get('/api/tickets/:id', (req, res) => {
 // Create a new ticket
 app.post('/api/tickets', (req, res) => {
     try {
-        const { name, phone, email, deviceName, description } = req.body;
-        
         // Validate required fields
         const validationErrors = validateTicket(req.body);
         
@@ -249,23 +1251,10 @@ app.post('/api/tickets', (req, res) => {
         }
         
         // Create new ticket
-        const newTicket = {
-            id: uuidv4(),
-            name: name.trim(),
-            phone: phone.trim(),
-            email: email.trim(),
-            deviceName: deviceName.trim(),
-            description: description ? description.trim() : '',
-            status: 'open',
-            priority: 'medium',
-            assignedTo: null,
-            notes: [],
-            createdAt: new Date().toISOString(),
-            updatedAt: new Date().toISOString()
-        };
+        const newTicket = createTicket(req.body);
         
-        tickets.push(newTicket);
-        saveTickets(); // Persist to file
+        addTicket(newTicket);
+        saveTickets({ op: 'put', ticket: newTicket }); // Persist to journal
 
         res.status(201).json({
             success: true,
@@ -285,56 +1274,23 @@ app.post('/api/tickets', (req, res) => {
 // Update ticket status (protected)
 app.patch('/api/tickets/:id', requireAuth, (req, res) => {
     try {
-        const ticketIndex = tickets.findIndex(t => t.id === req.params.id);
+        const ticket = findTicket(req.params.id);
         
-        if (ticketIndex === -1) {
+        if (!ticket) {
             return res.status(404).json({
                 success: false,
                 message: 'Ticket not found'
             });
         }
         
-        const { status, assignedTo, priority, note } = req.body;
-
-        let updated = false;
-
-        if (status && ['open', 'in-progress', 'resolved', 'closed'].includes(status)) {
-            tickets[ticketIndex].status = status;
-            updated = true;
-        }
-
-        if (assignedTo !== undefined) {
-            tickets[ticketIndex].assignedTo = assignedTo;
-            updated = true;
-        }
-
-        if (priority && ['low', 'medium', 'high', 'urgent'].includes(priority)) {
-            tickets[ticketIndex].priority = priority;
-            updated = true;
-        }
-
-        if (note && note.trim()) {
-            if (!tickets[ticketIndex].notes) {
-                tickets[ticketIndex].notes = [];
-            }
-            tickets[ticketIndex].notes.push({
-                id: uuidv4(),
-                text: note.trim(),
-                author: req.body.author || 'Staff',
-                timestamp: new Date().toISOString()
-            });
-            updated = true;
-        }
-
-        if (updated) {
-            tickets[ticketIndex].updatedAt = new Date().toISOString();
-            saveTickets(); // Persist changes
+        if (patchTicket(ticket, req.body)) {
+            saveTickets({ op: 'put', ticket }); // Persist changes
         }
 
         res.json({
             success: true,
             message: 'Ticket updated successfully',
-            data: tickets[ticketIndex]
+            data: ticket
         });
         
     } catch (error) {
@@ -349,17 +1305,16 @@ app.patch('/api/tickets/:id', requireAuth, (req, res) => {
 // Delete a ticket (protected)
 app.delete('/api/tickets/:id', requireAuth, (req, res) => {
     try {
-        const ticketIndex = tickets.findIndex(t => t.id === req.params.id);
+        const deletedTicket = removeTicket(req.params.id);
         
-        if (ticketIndex === -1) {
+        if (!deletedTicket) {
             return res.status(404).json({
                 success: false,
                 message: 'Ticket not found'
             });
         }
         
-        const deletedTicket = tickets.splice(ticketIndex, 1)[0];
-        saveTickets(); // Persist changes
+        saveTickets({ op: 'delete', id: deletedTicket.id }); // Persist changes
 
         res.json({
             success: true,
@@ -407,6 +1362,17 @@ app.get('/ticket/:id', requireAuth, (req, res) => {
     res.sendFile(path.join(__dirname, 'public', 'ticket-detail.html'));
 });
 
+// Let buffered journal writes reach the disk before exiting
+function closeJournalAndExit() {
+    if (!journalStream) {
+        process.exit(0);
+    }
+    journalStream.end(() => process.exit(0));
+}
+
+process.on('SIGINT', closeJournalAndExit);
+process.on('SIGTERM', closeJournalAndExit);
+
 // Start server
 app.listen(PORT, () => {
     console.log(`🎫 Ticket Management System v2.0 running on http://localhost:${PORT}`);
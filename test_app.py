@@ -5,6 +5,13 @@ Test script for the ticket management system
 
 import requests
 import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
 import time
 
 def test_api():
@@ -88,6 +95,24 @@ def test_api():
     except requests.exceptions.RequestException as e:
         print(f"❌ Create second ticket: FAILED (Error: {e})")
     
+    # Test paginated and filtered listing
+    try:
+        response = requests.get(f"{base_url}/tickets", params={"limit": 1, "status": "open"}, timeout=5)
+        data = response.json()
+        if response.status_code == 200 and data.get('count') == 1 and data.get('nextCursor'):
+            response = requests.get(f"{base_url}/tickets",
+                                    params={"limit": 1, "status": "open", "cursor": data['nextCursor']},
+                                    timeout=5)
+            next_page = response.json().get('data', [])
+            if next_page and next_page[0]['id'] != data['data'][0]['id']:
+                print("✅ Paginated ticket listing: PASSED")
+            else:
+                print("❌ Paginated ticket listing: FAILED (cursor did not advance)")
+        else:
+            print(f"❌ Paginated ticket listing: FAILED (Status: {response.status_code})")
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Paginated ticket listing: FAILED (Error: {e})")
+    
     print("\n🔍 Testing Python Data Processor")
     print("=" * 50)
     
@@ -105,12 +130,135 @@ def test_api():
             print(f"   - Total tickets: {analysis.get('total_tickets', 0)}")
             print(f"   - Status distribution: {analysis.get('status_distribution', {}).get('counts', {})}")
             
-            # Generate report
-            report = processor.generate_report()
-            if report and not report.startswith("Report generation failed"):
+            # Generate reports from the analysis above, without analyzing again
+            report = processor.generate_report(analysis=analysis)
+            markdown = processor.generate_report(analysis=analysis, report_format='markdown')
+            if (report and not report.startswith("Report generation failed") and
+                    markdown.startswith("# Ticket System Analysis Report")):
                 print("✅ Generate report: PASSED")
             else:
                 print("❌ Generate report: FAILED")
+
+            # Analyzing the same tickets again must come from the cache
+            processor.analyze_tickets()
+            analysis_stats = processor.cache_stats()['by_kind'].get('analysis', {})
+            if analysis_stats.get('hits'):
+                print(f"✅ Analysis cache: PASSED ({analysis_stats})")
+            else:
+                print(f"❌ Analysis cache: FAILED ({analysis_stats})")
+
+            # Compact records must analyze exactly like ticket dicts
+            compact_analysis = TicketProcessor(compact=True).analyze_tickets()
+            if compact_analysis == processor.analyze_tickets():
+                print("✅ Compact ticket records: PASSED")
+            else:
+                print("❌ Compact ticket records: FAILED")
+
+            # Below the sketch capacity the approximate counts are exact
+            approximate = processor.analyze_tickets(approximate=True)
+            if (approximate.get('device_analysis') == analysis.get('device_analysis') and
+                    'approximation' in approximate):
+                print(f"✅ Approximate analysis: PASSED ({approximate['approximation']['distinct_emails']})")
+            else:
+                print("❌ Approximate analysis: FAILED")
+
+            # A binary snapshot of the tickets must analyze like the API data
+            with tempfile.TemporaryDirectory() as tmp:
+                snapshot_path = os.path.join(tmp, 'tickets.snap')
+                processor.export_snapshot(snapshot_path)
+                offline = processor.analyze_tickets(snapshot=snapshot_path)
+            if offline.get('status_distribution') == analysis.get('status_distribution'):
+                print("✅ Binary snapshot analysis: PASSED")
+            else:
+                print("❌ Binary snapshot analysis: FAILED")
+
+            # Weekly rollups must account for every timestamped ticket
+            weekly = processor.time_series().buckets('week')
+            timed = analysis.get('time_analysis', {}).get('total_analyzed', 0)
+            if sum(week['created'] for week in weekly) == timed:
+                print(f"✅ Weekly time series: PASSED ({len(weekly)} weeks)")
+            else:
+                print("❌ Weekly time series: FAILED")
+
+            # Searching for a ticket's own description must find that ticket
+            described = next((t for t in processor.tickets if t.get('description')), None)
+            if described:
+                matches = processor.search_tickets('"%s"' % described['description'].replace('"', ' '), limit=len(processor.tickets))
+                if any(match['id'] == described['id'] for match in matches):
+                    print(f"✅ Full-text search: PASSED ({len(matches)} matches)")
+                else:
+                    print("❌ Full-text search: FAILED")
+
+            # A resubmitted ticket must land in a duplicate group with the original
+            if described:
+                resubmitted = dict(described, id='resubmitted-' + str(described['id']),
+                                   email=(described.get('email') or '').upper())
+                detector = processor.duplicate_detector()
+                detector.apply_changes([resubmitted])
+                groups = detector.groups()
+                detector.apply_changes(removed_ids=[resubmitted['id']])
+                if any({described['id'], resubmitted['id']} <= set(group['ids']) for group in groups):
+                    print(f"✅ Duplicate detection: PASSED ({len(groups)} groups)")
+                else:
+                    print("❌ Duplicate detection: FAILED")
+
+            # The work above must show up in the processor's metrics
+            from ticket_processor import render_prometheus
+            metrics = processor.metrics_report()
+            exported = render_prometheus(metrics)
+            if ({'fetch', 'decode', 'analyze'} <= set(metrics['stages']) and
+                    metrics['counters'].get('bytes_fetched') and
+                    'ticket_processor_stage_wall_seconds_total{stage="analyze"}' in exported):
+                print(f"✅ Processor metrics: PASSED ({metrics['counters']['bytes_fetched']} bytes fetched)")
+            else:
+                print(f"❌ Processor metrics: FAILED ({metrics['counters']})")
+
+            # The live counters must agree with the full analysis
+            summary = processor.analyze_tickets(summary_only=True)
+            if (summary.get('total_tickets') == analysis.get('total_tickets') and
+                    summary.get('status_distribution') == analysis.get('status_distribution')):
+                print("✅ Summary from /api/stats: PASSED")
+            else:
+                print(f"❌ Summary from /api/stats: FAILED (Got: {summary.get('status_distribution')})")
+
+            # The same instance listed twice must count every ticket twice
+            from ticket_processor import TicketFleet
+            fleet = TicketFleet([processor.api_base_url,
+                                 processor.api_base_url.replace("localhost", "127.0.0.1")], timeout=5)
+            fleet_analysis = fleet.analyze_tickets(force_refresh=True)
+            if fleet_analysis.get('total_tickets') == 2 * analysis.get('total_tickets', 0):
+                print("✅ Fleet analysis: PASSED")
+            else:
+                print(f"❌ Fleet analysis: FAILED (Hosts: {fleet_analysis.get('hosts')})")
+
+            # A ticket created while following the change feed shows up without a re-fetch
+            import threading
+            follower = TicketProcessor()
+            feed = follower.follow_changes()
+            before = next(feed).get('total_tickets', 0)
+            requests.post(f"{base_url}/tickets", json=test_ticket, timeout=5)
+            received = []
+            # A daemon thread, so a silent feed cannot keep the script alive
+            waiter = threading.Thread(target=lambda: received.append(next(feed)), daemon=True)
+            waiter.start()
+            waiter.join(timeout=10)
+            if received and received[0].get('total_tickets') == before + 1:
+                print("✅ Change feed: PASSED")
+            else:
+                print("❌ Change feed: FAILED (no created event within 10s)")
+
+            # Bulk endpoints create and update many tickets per request
+            if processor.login("admin", "admin123"):
+                created = processor.bulk_create([dict(test_ticket, name=f"Bulk {i}") for i in range(5)],
+                                                chunk_size=2)
+                updated = processor.bulk_update([{"id": ticket["id"], "status": "resolved"} for ticket in created])
+                if (len(created) == 5 and [t["name"] for t in created] == [f"Bulk {i}" for i in range(5)] and
+                        all(ticket["status"] == "resolved" for ticket in updated)):
+                    print("✅ Bulk create/update: PASSED")
+                else:
+                    print(f"❌ Bulk create/update: FAILED (Error: {processor.last_error})")
+            else:
+                print(f"❌ Bulk create/update: FAILED (Error: {processor.last_error})")
         else:
             print("⚠️  No tickets to analyze")
             
@@ -128,5 +276,197 @@ def test_api():
     
     return True
 
+def _serve_tickets(tickets):
+    """Serve `tickets` from GET /api/tickets with an ETag; return (server, api URL, request headers seen)"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    import threading
+
+    body = json.dumps({"success": True, "data": tickets, "count": len(tickets)}).encode()
+    seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            seen.append(dict(self.headers))
+            if self.headers.get('If-None-Match') == '"v1"':
+                self.send_response(304)
+                self.send_header('ETag', '"v1"')
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('ETag', '"v1"')
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/api", seen
+
+
+def test_collection_outlives_cache_budget():
+    """A ticket list larger than the cache budget is still kept and revalidated"""
+    from benchmark_processor import generate_tickets
+    from ticket_processor import TicketProcessor
+
+    print("\n🧪 Testing a ticket list larger than the cache budget")
+    tickets = generate_tickets(2000)
+    server, api_url, seen = _serve_tickets(tickets)
+    try:
+        processor = TicketProcessor(api_url, cache_max_bytes=10_000)
+        fetched = len(processor.fetch_tickets())
+        kept = len(processor.tickets_cache)
+        processor.fetch_tickets(force_refresh=True)
+        revalidated = seen[-1].get('If-None-Match') == '"v1"'
+        found = len(processor.search_tickets('screen'))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    passed = fetched == kept == len(tickets) and revalidated and found > 0
+    if passed:
+        print("✅ Collection outlives cache budget: PASSED")
+    else:
+        print(f"❌ Collection outlives cache budget: FAILED (fetched {fetched}, kept {kept}, "
+              f"revalidated {revalidated}, search hits {found})")
+    assert passed
+
+
+def test_snapshot_unknown_statuses():
+    """Missing and literal 'unknown' statuses analyze the same from a snapshot as from the API"""
+    from benchmark_processor import generate_tickets
+    from ticket_processor import TicketProcessor
+
+    print("\n🧪 Testing snapshot analysis of missing and 'unknown' statuses")
+    tickets = generate_tickets(300)
+    for number, ticket in enumerate(tickets):
+        if number % 7 == 1:
+            del ticket['status']
+        elif number % 11 == 0:
+            ticket['status'] = 'unknown'
+    server, api_url, _ = _serve_tickets(tickets)
+    try:
+        processor = TicketProcessor(api_url)
+        analysis = processor.analyze_tickets()
+        with tempfile.TemporaryDirectory() as tmp:
+            snapshot_path = os.path.join(tmp, 'tickets.snap')
+            processor.export_snapshot(snapshot_path)
+            offline = processor.analyze_tickets(snapshot=snapshot_path)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    # Compared as item lists so the order of tied counts matters too
+    online_counts = list(analysis['status_distribution']['counts'].items())
+    passed = (online_counts == list(offline['status_distribution']['counts'].items())
+              and sum(count for _, count in online_counts) == len(tickets))
+    if passed:
+        print("✅ Snapshot unknown statuses: PASSED")
+    else:
+        print(f"❌ Snapshot unknown statuses: FAILED ({offline['status_distribution']['counts']})")
+    assert passed
+
+
+def _write_ticket_store(path, count, chunk_size=100_000):
+    """Write `count` synthetic tickets to a tickets.json; return a sample of their ids"""
+    from benchmark_processor import generate_tickets
+
+    ids = []
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('[')
+        for chunk_number, start in enumerate(range(0, count, chunk_size)):
+            chunk = generate_tickets(min(chunk_size, count - start), seed=chunk_number)
+            if start:
+                f.write(',')
+            f.write(','.join(json.dumps(ticket, separators=(',', ':')) for ticket in chunk))
+            ids.extend(ticket['id'] for ticket in chunk[:1000])
+        f.write(']')
+    return ids
+
+
+def _start_server(data_dir, timeout=300):
+    """Start server.js on a free port over data_dir; return (process, api URL)"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    env = dict(os.environ, PORT=str(port), TICKET_DATA_DIR=data_dir)
+    server = subprocess.Popen(['node', 'server.js'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    api_url = f"http://127.0.0.1:{port}/api"
+    deadline = time.time() + timeout
+    while time.time() < deadline and server.poll() is None:
+        try:
+            requests.get(f"{api_url}/health", timeout=1)
+            return server, api_url
+        except requests.exceptions.RequestException:
+            time.sleep(0.5)
+    server.kill()
+    raise RuntimeError("server did not start")
+
+
+def _median_ms(func, samples):
+    """Median latency of `samples` calls, in milliseconds"""
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def load_test_lookups(sizes=(1_000, 10_000, 100_000, 1_000_000), samples=200):
+    """Check that id lookups, updates and filtered pages stay flat as the store grows"""
+    print("\n📈 Load Test: ticket lookups vs. store size")
+    print("=" * 50)
+
+    rng = random.Random(0)
+    results = {}
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as data_dir:
+            ids = _write_ticket_store(os.path.join(data_dir, 'tickets.json'), size)
+            server, api_url = _start_server(data_dir)
+            try:
+                session = requests.Session()
+                session.post(f"{api_url}/auth/login", json={"username": "admin", "password": "admin123"}, timeout=5)
+                # A handful of tickets with a rare assignee, answered from the assignee index
+                for ticket_id in ids[:10]:
+                    session.patch(f"{api_url}/tickets/{ticket_id}", json={"assignedTo": "Load Tester"}, timeout=5)
+
+                # Stay under the journal compaction threshold so no snapshot is written mid-test
+                results[size] = {
+                    "get": _median_ms(lambda: session.get(f"{api_url}/tickets/{rng.choice(ids)}", timeout=5), samples),
+                    "patch": _median_ms(lambda: session.patch(f"{api_url}/tickets/{rng.choice(ids)}",
+                                                              json={"priority": rng.choice(["low", "high"])},
+                                                              timeout=5), samples),
+                    "page": _median_ms(lambda: session.get(f"{api_url}/tickets",
+                                                           params={"status": "open", "limit": 50}, timeout=5),
+                                       samples),
+                    "indexed": _median_ms(lambda: session.get(f"{api_url}/tickets",
+                                                              params={"assignedTo": "Load Tester", "limit": 50},
+                                                              timeout=5), samples),
+                }
+            finally:
+                server.terminate()
+                server.wait()
+        print(f"  {size:>9,} tickets: " + ", ".join(f"{name} {ms:.2f} ms" for name, ms in results[size].items()))
+
+    smallest, largest = results[sizes[0]], results[sizes[-1]]
+    # Allow for noise: within 3x of the smallest store, plus 2 ms
+    flat = all(largest[name] <= 3 * smallest[name] + 2 for name in smallest)
+    if flat:
+        print("✅ Lookup latency stays flat: PASSED")
+    else:
+        print("❌ Lookup latency stays flat: FAILED")
+    return flat
+
+
 if __name__ == "__main__":
-    test_api()
+    # python test_app.py --load [sizes...] runs only the load test
+    if "--load" in sys.argv:
+        sizes = [int(arg) for arg in sys.argv[sys.argv.index("--load") + 1:]]
+        load_test_lookups(sizes or (1_000, 10_000, 100_000, 1_000_000))
+    else:
+        test_api()
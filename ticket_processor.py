@@ -10,69 +10,4301 @@ for the ticket management system. It can be used to:
 - Integrate with external systems
 """
 
+import argparse
+import array
+import bisect
 import json
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import datetime
-from typing import List, Dict, Any, Optional
-from collections import Counter
+import codecs
+import contextlib
+import copy
+import functools
+import hashlib
+import heapq
+import operator
+import itertools
+import marshal
+import math
+import mmap
+import os
+import sqlite3
+import sys
+import threading
+import time
+import tracemalloc
+import zlib
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple
+from collections import Counter, OrderedDict, deque, namedtuple
 import re
 
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; only TicketFrame needs it
+    np = None
+
+_NON_DIGITS = re.compile(r'\D')
+_PHONE_PATTERNS = {10: 'US-10-digit', 11: 'US-11-digit'}
+
+
+# Device classification rules as (term, device type, brand), highest
+# priority first. The first matching rule decides the device type; the
+# brand comes from the first matching rule of that type that names one.
+# Terms match whole words, where digits may follow (so 'hp' matches
+# 'HP 15' and 'hp15' but not 'chip').
+# Keep in step with DEVICE_RULES in server.js
+DEFAULT_DEVICE_RULES = [
+    ('iphone', 'iPhone', 'Apple'),
+    ('ios', 'iPhone', 'Apple'),
+    ('samsung', 'Android', 'Samsung'),
+    ('android', 'Android', None),
+    ('galaxy', 'Android', None),
+    ('dell', 'Laptop', 'Dell'),
+    ('hp', 'Laptop', 'HP'),
+    ('lenovo', 'Laptop', 'Lenovo'),
+    ('macbook', 'Laptop', 'Apple'),
+    ('laptop', 'Laptop', None),
+    ('desktop', 'Desktop', None),
+    ('pc', 'Desktop', None),
+]
+
+
+class DeviceClassifier:
+    """Classify device names into (device type, brand) with one regex scan
+
+    The rule table is compiled into a single alternation, so every term is
+    found in one pass over the name. Results are memoized per name in a
+    bounded LRU cache (see classify.cache_info()).
+    """
+
+    def __init__(self, rules: Optional[List[tuple]] = None, cache_size: int = 4096):
+        self.rules = list(DEFAULT_DEVICE_RULES if rules is None else rules)
+        self.cache_size = cache_size
+        # Longer terms go first so a term is not shadowed by its own prefix
+        self._group_rules = sorted(range(len(self.rules)), key=lambda index: -len(self.rules[index][0]))
+        alternation = '|'.join(f'({re.escape(self.rules[index][0].lower())})'
+                               for index in self._group_rules)
+        self._pattern = re.compile(rf'(?<![a-z])(?:{alternation})(?![a-z])')
+        self.classify = functools.lru_cache(maxsize=cache_size)(self._classify)
+
+    def __reduce__(self):
+        # The compiled pattern and LRU wrapper are rebuilt, not pickled
+        return DeviceClassifier, (self.rules, self.cache_size)
+
+    def _classify(self, device_name: str) -> tuple:
+        """Return the (device type, brand) pair for a device name"""
+        group_rules = self._group_rules
+        hits = [group_rules[match.lastindex - 1]
+                for match in self._pattern.finditer(device_name.lower())]
+        if not hits:
+            return None, None
+        hits.sort()
+
+        device_type = self.rules[hits[0]][1]
+        for index in hits:
+            _, rule_type, brand = self.rules[index]
+            if rule_type == device_type and brand:
+                return device_type, brand
+        return device_type, None
+
+
+_DEFAULT_CLASSIFIER = DeviceClassifier()
+
+
+def _classify_phone(phone: str) -> str:
+    """Return the phone pattern label used by the contact analysis"""
+    digits_only = _NON_DIGITS.sub('', phone)
+    return _PHONE_PATTERNS.get(len(digits_only), 'Other')
+
+
+_EPOCH_UTC = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+_EPOCH_NAIVE = datetime.datetime(1970, 1, 1)
+_EPOCH_ORDINAL = _EPOCH_NAIVE.toordinal()
+_MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+def _weekday_names() -> List[str]:
+    """Return strftime('%A') names indexed by weekday() (Monday is 0)"""
+    # 2024-01-01 was a Monday
+    return [datetime.date(2024, 1, 1 + day).strftime('%A') for day in range(7)]
+
+
+# A parsed timestamp: epoch microseconds (naive values are read as UTC), the
+# UTC offset it was written with, whether it was naive, and its local hour
+# and weekday. Tuples order by instant first, so min()/max() work on them.
+ParsedTimestamp = namedtuple('ParsedTimestamp', 'epoch_us offset naive hour weekday')
+
+
+def timestamp_datetime(parsed: ParsedTimestamp) -> datetime.datetime:
+    """Rebuild the datetime that fromisoformat() would have returned"""
+    delta = datetime.timedelta(microseconds=parsed.epoch_us)
+    if parsed.naive:
+        return _EPOCH_NAIVE + delta
+    zone = datetime.timezone(datetime.timedelta(seconds=parsed.offset))
+    return (_EPOCH_UTC + delta).astimezone(zone)
+
+
+class TimestampParser:
+    """Parse ticket timestamps into epoch values, caching every result
+
+    Each string is parsed once and reduced to a ParsedTimestamp, so no
+    datetime objects are kept and no strftime() calls are made. The fixed
+    toISOString() layout that server.js writes is read field by field from
+    its known offsets; anything else goes to datetime.fromisoformat().
+    Results are kept per
+    string, so analyses and reports that revisit the same tickets do not
+    parse them again. The cache is cleared when it reaches max_entries.
+    """
+
+    def __init__(self, max_entries: int = 1_000_000):
+        self.max_entries = max_entries
+        self._cache = {}
+        # YYYY-MM-DD -> days since the epoch, for _parse_iso_millis()
+        self._days = {}
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def parse(self, value: Any) -> Optional[ParsedTimestamp]:
+        """Return the parsed timestamp, or None if it is not a valid ISO string"""
+        if not isinstance(value, str):
+            return None
+        try:
+            return self._cache[value]
+        except KeyError:
+            pass
+
+        parsed = None
+        if len(value) == 24 and value[23] == 'Z' and value[10] == 'T':
+            # toISOString() output as written by server.js is always UTC
+            parsed = self._parse_iso_millis(value)
+        if parsed is None:
+            parsed = self._parse_general(value)
+        if len(self._cache) >= self.max_entries:
+            self._cache.clear()
+            self._days.clear()
+        self._cache[value] = parsed
+        return parsed
+
+    def _parse_iso_millis(self, value: str) -> Optional[ParsedTimestamp]:
+        """Parse YYYY-MM-DDTHH:MM:SS.sssZ as a UTC instant; None if the fields do not fit that layout"""
+        # Many tickets share a day, so the calendar part is worked out once per date
+        date = value[:10]
+        days = self._days.get(date)
+        if days is None:
+            digits = date[0:4] + date[5:7] + date[8:10]
+            # int() would also take signs, underscores and non-ASCII digits
+            if not (date[4] == date[7] == '-' and digits.isdigit() and digits.isascii()):
+                return None
+            try:
+                days = datetime.date(int(digits[0:4]), int(digits[4:6]), int(digits[6:8])).toordinal() - _EPOCH_ORDINAL
+            except ValueError:
+                return None
+            self._days[date] = days
+        clock = value[11:13] + value[14:16] + value[17:19] + value[20:23]
+        if not (value[13] == value[16] == ':' and value[19] == '.' and clock.isdigit() and clock.isascii()):
+            return None
+        # HHMMSSsss as one number
+        hour, clock = divmod(int(clock), 10_000_000)
+        minute, millis = divmod(clock, 100_000)
+        if hour > 23 or minute > 59 or millis >= 60_000:
+            return None
+        epoch_us = (((days * 24 + hour) * 60 + minute) * 60_000 + millis) * 1000
+        # 1970-01-01 was a Thursday (weekday 3)
+        return ParsedTimestamp(epoch_us, 0, False, hour, (days + 3) % 7)
+
+    @staticmethod
+    def _parse_general(value: str) -> Optional[ParsedTimestamp]:
+        """Fall back to fromisoformat() for any other ISO 8601 layout"""
+        try:
+            dt = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+        if dt.tzinfo is None:
+            return ParsedTimestamp((dt - _EPOCH_NAIVE) // _MICROSECOND, 0, True, dt.hour, dt.weekday())
+        return ParsedTimestamp((dt - _EPOCH_UTC) // _MICROSECOND, int(dt.utcoffset().total_seconds()),
+                               False, dt.hour, dt.weekday())
+
+
+_JSON_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class _JsonStreamReader:
+    """Cursor over JSON text that arrives in chunks
+
+    Only the unread tail of the input is buffered, so memory stays bounded
+    by the chunk size plus the largest single value being decoded.
+    """
+
+    def __init__(self, chunks: Iterable[str]):
+        self._chunks = iter(chunks)
+        self._decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the buffer; False once input is exhausted"""
+        for chunk in self._chunks:
+            if chunk:
+                self.buffer = self.buffer[self.pos:] + chunk
+                self.pos = 0
+                return True
+        return False
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ('' at end of input)"""
+        while True:
+            self.pos = _JSON_WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str) -> None:
+        """Consume the given structural character or raise JSONDecodeError"""
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", self.buffer, self.pos)
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # Most likely the value is cut off at the end of the buffer
+                if not self._fill():
+                    raise
+                continue
+            # A number ending exactly at the buffer edge may continue in the next chunk
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def _iter_json_array_items(reader: _JsonStreamReader) -> Iterator[Any]:
+    """Yield the elements of the array starting at the reader's position"""
+    reader.expect('[')
+    if reader.peek() == ']':
+        reader.pos += 1
+        return
+    while True:
+        yield reader.value()
+        if reader.peek() == ',':
+            reader.pos += 1
+        else:
+            reader.expect(']')
+            return
+
+
+def iter_json_array(chunks: Iterable[str], key: str = 'data',
+                    envelope: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+    """Yield the elements of a JSON array one at a time from text chunks
+
+    The document may be the array itself (as in tickets.json) or an object
+    holding the array under `key` (as in the {"success": ..., "data": [...]}
+    API response). Other top-level members of such an object are stored in
+    `envelope`, when given, as they are decoded.
+    """
+    reader = _JsonStreamReader(chunks)
+    if reader.peek() == '[':
+        yield from _iter_json_array_items(reader)
+        return
+
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+    while True:
+        name = reader.value()
+        reader.expect(':')
+        if name == key and reader.peek() == '[':
+            yield from _iter_json_array_items(reader)
+        else:
+            value = reader.value()
+            if envelope is not None:
+                envelope[name] = value
+        if reader.peek() == ',':
+            reader.pos += 1
+        else:
+            reader.expect('}')
+            return
+
+
+def _decode_utf8(byte_chunks: Iterable[bytes]) -> Iterator[str]:
+    """Decode a stream of UTF-8 byte chunks, handling split characters"""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    for chunk in byte_chunks:
+        yield decoder.decode(chunk)
+    yield decoder.decode(b'', final=True)
+
+
+def _split_lines(text_chunks: Iterable[str]) -> Iterator[str]:
+    """Split streamed text into lines ending in \n or \r\n, across chunk boundaries"""
+    pending = ''
+    for chunk in text_chunks:
+        pending += chunk
+        if '\n' in pending:
+            *lines, pending = pending.split('\n')
+            for line in lines:
+                yield line[:-1] if line.endswith('\r') else line
+    if pending:
+        yield pending
+
+
+def iter_sse_events(lines: Iterable[str]) -> Iterator[Tuple[Optional[str], str, str]]:
+    """Parse Server-Sent Events lines into (id, event, data) tuples
+
+    Comment lines (heartbeats) and `retry:` fields are skipped; an event
+    without an `event:` field is reported as "message".
+    """
+    event_id, event, data = None, None, []
+    for line in lines:
+        if not line:
+            if data or event:
+                yield event_id, event or 'message', '\n'.join(data)
+            event, data = None, []
+            continue
+        if line.startswith(':'):
+            continue
+        field, _, value = line.partition(':')
+        if value.startswith(' '):
+            value = value[1:]
+        if field == 'data':
+            data.append(value)
+        elif field == 'event':
+            event = value
+        elif field == 'id':
+            event_id = value
+
+
+def _subtract_counts(counter: Counter, other: Counter) -> None:
+    """Subtract counts in place, dropping keys that reach zero"""
+    for key, count in other.items():
+        remaining = counter[key] - count
+        if remaining > 0:
+            counter[key] = remaining
+        else:
+            del counter[key]
+
+
+class SpaceSavingCounter(Counter):
+    """Counter holding at most 2 x capacity keys, for approximate top-k counts
+
+    Keys are counted exactly until twice capacity of them are held; then
+    every count is lowered by the (capacity + 1)-th largest and keys that
+    reach zero are dropped. This is the Misra-Gries form of Space-Saving,
+    pruned in batches so each increment stays O(1) amortized. A stored
+    count is never above the true count and at most error below it, and
+    error never exceeds total / (capacity + 1), so any key seen more often
+    than that is kept. Summaries merge with update(), adding their errors.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.error = 0
+        self._limit = 2 * capacity
+        super().__init__()
+
+    def __setitem__(self, key: Any, count: int) -> None:
+        dict.__setitem__(self, key, count)
+        if len(self) > self._limit:
+            self._prune()
+
+    def update(self, iterable: Any = None, /, **kwds: Any) -> None:
+        super().update(iterable, **kwds)
+        if isinstance(iterable, SpaceSavingCounter):
+            self.error += iterable.error
+        if len(self) > self._limit:
+            self._prune()
+
+    def _prune(self) -> None:
+        """Lower every count by the (capacity + 1)-th largest, dropping what reaches zero"""
+        floor = heapq.nlargest(self.capacity + 1, self.values())[-1]
+        kept = [(key, count - floor) for key, count in self.items() if count > floor]
+        dict.clear(self)
+        dict.update(self, kept)
+        self.error += floor
+
+    def copy(self) -> 'SpaceSavingCounter':
+        duplicate = SpaceSavingCounter(self.capacity)
+        dict.update(duplicate, self)
+        duplicate.error = self.error
+        return duplicate
+
+    def __reduce__(self) -> tuple:
+        return self.__class__, (self.capacity,), {'error': self.error}, None, iter(dict.items(self))
+
+
+# 2**-rank for every register value HyperLogLog can hold
+_HLL_POWERS = [2.0 ** -rank for rank in range(66)]
+
+
+class HyperLogLog:
+    """Estimate how many distinct strings were added, in 2**precision bytes
+
+    Each string is hashed to 64 bits; the first precision bits pick a
+    register, which keeps the longest run of leading zeros seen in the
+    rest. The estimate has a standard error of 1.04 / sqrt(2**precision)
+    (1.6% at the default precision of 12, using 4 KiB), and small counts
+    fall back to linear counting. Sketches of the same precision merge
+    losslessly with merge().
+    """
+
+    def __init__(self, precision: int = 12):
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value: str) -> None:
+        """Count one string"""
+        hashed = int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), 'big')
+        width = 64 - self.precision
+        index = hashed >> width
+        rank = width - (hashed & ((1 << width) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        """Fold another sketch of the same precision into this one"""
+        if other.precision != self.precision:
+            raise ValueError("Only HyperLogLog sketches of the same precision can be merged")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    @property
+    def relative_error(self) -> float:
+        """Standard error of estimate(), relative to the true count"""
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def estimate(self) -> int:
+        """Return the estimated number of distinct strings added"""
+        registers = self.registers
+        size = len(registers)
+        alpha = 0.7213 / (1 + 1.079 / size)
+        raw = alpha * size * size / sum(_HLL_POWERS[rank] for rank in registers)
+        empty = registers.count(0)
+        if raw <= 2.5 * size and empty:
+            return round(size * math.log(size / empty))
+        # 64-bit hashes make the large-range correction unnecessary
+        return round(raw)
+
+
+# Stands in for a field the ticket dict did not have, so get() can return the default
+_ABSENT = object()
+# TicketRecord._details after a failed load; never mutated
+_DETAILS_FAILED: Dict[str, Any] = {}
+
+
+class TicketRecord:
+    """Compact, read-only stand-in for a ticket dict
+
+    Only the fields the analyses and caches read are kept, in __slots__,
+    and repeated strings (status, priority, device name, assignee) are
+    interned so each distinct value is stored once. description and notes
+    are dropped; the first time either is asked for, `loader` (called with
+    the ticket id, returning the full ticket dict or None) fetches them.
+    get() and [] take the API's field names, so a record works wherever
+    tickets are only read.
+    """
+
+    __slots__ = ('id', 'name', 'phone', 'email', 'device_name', 'status', 'priority',
+                 'assigned_to', 'created_at', 'updated_at', '_details', '_loader')
+
+    # API field name -> slot, for the fields kept on the record
+    FIELDS = {
+        'id': 'id', 'name': 'name', 'phone': 'phone', 'email': 'email',
+        'deviceName': 'device_name', 'status': 'status', 'priority': 'priority',
+        'assignedTo': 'assigned_to', 'createdAt': 'created_at', 'updatedAt': 'updated_at',
+    }
+    # Fields loaded on first use
+    LAZY_FIELDS = ('description', 'notes')
+
+    def __init__(self, ticket: Dict[str, Any], loader: Optional[Any] = None):
+        # Spelled out rather than looped over FIELDS: this runs once per fetched ticket
+        get = ticket.get
+        intern = sys.intern
+        self.id = get('id', _ABSENT)
+        self.name = get('name', _ABSENT)
+        self.phone = get('phone', _ABSENT)
+        self.email = get('email', _ABSENT)
+        value = get('deviceName', _ABSENT)
+        self.device_name = intern(value) if type(value) is str else value
+        value = get('status', _ABSENT)
+        self.status = intern(value) if type(value) is str else value
+        value = get('priority', _ABSENT)
+        self.priority = intern(value) if type(value) is str else value
+        value = get('assignedTo', _ABSENT)
+        self.assigned_to = intern(value) if type(value) is str else value
+        self.created_at = get('createdAt', _ABSENT)
+        self.updated_at = get('updatedAt', _ABSENT)
+        self._details = None
+        self._loader = loader
+
+    def get(self, field: str, default: Any = None) -> Any:
+        """Return a field by its API name, like dict.get"""
+        slot = self.FIELDS.get(field)
+        if slot is not None:
+            value = getattr(self, slot)
+            return default if value is _ABSENT else value
+        if field in self.LAZY_FIELDS:
+            details = self._load_details()
+            if details is not None and field in details:
+                return details[field]
+        return default
+
+    def __getitem__(self, field: str) -> Any:
+        value = self.get(field, _ABSENT)
+        if value is _ABSENT:
+            raise KeyError(field)
+        return value
+
+    def __contains__(self, field: str) -> bool:
+        if field in self.LAZY_FIELDS:
+            # Answered without fetching: lazy fields count as present until a load says otherwise
+            details = self._details
+            return details is None or field in details
+        return self.get(field, _ABSENT) is not _ABSENT
+
+    def __repr__(self) -> str:
+        return f"TicketRecord(id={self.id!r}, status={self.status!r})"
+
+    def __sizeof__(self) -> int:
+        # Interned strings are shared, so only the record's own strings count
+        size = object.__sizeof__(self)
+        for slot in ('id', 'name', 'phone', 'email', 'created_at', 'updated_at'):
+            value = getattr(self, slot)
+            if value is not _ABSENT:
+                size += sys.getsizeof(value)
+        return size
+
+    def __getstate__(self) -> tuple:
+        # The loader (usually a bound TicketProcessor method) is not pickled
+        details = None if self._details is _DETAILS_FAILED else self._details
+        return tuple(getattr(self, slot) for slot in self.FIELDS.values()) + (details,)
+
+    def __setstate__(self, state: tuple) -> None:
+        for slot, value in zip(self.FIELDS.values(), state):
+            setattr(self, slot, value)
+        self._details = state[-1]
+        self._loader = None
+
+    @property
+    def details_loaded(self) -> bool:
+        """Whether description and notes have been loaded"""
+        return self._details is not None and self._details is not _DETAILS_FAILED
+
+    def _load_details(self) -> Optional[Dict[str, Any]]:
+        """Fetch description and notes once; None if they cannot be loaded
+
+        A failed load is remembered, so it is not retried (and last_error
+        not overwritten) on every later read of either field.
+        """
+        if self._details is None and self._loader is not None and self.id is not _ABSENT:
+            ticket = self._loader(self.id)
+            if ticket is not None:
+                self._details = {field: ticket[field] for field in self.LAZY_FIELDS if field in ticket}
+            else:
+                self._details = _DETAILS_FAILED
+        return None if self._details is _DETAILS_FAILED else self._details
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the record as a ticket dict, with description and notes only if loaded"""
+        ticket = {field: getattr(self, slot) for field, slot in self.FIELDS.items()
+                  if getattr(self, slot) is not _ABSENT}
+        if self._details is not None and self._details is not _DETAILS_FAILED:
+            ticket.update(self._details)
+        return ticket
+
+
+class TicketAnalyzer:
+    """Single-pass accumulator for every ticket analysis section
+
+    Each ticket is folded into running counters as it is added, so the
+    status, device, time and contact sections are produced from one walk
+    over the data instead of one walk (and one intermediate list) each.
+    The output of result() matches the TicketProcessor._analyze_* helpers.
+
+    With sketch_capacity set, device names and email domains are counted
+    in SpaceSavingCounters of that capacity instead of exact Counters, and
+    distinct emails and phone numbers are estimated with HyperLogLogs of
+    hll_precision; memory then stays bounded however many distinct values
+    the tickets hold. result() gains distinct_emails/distinct_phones and an
+    "approximation" section with the error bounds. Approximate analyzers
+    merge but cannot subtract.
+    """
+
+    def __init__(self, track_timestamps: bool = False,
+                 device_classifier: Optional[DeviceClassifier] = None,
+                 timestamp_parser: Optional[TimestampParser] = None,
+                 sketch_capacity: Optional[int] = None, hll_precision: int = 12):
+        self.device_classifier = device_classifier or _DEFAULT_CLASSIFIER
+        # An empty parser is falsy (it has __len__), so test for None
+        self.timestamp_parser = timestamp_parser if timestamp_parser is not None else TimestampParser()
+        self.total_tickets = 0
+        self.sketch_capacity = sketch_capacity
+        self.status_counts = Counter()
+        self.device_counts = Counter() if sketch_capacity is None else SpaceSavingCounter(sketch_capacity)
+        self.device_type_counts = Counter()
+        self.brand_counts = Counter()
+        self.total_devices = 0
+        self.hour_counts = Counter()
+        self.day_counts = Counter()
+        self.total_timestamps = 0
+        self.earliest = None
+        self.latest = None
+        self.total_emails = 0
+        self.domain_counts = Counter() if sketch_capacity is None else SpaceSavingCounter(sketch_capacity)
+        self.total_phones = 0
+        self.phone_pattern_counts = Counter()
+        # Distinct customers, only estimated in approximate mode
+        self.email_sketch = self.phone_sketch = None
+        if sketch_capacity is not None:
+            self.email_sketch = HyperLogLog(hll_precision)
+            self.phone_sketch = HyperLogLog(hll_precision)
+        # Per-timestamp counts let the date range survive removals
+        self.timestamp_counts = Counter() if track_timestamps else None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Partials come back from worker processes; the parser's cache only
+        # holds that worker's strings and is not worth shipping
+        state = self.__dict__.copy()
+        del state['timestamp_parser']
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.timestamp_parser = TimestampParser()
+
+    def add(self, ticket: Dict[str, Any]) -> None:
+        """Fold a single ticket into the running aggregates"""
+        self.add_many((ticket,))
+
+    def add_many(self, tickets: Iterable[Dict[str, Any]]) -> 'TicketAnalyzer':
+        """Fold every ticket from an iterable (list or generator) into the aggregates"""
+        # Bind everything the loop touches to locals; attribute lookups
+        # per ticket cost more than the counting itself.
+        status_counts = self.status_counts
+        device_counts = self.device_counts
+        device_type_counts = self.device_type_counts
+        brand_counts = self.brand_counts
+        hour_counts = self.hour_counts
+        day_counts = self.day_counts
+        domain_counts = self.domain_counts
+        phone_pattern_counts = self.phone_pattern_counts
+        email_sketch, phone_sketch = self.email_sketch, self.phone_sketch
+        classify = self.device_classifier.classify
+        # Lowercased name and classification per raw name seen in this batch
+        seen_devices = {}
+        timestamp_counts = self.timestamp_counts
+        parse_timestamp = self.timestamp_parser.parse
+        strip_non_digits = _NON_DIGITS.sub
+        phone_pattern = _PHONE_PATTERNS.get
+        day_names = _weekday_names()
+        earliest, latest = self.earliest, self.latest
+        earliest_us = earliest.epoch_us if earliest is not None else float('inf')
+        latest_us = latest.epoch_us if latest is not None else float('-inf')
+        total_tickets = total_devices = total_timestamps = total_emails = total_phones = 0
+
+        for ticket in tickets:
+            get = ticket.get
+            total_tickets += 1
+            status = get('status', 'unknown')
+            status_counts[status] = status_counts[status] + 1
+
+            device_name = get('deviceName')
+            if device_name:
+                seen = seen_devices.get(device_name)
+                if seen is None:
+                    device = device_name.lower()
+                    seen = seen_devices[device_name] = (device,) + classify(device)
+                device, device_type, brand = seen
+                total_devices += 1
+                device_counts[device] = device_counts[device] + 1
+                if device_type:
+                    device_type_counts[device_type] = device_type_counts[device_type] + 1
+                if brand:
+                    brand_counts[brand] = brand_counts[brand] + 1
+
+            created_at = get('createdAt')
+            if created_at:
+                parsed = parse_timestamp(created_at)
+                if parsed is not None:
+                    total_timestamps += 1
+                    epoch_us, _, _, hour, weekday = parsed
+                    hour_counts[hour] = hour_counts[hour] + 1
+                    day = day_names[weekday]
+                    day_counts[day] = day_counts[day] + 1
+                    if timestamp_counts is not None:
+                        timestamp_counts[parsed] = timestamp_counts[parsed] + 1
+                    if epoch_us < earliest_us:
+                        earliest, earliest_us = parsed, epoch_us
+                    if epoch_us > latest_us:
+                        latest, latest_us = parsed, epoch_us
+
+            email = get('email')
+            if email:
+                total_emails += 1
+                if email_sketch is not None:
+                    email_sketch.add(email.lower())
+                if '@' in email:
+                    domain = email.split('@')[1].lower()
+                    domain_counts[domain] = domain_counts[domain] + 1
+
+            phone = get('phone')
+            if phone:
+                total_phones += 1
+                digits = strip_non_digits('', phone)
+                pattern = phone_pattern(len(digits), 'Other')
+                if phone_sketch is not None:
+                    phone_sketch.add(digits)
+                phone_pattern_counts[pattern] = phone_pattern_counts[pattern] + 1
+
+        self.total_tickets += total_tickets
+        self.total_devices += total_devices
+        self.total_timestamps += total_timestamps
+        self.total_emails += total_emails
+        self.total_phones += total_phones
+        self.earliest, self.latest = earliest, latest
+        return self
+
+    def _counters(self) -> List[Counter]:
+        """Return every per-key counter, in a fixed order"""
+        return [self.status_counts, self.device_counts, self.device_type_counts,
+                self.brand_counts, self.hour_counts, self.day_counts,
+                self.domain_counts, self.phone_pattern_counts]
+
+    def merge(self, other: 'TicketAnalyzer') -> 'TicketAnalyzer':
+        """Add the aggregates of another analyzer into this one"""
+        for mine, theirs in zip(self._counters(), other._counters()):
+            mine.update(theirs)
+        self.total_tickets += other.total_tickets
+        self.total_devices += other.total_devices
+        self.total_timestamps += other.total_timestamps
+        self.total_emails += other.total_emails
+        self.total_phones += other.total_phones
+        if other.earliest is not None and (self.earliest is None or
+                                           other.earliest.epoch_us < self.earliest.epoch_us):
+            self.earliest = other.earliest
+        if other.latest is not None and (self.latest is None or
+                                         other.latest.epoch_us > self.latest.epoch_us):
+            self.latest = other.latest
+        if self.timestamp_counts is not None and other.timestamp_counts is not None:
+            self.timestamp_counts.update(other.timestamp_counts)
+        if self.email_sketch is not None and other.email_sketch is not None:
+            self.email_sketch.merge(other.email_sketch)
+            self.phone_sketch.merge(other.phone_sketch)
+        return self
+
+    def subtract(self, other: 'TicketAnalyzer') -> 'TicketAnalyzer':
+        """Remove the aggregates of another analyzer from this one
+
+        Both analyzers must track timestamps so the date range can be
+        repaired when its earliest or latest ticket goes away.
+        """
+        if self.timestamp_counts is None or other.timestamp_counts is None:
+            raise ValueError("subtract() requires analyzers created with track_timestamps=True")
+        if self.sketch_capacity is not None or other.sketch_capacity is not None:
+            raise ValueError("Approximate analyzers cannot subtract; sketches only support merging")
+
+        for mine, theirs in zip(self._counters(), other._counters()):
+            _subtract_counts(mine, theirs)
+        _subtract_counts(self.timestamp_counts, other.timestamp_counts)
+        self.total_tickets -= other.total_tickets
+        self.total_devices -= other.total_devices
+        self.total_timestamps -= other.total_timestamps
+        self.total_emails -= other.total_emails
+        self.total_phones -= other.total_phones
+
+        # Only rescan the remaining timestamps if an endpoint was removed
+        if self.earliest is not None and self.earliest not in self.timestamp_counts:
+            self.earliest = min(self.timestamp_counts) if self.timestamp_counts else None
+        if self.latest is not None and self.latest not in self.timestamp_counts:
+            self.latest = max(self.timestamp_counts) if self.timestamp_counts else None
+        return self
+
+    def status_distribution(self) -> Dict[str, Any]:
+        """Build the status distribution section"""
+        total = self.total_tickets
+        return {
+            "counts": dict(self.status_counts),
+            "percentages": {status: round((count/total)*100, 1)
+                          for status, count in self.status_counts.items()}
+        }
+
+    def device_analysis(self) -> Dict[str, Any]:
+        """Build the device analysis section"""
+        return {
+            "total_devices": self.total_devices,
+            "device_types": dict(self.device_type_counts),
+            "brands": dict(self.brand_counts),
+            "most_common_devices": dict(self.device_counts.most_common(5))
+        }
+
+    def time_analysis(self) -> Dict[str, Any]:
+        """Build the time pattern section"""
+        if not self.total_timestamps:
+            return {"error": "No valid timestamps found"}
+
+        return {
+            "total_analyzed": self.total_timestamps,
+            "busiest_hours": dict(self.hour_counts.most_common(5)),
+            "busiest_days": dict(self.day_counts),
+            "date_range": {
+                "earliest": timestamp_datetime(self.earliest).isoformat(),
+                "latest": timestamp_datetime(self.latest).isoformat()
+            }
+        }
+
+    def contact_analysis(self) -> Dict[str, Any]:
+        """Build the contact information section"""
+        section = {
+            "total_emails": self.total_emails,
+            "email_domains": dict(self.domain_counts.most_common(10)),
+            "total_phones": self.total_phones,
+            "phone_patterns": dict(self.phone_pattern_counts)
+        }
+        if self.email_sketch is not None:
+            section["distinct_emails"] = self.email_sketch.estimate()
+            section["distinct_phones"] = self.phone_sketch.estimate()
+        return section
+
+    def approximation(self) -> Dict[str, Any]:
+        """Describe how far the sketched counts can be from the exact ones"""
+        return {
+            # Reported counts are at most max_undercount below the true ones
+            "most_common_devices": {"capacity": self.sketch_capacity,
+                                    "max_undercount": self.device_counts.error},
+            "email_domains": {"capacity": self.sketch_capacity,
+                              "max_undercount": self.domain_counts.error},
+            # One standard error, relative to the estimate
+            "distinct_emails": {"relative_error": round(self.email_sketch.relative_error, 4)},
+            "distinct_phones": {"relative_error": round(self.phone_sketch.relative_error, 4)},
+        }
+
+    def result(self) -> Dict[str, Any]:
+        """Return the analysis sections in the layout used by analyze_tickets"""
+        result = {
+            "total_tickets": self.total_tickets,
+            "status_distribution": self.status_distribution(),
+            "device_analysis": self.device_analysis(),
+            "time_analysis": self.time_analysis(),
+            "contact_analysis": self.contact_analysis(),
+            "summary": {}
+        }
+        if self.sketch_capacity is not None:
+            result["approximation"] = self.approximation()
+        return result
+
+
+class _IncrementalSync:
+    """Shared change tracking for structures kept in step with the ticket list
+
+    snapshot maps each ticket's key to (updatedAt, state), where state is
+    whatever the structure needs to take the ticket out again. sync() and
+    apply_changes() work out which tickets were added, changed or removed
+    and call the hooks: _upsert() for a new or changed ticket (returning
+    its state), _remove() for a deleted one, and _changes_applied() once
+    per call. A hook that raises leaves that ticket's snapshot entry as it was.
+    """
+
+    # Re-point unchanged entries at the fresh dict on sync(), for states that hold the ticket itself
+    _KEEP_LATEST = False
+
+    @staticmethod
+    def _ticket_key(ticket: Dict[str, Any]) -> Any:
+        """Return the snapshot key for a ticket"""
+        # Tickets without an id cannot be matched across fetches
+        ticket_id = ticket.get('id')
+        return ticket_id if ticket_id is not None else id(ticket)
+
+    def sync(self, tickets: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """Bring the structure in line with a full ticket list
+
+        Returns how many tickets were added, changed and removed.
+        """
+        snapshot = self.snapshot
+        ticket_key = self._ticket_key
+        keep_latest = self._KEEP_LATEST
+        seen = set()
+        upserts = []
+        for ticket in tickets:
+            key = ticket_key(ticket)
+            seen.add(key)
+            previous = snapshot.get(key)
+            if previous is None or previous[0] != ticket.get('updatedAt'):
+                upserts.append(ticket)
+            elif keep_latest:
+                # Lets the superseded dict be freed
+                snapshot[key] = (previous[0], ticket)
+        counts = self.apply_changes(upserts)
+        if len(snapshot) > len(seen):
+            removed = self.apply_changes(removed_ids=[key for key in snapshot if key not in seen])
+            counts["removed"] = removed["removed"]
+        return counts
+
+    def apply_changes(self, upserts: Iterable[Dict[str, Any]] = (),
+                      removed_ids: Iterable[Any] = ()) -> Dict[str, int]:
+        """Apply a known delta: created/updated tickets and deleted ticket ids
+
+        Upserts whose updatedAt matches the stored version are ignored.
+        Returns how many tickets were added, changed and removed.
+        """
+        snapshot = self.snapshot
+        ticket_key = self._ticket_key
+        added = changed = removed = 0
+
+        for ticket in upserts:
+            key = ticket_key(ticket)
+            updated_at = ticket.get('updatedAt')
+            previous = snapshot.get(key)
+            if previous is not None and previous[0] == updated_at:
+                continue
+            state = self._upsert(key, ticket, previous)
+            if previous is None:
+                added += 1
+            else:
+                changed += 1
+            snapshot[key] = (updated_at, state)
+
+        for ticket_id in removed_ids:
+            previous = snapshot.pop(ticket_id, None)
+            if previous is not None:
+                self._remove(ticket_id, previous[1])
+                removed += 1
+
+        counts = {"added": added, "changed": changed, "removed": removed}
+        self._changes_applied(counts)
+        return counts
+
+    def _upsert(self, key: Any, ticket: Dict[str, Any], previous: Optional[tuple]) -> Any:
+        """Take in a new or changed ticket (previous is its old snapshot entry); return its state"""
+        raise NotImplementedError
+
+    def _remove(self, key: Any, state: Any) -> None:
+        """Take out a deleted ticket, given the state _upsert() returned for it"""
+        raise NotImplementedError
+
+    def _changes_applied(self, counts: Dict[str, int]) -> None:
+        """Called once at the end of every apply_changes()"""
+
+
+class IncrementalTicketAnalyzer(_IncrementalSync, TicketAnalyzer):
+    """TicketAnalyzer that applies ticket deltas instead of starting over
+
+    The analyzer remembers the version of every ticket it has folded in,
+    keyed by id. Syncing with a newer ticket list only touches tickets
+    that were added, removed or whose updatedAt changed, so the counter
+    updates cost O(changes) rather than O(all tickets).
+
+    Ties at the top-N cut-offs (busiest hours, most common devices and
+    domains) are ordered by when a key was first counted, which after
+    removals can differ from a full recompute over the same tickets.
+    """
+
+    _KEEP_LATEST = True
+
+    def __init__(self, device_classifier: Optional[DeviceClassifier] = None,
+                 timestamp_parser: Optional[TimestampParser] = None):
+        super().__init__(True, device_classifier, timestamp_parser)
+        # Ticket key -> (updatedAt, ticket as last folded in)
+        self.snapshot = {}
+        # Ticket versions to fold in and back out at the end of apply_changes()
+        self._incoming, self._outgoing = [], []
+
+    def _upsert(self, key: Any, ticket: Dict[str, Any], previous: Optional[tuple]) -> Dict[str, Any]:
+        self._incoming.append(ticket)
+        if previous is not None:
+            self._outgoing.append(previous[1])
+        return ticket
+
+    def _remove(self, key: Any, ticket: Dict[str, Any]) -> None:
+        self._outgoing.append(ticket)
+
+    def _changes_applied(self, counts: Dict[str, int]) -> None:
+        incoming, outgoing = self._incoming, self._outgoing
+        self._incoming, self._outgoing = [], []
+        self._apply(incoming, outgoing)
+
+    def _apply(self, incoming: List[Dict[str, Any]], outgoing: List[Dict[str, Any]]) -> None:
+        """Fold in new ticket versions and back out old ones"""
+        # Adding before subtracting keeps a changed ticket's unchanged
+        # timestamp from briefly dropping to zero and forcing a rescan.
+        if incoming:
+            self.merge(self._delta_analyzer().add_many(incoming))
+        if outgoing:
+            self.subtract(self._delta_analyzer().add_many(outgoing))
+
+    def _delta_analyzer(self) -> TicketAnalyzer:
+        """Return an empty analyzer sharing this one's classifier and parser"""
+        return TicketAnalyzer(True, self.device_classifier, self.timestamp_parser)
+
+
+def _iso_utc(epoch_us: int) -> str:
+    """Format epoch microseconds as an ISO 8601 UTC timestamp"""
+    return (_EPOCH_UTC + datetime.timedelta(microseconds=epoch_us)).isoformat()
+
+
+_HOUR_US = 3_600_000_000
+_DAY_US = 24 * _HOUR_US
+_WEEK_US = 7 * _DAY_US
+# 1970-01-01 was a Thursday; weeks start on the Monday four days later
+_WEEK_ORIGIN_US = 4 * _DAY_US
+# Statuses that mean a ticket is no longer part of the open backlog
+RESOLVED_STATUSES = frozenset(('resolved', 'closed'))
+
+
+class TicketTimeSeries(_IncrementalSync):
+    """Hour, day and week rollups of ticket volume, resolutions and backlog
+
+    Each ticket is counted once in the UTC hour it was created, and once
+    more in the hour it was resolved. The API keeps no status history, so
+    a ticket whose status is resolved or closed is taken to have been
+    resolved at its updatedAt. Day and week rollups (weeks start on
+    Monday) and their running totals are built from the hourly buckets on
+    first use, so range and sliding-window queries are answered with a
+    couple of bisects instead of a pass over the tickets.
+
+    Like IncrementalTicketAnalyzer, the series remembers what every ticket
+    contributed, keyed by id, so sync() and apply_changes() only touch
+    tickets that were added, changed or removed.
+    """
+
+    GRANULARITIES = {'hour': _HOUR_US, 'day': _DAY_US, 'week': _WEEK_US}
+
+    def __init__(self, timestamp_parser: Optional[TimestampParser] = None):
+        self.timestamp_parser = timestamp_parser if timestamp_parser is not None else TimestampParser()
+        # Hour start (epoch microseconds) -> [created, resolved, resolution time, status counts]
+        self.hours = {}
+        # Ticket key -> (updatedAt, contribution) as passed to _fold()
+        self.snapshot = {}
+        # Tickets without a parseable createdAt, which no bucket can hold
+        self.skipped = 0
+        self._rollups = {}
+
+    def __len__(self) -> int:
+        return len(self.snapshot)
+
+    def _upsert(self, key: Any, ticket: Dict[str, Any], previous: Optional[tuple]) -> Optional[tuple]:
+        if previous is not None:
+            self._fold(previous[1], -1)
+        contribution = self._contribution(ticket)
+        self._fold(contribution, 1)
+        return contribution
+
+    def _remove(self, key: Any, contribution: Optional[tuple]) -> None:
+        self._fold(contribution, -1)
+
+    def _changes_applied(self, counts: Dict[str, int]) -> None:
+        if any(counts.values()):
+            self._rollups.clear()
+
+    def _contribution(self, ticket: Dict[str, Any]) -> Optional[tuple]:
+        """Return (created hour, resolved hour or None, resolution time, status) for a ticket"""
+        parse = self.timestamp_parser.parse
+        created = parse(ticket.get('createdAt'))
+        if created is None:
+            return None
+        status = ticket.get('status', 'unknown')
+        created_hour = created.epoch_us - created.epoch_us % _HOUR_US
+        if status not in RESOLVED_STATUSES:
+            return created_hour, None, 0, status
+        # A resolved ticket with no usable updatedAt is taken as resolved on creation
+        resolved = parse(ticket.get('updatedAt')) or created
+        resolved_us = max(resolved.epoch_us, created.epoch_us)
+        return (created_hour, resolved_us - resolved_us % _HOUR_US,
+                resolved_us - created.epoch_us, status)
+
+    def _fold(self, contribution: Optional[tuple], delta: int) -> None:
+        """Add (delta=1) or remove (delta=-1) one ticket's contribution"""
+        if contribution is None:
+            self.skipped += delta
+            return
+        created_hour, resolved_hour, resolution_us, status = contribution
+        bucket = self._bucket(created_hour)
+        bucket[0] += delta
+        statuses = bucket[3]
+        statuses[status] += delta
+        if not statuses[status]:
+            del statuses[status]
+        if resolved_hour is not None:
+            resolved_bucket = self._bucket(resolved_hour)
+            resolved_bucket[1] += delta
+            resolved_bucket[2] += delta * resolution_us
+        for hour in (created_hour, resolved_hour):
+            bucket = self.hours.get(hour)
+            if bucket is not None and not bucket[0] and not bucket[1]:
+                del self.hours[hour]
+
+    def _bucket(self, hour: int) -> list:
+        """Return the hourly bucket starting at hour, creating it if needed"""
+        bucket = self.hours.get(hour)
+        if bucket is None:
+            bucket = self.hours[hour] = [0, 0, 0, Counter()]
+        return bucket
+
+    @classmethod
+    def _floor(cls, epoch_us: int, granularity: str) -> int:
+        """Return the start of the bucket holding epoch_us"""
+        size = cls.GRANULARITIES[granularity]
+        if granularity == 'week':
+            return epoch_us - (epoch_us - _WEEK_ORIGIN_US) % size
+        return epoch_us - epoch_us % size
+
+    def _rollup(self, granularity: str) -> tuple:
+        """Return bucket starts and running totals for a granularity, built once per change"""
+        if granularity not in self.GRANULARITIES:
+            raise ValueError(f"Unknown granularity {granularity!r}; "
+                             f"expected one of {', '.join(self.GRANULARITIES)}")
+        rollup = self._rollups.get(granularity)
+        if rollup is not None:
+            return rollup
+
+        merged = {}
+        for hour, (created, resolved, resolution_us, statuses) in self.hours.items():
+            start = self._floor(hour, granularity)
+            bucket = merged.get(start)
+            if bucket is None:
+                bucket = merged[start] = [0, 0, 0, Counter()]
+            bucket[0] += created
+            bucket[1] += resolved
+            bucket[2] += resolution_us
+            bucket[3].update(statuses)
+
+        starts = sorted(merged)
+        status_names = sorted({status for bucket in merged.values() for status in bucket[3]})
+        # totals[i] sums buckets before starts[i]: created, resolved, resolution time, then statuses
+        row = [0] * (3 + len(status_names))
+        totals = [tuple(row)]
+        for start in starts:
+            created, resolved, resolution_us, statuses = merged[start]
+            row[0] += created
+            row[1] += resolved
+            row[2] += resolution_us
+            for index, status in enumerate(status_names, 3):
+                row[index] += statuses.get(status, 0)
+            totals.append(tuple(row))
+
+        rollup = self._rollups[granularity] = (starts, totals, status_names)
+        return rollup
+
+    def _epoch_us(self, value: Any) -> int:
+        """Convert an ISO string or datetime query bound to epoch microseconds"""
+        if isinstance(value, datetime.datetime):
+            if value.tzinfo is None:
+                return (value - _EPOCH_NAIVE) // _MICROSECOND
+            return (value - _EPOCH_UTC) // _MICROSECOND
+        parsed = self.timestamp_parser.parse(value)
+        if parsed is None:
+            raise ValueError(f"Invalid time bound {value!r}; expected an ISO 8601 string or datetime")
+        return parsed.epoch_us
+
+    def _bounds(self, granularity: str, start: Any, end: Any) -> Tuple[int, int]:
+        """Return bucket-aligned [start, end) bounds, defaulting to the data's extent"""
+        starts = self._rollup(granularity)[0]
+        size = self.GRANULARITIES[granularity]
+        if start is None:
+            start = starts[0] if starts else 0
+        else:
+            start = self._floor(self._epoch_us(start), granularity)
+        if end is None:
+            end = starts[-1] + size if starts else start
+        else:
+            # A bound inside a bucket includes that whole bucket
+            end_us = self._epoch_us(end)
+            end = self._floor(end_us, granularity)
+            if end != end_us:
+                end += size
+        return start, max(start, end)
+
+    def _window(self, granularity: str, start: int, end: int) -> Dict[str, Any]:
+        """Return the totals of the buckets in [start, end) from the running totals"""
+        starts, totals, status_names = self._rollup(granularity)
+        before = totals[bisect.bisect_left(starts, start)]
+        through = totals[bisect.bisect_left(starts, end)]
+        created = through[0] - before[0]
+        resolved = through[1] - before[1]
+        resolution_us = through[2] - before[2]
+        statuses = {}
+        for index, status in enumerate(status_names, 3):
+            count = through[index] - before[index]
+            if count:
+                statuses[status] = count
+        return {
+            "start": _iso_utc(start),
+            "end": _iso_utc(end),
+            "created": created,
+            "resolved": resolved,
+            "statuses": statuses,
+            "open_backlog": through[0] - through[1],
+            "avg_resolution_hours": round(resolution_us / resolved / _HOUR_US, 1) if resolved else None,
+        }
+
+    def range_stats(self, start: Any = None, end: Any = None, granularity: str = 'hour') -> Dict[str, Any]:
+        """Return volume, resolutions, status mix and backlog between start and end
+
+        Bounds are ISO strings or datetimes (naive ones are UTC), widened to
+        whole buckets of the given granularity; omitted bounds cover all
+        tickets. statuses counts the current status of tickets created in
+        the range, and open_backlog is the number of tickets open at its end.
+        """
+        start, end = self._bounds(granularity, start, end)
+        stats = self._window(granularity, start, end)
+        stats["granularity"] = granularity
+        return stats
+
+    def buckets(self, granularity: str = 'day', start: Any = None, end: Any = None) -> List[Dict[str, Any]]:
+        """Return per-bucket stats from start to end, including empty buckets"""
+        return self.sliding_window(1, granularity, start, end)
+
+    def sliding_window(self, window: int, granularity: str = 'day', start: Any = None,
+                       end: Any = None) -> List[Dict[str, Any]]:
+        """Return trailing-window stats for every bucket from start to end
+
+        Each entry covers the window buckets ending with that bucket, e.g.
+        window=7 with granularity='day' gives rolling seven-day volume,
+        resolutions and status mix, plus the backlog at the bucket's end.
+        """
+        if window < 1:
+            raise ValueError("window must be at least 1 bucket")
+        start, end = self._bounds(granularity, start, end)
+        size = self.GRANULARITIES[granularity]
+        span = (window - 1) * size
+        return [self._window(granularity, bucket - span, bucket + size)
+                for bucket in range(start, end, size)]
+
+
+def _iter_chunks(tickets: Iterable[Dict[str, Any]], chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Split an iterable of tickets into lists of at most chunk_size"""
+    if isinstance(tickets, list):
+        for start in range(0, len(tickets), chunk_size):
+            yield tickets[start:start + chunk_size]
+        return
+    iterator = iter(tickets)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _analyze_chunk(tickets: List[Dict[str, Any]],
+                   device_classifier: Optional[DeviceClassifier] = None,
+                   sketch_capacity: Optional[int] = None) -> TicketAnalyzer:
+    """Worker entry point: aggregate one shard of tickets"""
+    return TicketAnalyzer(device_classifier=device_classifier,
+                          sketch_capacity=sketch_capacity).add_many(tickets)
+
+
+def analyze_parallel(tickets: Iterable[Dict[str, Any]], workers: Optional[int] = None,
+                     chunk_size: int = 50_000,
+                     device_classifier: Optional[DeviceClassifier] = None,
+                     timestamp_parser: Optional[TimestampParser] = None,
+                     sketch_capacity: Optional[int] = None) -> TicketAnalyzer:
+    """Aggregate tickets on a process pool and merge the partial results
+
+    Tickets are cut into chunks of chunk_size and each chunk is analyzed in
+    a worker process. Partials are merged in chunk order, so counter ties
+    and the date range resolve exactly as in a serial pass. At most two
+    chunks per worker are in flight, so a streamed source is never loaded
+    whole. workers defaults to the number of CPUs. sketch_capacity makes
+    every partial approximate (see TicketAnalyzer).
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+
+    workers = workers or os.cpu_count() or 1
+    merged = TicketAnalyzer(device_classifier=device_classifier, timestamp_parser=timestamp_parser,
+                            sketch_capacity=sketch_capacity)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        max_pending = 2 * workers
+        pending = deque()
+        for chunk in _iter_chunks(tickets, chunk_size):
+            pending.append(pool.submit(_analyze_chunk, chunk, device_classifier, sketch_capacity))
+            if len(pending) >= max_pending:
+                merged.merge(pending.popleft().result())
+        while pending:
+            merged.merge(pending.popleft().result())
+    return merged
+
+
+def _ordered_counts(codes: Any, labels: List[Any]) -> Counter:
+    """Count non-negative codes into a Counter keyed by label, in code order"""
+    counts = np.bincount(codes[codes >= 0], minlength=len(labels)).tolist()
+    return Counter({label: count for label, count in zip(labels, counts) if count})
+
+
+def _counts_by_first_seen(values: Any, labels: List[Any]) -> Counter:
+    """Count small integer values, ordered by the row where each first appears"""
+    if not len(values):
+        return Counter()
+    unique, first_index, counts = np.unique(values, return_index=True, return_counts=True)
+    order = np.argsort(first_index, kind='stable')
+    return Counter({labels[value]: count
+                    for value, count in zip(unique[order].tolist(), counts[order].tolist())})
+
+
+class TicketFrame:
+    """Column-oriented view of tickets for vectorized analysis
+
+    Strings are dictionary-encoded into integer code columns (status,
+    priority, device, device type, brand, email domain and phone pattern)
+    and createdAt becomes int64 epoch microseconds plus the UTC offset it
+    was written with. Codes are assigned in order of first appearance, so
+    the vectorized sections match TicketAnalyzer.result() exactly,
+    including the order of ties. Requires numpy.
+    """
+
+    # toISOString() output, e.g. 2024-01-31T09:15:00.000Z
+    _ISO_MILLIS_LENGTH = 24
+
+    def __init__(self, columns: Dict[str, Any], categories: Dict[str, List[Any]]):
+        self.columns = columns
+        self.categories = categories
+
+    def __len__(self) -> int:
+        return len(self.columns['status'])
+
+    @classmethod
+    def from_tickets(cls, tickets: Iterable[Dict[str, Any]],
+                     device_classifier: Optional[DeviceClassifier] = None,
+                     timestamp_parser: Optional[TimestampParser] = None) -> 'TicketFrame':
+        """Encode tickets (a list or any iterable) into columns"""
+        if np is None:
+            raise ImportError("TicketFrame requires numpy (pip install numpy)")
+        classify = (device_classifier or _DEFAULT_CLASSIFIER).classify
+
+        status_index, priority_index = {}, {}
+        device_index, device_type_index, brand_index = {}, {}, {}
+        domain_index, phone_index = {}, {}
+        raw_device_codes = {}
+        status, priority, device, email, domain, phone = [], [], [], [], [], []
+        created = []
+
+        for ticket in tickets:
+            get = ticket.get
+            value = get('status', 'unknown')
+            code = status_index.get(value)
+            if code is None:
+                code = status_index[value] = len(status_index)
+            status.append(code)
+
+            value = get('priority')
+            code = priority_index.get(value)
+            if code is None:
+                code = priority_index[value] = len(priority_index)
+            priority.append(code)
+
+            device_name = get('deviceName')
+            if device_name:
+                code = raw_device_codes.get(device_name)
+                if code is None:
+                    lowered = device_name.lower()
+                    code = device_index.get(lowered)
+                    if code is None:
+                        code = device_index[lowered] = len(device_index)
+                        device_type, brand = classify(lowered)
+                        if device_type and device_type not in device_type_index:
+                            device_type_index[device_type] = len(device_type_index)
+                        if brand and brand not in brand_index:
+                            brand_index[brand] = len(brand_index)
+                    raw_device_codes[device_name] = code
+                device.append(code)
+            else:
+                device.append(-1)
+
+            value = get('email')
+            email.append(bool(value))
+            if value and '@' in value:
+                value = value.split('@')[1].lower()
+                code = domain_index.get(value)
+                if code is None:
+                    code = domain_index[value] = len(domain_index)
+                domain.append(code)
+            else:
+                domain.append(-1)
+
+            value = get('phone')
+            if value:
+                value = _classify_phone(value)
+                code = phone_index.get(value)
+                if code is None:
+                    code = phone_index[value] = len(phone_index)
+                phone.append(code)
+            else:
+                phone.append(-1)
+
+            created.append(get('createdAt'))
+
+        device_labels = list(device_index)
+        device_types = [classify(name) for name in device_labels]
+        type_of_device = np.array([device_type_index.get(device_type, -1) for device_type, _ in device_types]
+                                  + [-1], dtype=np.int32)
+        brand_of_device = np.array([brand_index.get(brand, -1) for _, brand in device_types]
+                                   + [-1], dtype=np.int32)
+        device = np.array(device, dtype=np.int32)
+
+        columns = {
+            'status': np.array(status, dtype=np.int32),
+            'priority': np.array(priority, dtype=np.int32),
+            'device': device,
+            # -1 indexes the trailing -1 entry, so rows without a device stay -1
+            'device_type': type_of_device[device],
+            'brand': brand_of_device[device],
+            'has_email': np.array(email, dtype=bool),
+            'domain': np.array(domain, dtype=np.int32),
+            'phone_pattern': np.array(phone, dtype=np.int8),
+        }
+        columns.update(cls._encode_timestamps(created, timestamp_parser))
+        categories = {
+            'status': list(status_index),
+            'priority': list(priority_index),
+            'device': device_labels,
+            'device_type': list(device_type_index),
+            'brand': list(brand_index),
+            'domain': list(domain_index),
+            'phone_pattern': list(phone_index),
+        }
+        return cls(columns, categories)
+
+    @classmethod
+    def _encode_timestamps(cls, values: List[Any],
+                           timestamp_parser: Optional[TimestampParser] = None) -> Dict[str, Any]:
+        """Convert createdAt strings into epoch, offset, naive and validity columns"""
+        count = len(values)
+        created_us = np.zeros(count, dtype=np.int64)
+        offset = np.zeros(count, dtype=np.int32)
+        naive = np.zeros(count, dtype=bool)
+        valid = np.zeros(count, dtype=bool)
+
+        # toISOString() values are parsed by numpy in bulk; anything else
+        # goes through the same TimestampParser as the dict path
+        fast_rows, fast_values, slow_rows = [], [], []
+        for row, value in enumerate(values):
+            if not value:
+                continue
+            if isinstance(value, str) and len(value) == cls._ISO_MILLIS_LENGTH and value[-1] == 'Z':
+                fast_rows.append(row)
+                fast_values.append(value[:-1])
+            else:
+                slow_rows.append(row)
+
+        if fast_rows:
+            try:
+                parsed = np.array(fast_values, dtype='datetime64[us]').astype(np.int64)
+                created_us[fast_rows] = parsed
+                valid[fast_rows] = True
+            except ValueError:
+                slow_rows.extend(fast_rows)
+
+        if timestamp_parser is None:
+            timestamp_parser = TimestampParser()
+        parse = timestamp_parser.parse
+        for row in slow_rows:
+            parsed = parse(values[row])
+            if parsed is not None:
+                created_us[row] = parsed.epoch_us
+                offset[row] = parsed.offset
+                naive[row] = parsed.naive
+                valid[row] = True
+
+        return {'created_us': created_us, 'created_offset': offset,
+                'created_naive': naive, 'created_valid': valid}
+
+    def _created_datetime(self, row: int) -> datetime.datetime:
+        """Rebuild the parsed createdAt datetime for one row"""
+        columns = self.columns
+        return timestamp_datetime(ParsedTimestamp(int(columns['created_us'][row]),
+                                                  int(columns['created_offset'][row]),
+                                                  bool(columns['created_naive'][row]), 0, 0))
+
+    def status_distribution(self) -> Dict[str, Any]:
+        """Vectorized status distribution section"""
+        total = len(self)
+        counts = _ordered_counts(self.columns['status'], self.categories['status'])
+        return {
+            "counts": dict(counts),
+            "percentages": {status: round((count/total)*100, 1)
+                          for status, count in counts.items()}
+        }
+
+    def device_analysis(self) -> Dict[str, Any]:
+        """Vectorized device analysis section"""
+        devices = _ordered_counts(self.columns['device'], self.categories['device'])
+        return {
+            "total_devices": int((self.columns['device'] >= 0).sum()),
+            "device_types": dict(_ordered_counts(self.columns['device_type'], self.categories['device_type'])),
+            "brands": dict(_ordered_counts(self.columns['brand'], self.categories['brand'])),
+            "most_common_devices": dict(devices.most_common(5))
+        }
+
+    def time_analysis(self) -> Dict[str, Any]:
+        """Vectorized time pattern section"""
+        valid = np.flatnonzero(self.columns['created_valid'])
+        if not len(valid):
+            return {"error": "No valid timestamps found"}
+
+        created_us = self.columns['created_us'][valid]
+        local_seconds = created_us // 1_000_000 + self.columns['created_offset'][valid]
+        hours = (local_seconds // 3600) % 24
+        # 1970-01-01 was a Thursday, weekday() 3
+        weekdays = (local_seconds // 86400 + 3) % 7
+
+        return {
+            "total_analyzed": len(valid),
+            "busiest_hours": dict(_counts_by_first_seen(hours, list(range(24))).most_common(5)),
+            "busiest_days": dict(_counts_by_first_seen(weekdays, _weekday_names())),
+            "date_range": {
+                "earliest": self._created_datetime(valid[np.argmin(created_us)]).isoformat(),
+                "latest": self._created_datetime(valid[np.argmax(created_us)]).isoformat()
+            }
+        }
+
+    def contact_analysis(self) -> Dict[str, Any]:
+        """Vectorized contact information section"""
+        domains = _ordered_counts(self.columns['domain'], self.categories['domain'])
+        phone_patterns = self.columns['phone_pattern']
+        return {
+            "total_emails": int(self.columns['has_email'].sum()),
+            "email_domains": dict(domains.most_common(10)),
+            "total_phones": int((phone_patterns >= 0).sum()),
+            "phone_patterns": dict(_ordered_counts(phone_patterns, self.categories['phone_pattern']))
+        }
+
+    def result(self) -> Dict[str, Any]:
+        """Return the analysis sections in the layout used by analyze_tickets"""
+        return {
+            "total_tickets": len(self),
+            "status_distribution": self.status_distribution(),
+            "device_analysis": self.device_analysis(),
+            "time_analysis": self.time_analysis(),
+            "contact_analysis": self.contact_analysis(),
+            "summary": {}
+        }
+
+
+# Binary snapshot layout: magic, uint64 header length, JSON header, then
+# 8-byte aligned column blocks whose offsets the header gives relative to
+# the end of the header
+SNAPSHOT_MAGIC = b'TKSNAP\x00\x01'
+SNAPSHOT_FORMAT = 1
+# Ticket fields in the order server.js writes them
+SNAPSHOT_FIELDS = ('id', 'name', 'phone', 'email', 'deviceName', 'description', 'status',
+                   'priority', 'assignedTo', 'notes', 'createdAt', 'updatedAt')
+# Fields with few distinct values, stored as int32 codes into a dictionary
+_SNAPSHOT_CODED = frozenset(('deviceName', 'status', 'priority', 'assignedTo'))
+# Fields stored as JSON text rather than as plain strings
+_SNAPSHOT_JSON = frozenset(('notes',))
+# Ticket fields TicketAnalyzer reads
+_ANALYSIS_FIELDS = ('status', 'deviceName', 'createdAt', 'email', 'phone')
+# Text column presence markers; the marker block is only written if a value is not a string
+_TEXT_STRING, _TEXT_NONE, _TEXT_ABSENT = 0, 1, 2
+_SNAPSHOT_DTYPES = {'b': 'int8', 'B': 'uint8', 'i': 'int32', 'q': 'int64'}
+
+
+class _TextColumn:
+    """Offsets into one UTF-8 blob, plus presence markers once a value is not a string"""
+
+    def __init__(self):
+        self.offsets = array.array('q', [0])
+        self.data = bytearray()
+        self.presence = None
+
+    def append(self, value: Any, marker: int = _TEXT_STRING) -> None:
+        if marker == _TEXT_STRING:
+            self.data += value.encode('utf-8')
+        elif self.presence is None:
+            self.presence = bytearray(len(self.offsets) - 1)
+        if self.presence is not None:
+            self.presence.append(marker)
+        self.offsets.append(len(self.data))
+
+
+class _CodedColumn:
+    """int32 codes into a dictionary of values, numbered in order of first appearance"""
+
+    def __init__(self, typecode: str = 'i'):
+        self.codes = array.array(typecode)
+        self.index = {}
+
+    def append(self, value: Any, absent: bool = False) -> None:
+        if absent:
+            self.codes.append(-1)
+            return
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.index)
+        self.codes.append(code)
+
+
+def write_snapshot(tickets: Iterable[Dict[str, Any]], path: str,
+                   timestamp_parser: Optional[TimestampParser] = None) -> int:
+    """Write tickets (a list or any iterable) to a binary snapshot file
+
+    Low-cardinality fields are dictionary-encoded, free text goes into
+    offset-indexed UTF-8 blobs and notes are kept as JSON text. The
+    columns analyses need (createdAt as epoch microseconds, email domain
+    and phone pattern codes) are precomputed, so TicketSnapshot can
+    analyze a memory-mapped file without decoding any strings. Missing
+    fields stay missing; fields server.js does not write are kept as JSON.
+    The file is replaced atomically. Returns the number of tickets written.
+    """
+    parse = (timestamp_parser if timestamp_parser is not None else TimestampParser()).parse
+    fields = {field: _CodedColumn() if field in _SNAPSHOT_CODED else _TextColumn()
+              for field in SNAPSHOT_FIELDS}
+    extra = _TextColumn()
+    created_us, created_offset = array.array('q'), array.array('i')
+    created_flags, has_email = bytearray(), bytearray()
+    domains, phone_patterns = _CodedColumn(), _CodedColumn('b')
+    known = set(SNAPSHOT_FIELDS)
+    rows = 0
+
+    for ticket in tickets:
+        if isinstance(ticket, TicketRecord):
+            # Reading description or notes would fetch them one ticket at a time
+            ticket = ticket.to_dict()
+        rows += 1
+        for field, column in fields.items():
+            value = ticket.get(field, _ABSENT)
+            if isinstance(column, _CodedColumn):
+                column.append(value, value is _ABSENT)
+            elif value is _ABSENT:
+                column.append(None, _TEXT_ABSENT)
+            elif field in _SNAPSHOT_JSON:
+                column.append(json.dumps(value, separators=(',', ':')))
+            elif isinstance(value, str):
+                column.append(value)
+            else:
+                column.append(None, _TEXT_NONE if value is None else _TEXT_ABSENT)
+        leftovers = {key: value for key, value in ticket.items()
+                     if key not in known or not (value is None or isinstance(value, str) or
+                                                 key in _SNAPSHOT_JSON or key in _SNAPSHOT_CODED)}
+        if leftovers:
+            extra.append(json.dumps(leftovers, separators=(',', ':')))
+        else:
+            extra.append(None, _TEXT_ABSENT)
+
+        parsed = parse(ticket.get('createdAt')) if ticket.get('createdAt') else None
+        if parsed is None:
+            created_us.append(0)
+            created_offset.append(0)
+            created_flags.append(0)
+        else:
+            created_us.append(parsed.epoch_us)
+            created_offset.append(parsed.offset)
+            created_flags.append(1 | (2 if parsed.naive else 0))
+        email = ticket.get('email')
+        has_email.append(1 if email else 0)
+        domains.append(email.split('@')[1].lower() if email and '@' in email else None,
+                       not (email and '@' in email))
+        phone = ticket.get('phone')
+        phone_patterns.append(_classify_phone(phone) if phone else None, not phone)
+
+    blocks, dictionaries = [], {}
+    for field, column in list(fields.items()) + [('extra', extra)]:
+        if isinstance(column, _CodedColumn):
+            blocks.append((f'{field}.codes', column.codes))
+            dictionaries[field] = list(column.index)
+        else:
+            blocks.append((f'{field}.offsets', column.offsets))
+            blocks.append((f'{field}.data', column.data))
+            if column.presence is not None:
+                blocks.append((f'{field}.presence', column.presence))
+    blocks.extend([('created_us', created_us), ('created_offset', created_offset),
+                   ('created_flags', created_flags), ('has_email', has_email),
+                   ('domain.codes', domains.codes), ('phone_pattern.codes', phone_patterns.codes)])
+    dictionaries['domain'] = list(domains.index)
+    dictionaries['phone_pattern'] = list(phone_patterns.index)
+
+    layout, position = {}, 0
+    for name, block in blocks:
+        typecode = block.typecode if isinstance(block, array.array) else 'B'
+        size = len(block) * (block.itemsize if isinstance(block, array.array) else 1)
+        layout[name] = [typecode, position, len(block)]
+        position += size + (-size % 8)
+    header = json.dumps({'format': SNAPSHOT_FORMAT, 'rows': rows, 'byteorder': sys.byteorder,
+                         'blocks': layout, 'dictionaries': dictionaries},
+                        separators=(',', ':')).encode('utf-8')
+    header += b' ' * (-(len(SNAPSHOT_MAGIC) + 8 + len(header)) % 8)
+
+    temp_file = f"{path}.tmp"
+    with open(temp_file, 'wb') as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(len(header).to_bytes(8, 'little'))
+        f.write(header)
+        for _, block in blocks:
+            data = block.tobytes() if isinstance(block, array.array) else block
+            f.write(data)
+            f.write(b'\0' * (-len(data) % 8))
+    os.replace(temp_file, path)
+    return rows
+
+
+def convert_tickets_json(json_path: str, snapshot_path: str,
+                         timestamp_parser: Optional[TimestampParser] = None) -> int:
+    """Convert a tickets.json file into a binary snapshot, streaming it ticket by ticket"""
+    with open(json_path, 'r', encoding='utf-8') as f:
+        tickets = iter_json_array(iter(lambda: f.read(64 * 1024), ''))
+        return write_snapshot(tickets, snapshot_path, timestamp_parser)
+
+
+class TicketSnapshot:
+    """Memory-mapped reader for files written by write_snapshot()
+
+    Opening a snapshot reads only its header. Columns are views into the
+    mapping: frame() and result() analyze the precomputed code and epoch
+    columns with numpy without decoding any strings, and tickets are
+    rebuilt only when asked for, one field at a time. Without numpy,
+    result() decodes just the fields TicketAnalyzer reads.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if self._mmap[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+                raise ValueError(f"{path} is not a ticket snapshot")
+            start = len(SNAPSHOT_MAGIC) + 8
+            header_length = int.from_bytes(self._mmap[len(SNAPSHOT_MAGIC):start], 'little')
+            header = json.loads(self._mmap[start:start + header_length])
+            if header.get('format') != SNAPSHOT_FORMAT:
+                raise ValueError(f"Unsupported snapshot format {header.get('format')!r} in {path}")
+            if header.get('byteorder') != sys.byteorder:
+                raise ValueError(f"{path} was written on a {header.get('byteorder')}-endian machine")
+        except ValueError:
+            self._mmap.close()
+            raise
+        self._data_start = start + header_length
+        self.rows = header['rows']
+        self.blocks = header['blocks']
+        self.dictionaries = header['dictionaries']
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __enter__(self) -> 'TicketSnapshot':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Unmap the file; frames still using its columns keep it mapped until they go"""
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+
+    def _block(self, name: str) -> memoryview:
+        """Return a block as a typed memoryview over the mapping, without copying"""
+        typecode, offset, count = self.blocks[name]
+        start = self._data_start + offset
+        size = count * array.array(typecode).itemsize
+        return memoryview(self._mmap)[start:start + size].cast(typecode)
+
+    def _array(self, name: str) -> Any:
+        """Return a block as a read-only numpy array over the mapping"""
+        typecode, offset, count = self.blocks[name]
+        return np.frombuffer(self._mmap, dtype=_SNAPSHOT_DTYPES[typecode], count=count,
+                             offset=self._data_start + offset)
+
+    def column(self, field: str, start: int = 0, stop: Optional[int] = None) -> List[Any]:
+        """Decode one field for rows start to stop; missing values come back as _ABSENT"""
+        stop = self.rows if stop is None else min(stop, self.rows)
+        if field in _SNAPSHOT_CODED:
+            values = self.dictionaries[field] + [_ABSENT]
+            return [values[code] for code in self._block(f'{field}.codes')[start:stop]]
+
+        offsets = self._block(f'{field}.offsets')
+        base = offsets[start]
+        data = bytes(self._block(f'{field}.data')[base:offsets[stop]])
+        decoded = [data[offsets[row] - base:offsets[row + 1] - base].decode('utf-8')
+                   for row in range(start, stop)]
+        if f'{field}.presence' in self.blocks:
+            presence = self._block(f'{field}.presence')
+            for row in range(start, stop):
+                marker = presence[row]
+                if marker != _TEXT_STRING:
+                    decoded[row - start] = None if marker == _TEXT_NONE else _ABSENT
+        if field in _SNAPSHOT_JSON or field == 'extra':
+            decoded = [json.loads(value) if isinstance(value, str) else value for value in decoded]
+        return decoded
+
+    def iter_tickets(self, fields: Optional[Iterable[str]] = None,
+                     batch_size: int = 10_000) -> Iterator[Dict[str, Any]]:
+        """Yield tickets as dicts, decoding only the given fields (default: all)"""
+        fields = list(SNAPSHOT_FIELDS if fields is None else fields)
+        with_extra = set(fields) == set(SNAPSHOT_FIELDS)
+        for start in range(0, self.rows, batch_size):
+            columns = [self.column(field, start, start + batch_size) for field in fields]
+            extras = self.column('extra', start, start + batch_size) if with_extra else None
+            for offset, values in enumerate(zip(*columns)):
+                ticket = {field: value for field, value in zip(fields, values) if value is not _ABSENT}
+                if extras is not None and extras[offset] is not _ABSENT:
+                    ticket.update(extras[offset])
+                yield ticket
+
+    def tickets(self) -> List[Dict[str, Any]]:
+        """Decode every ticket"""
+        return list(self.iter_tickets())
+
+    def frame(self, device_classifier: Optional[DeviceClassifier] = None) -> TicketFrame:
+        """Build a TicketFrame over the mapped columns; only device names are decoded"""
+        if np is None:
+            raise ImportError("TicketSnapshot.frame() requires numpy (pip install numpy)")
+        classify = (device_classifier or _DEFAULT_CLASSIFIER).classify
+        # Raw names were numbered by first appearance, so lowercased names
+        # and device types come out in the order TicketFrame.from_tickets uses
+        device_index, device_type_index, brand_index = {}, {}, {}
+        raw_to_device = []
+        for name in self.dictionaries['deviceName']:
+            if not name:
+                raw_to_device.append(-1)
+                continue
+            lowered = name.lower()
+            code = device_index.get(lowered)
+            if code is None:
+                code = device_index[lowered] = len(device_index)
+                device_type, brand = classify(lowered)
+                if device_type and device_type not in device_type_index:
+                    device_type_index[device_type] = len(device_type_index)
+                if brand and brand not in brand_index:
+                    brand_index[brand] = len(brand_index)
+            raw_to_device.append(code)
+
+        device_labels = list(device_index)
+        device_types = [classify(name) for name in device_labels]
+        type_of_device = np.array([device_type_index.get(device_type, -1) for device_type, _ in device_types]
+                                  + [-1], dtype=np.int32)
+        brand_of_device = np.array([brand_index.get(brand, -1) for _, brand in device_types]
+                                   + [-1], dtype=np.int32)
+        # -1 indexes the trailing -1 entry, so rows without a device stay -1
+        device = np.array(raw_to_device + [-1], dtype=np.int32)[self._array('deviceName.codes')]
+
+        categories = {'device': device_labels, 'device_type': list(device_type_index),
+                      'brand': list(brand_index), 'domain': self.dictionaries['domain'],
+                      'phone_pattern': self.dictionaries['phone_pattern']}
+        columns = {}
+        # Missing statuses count as 'unknown' and missing priorities as None, as in TicketAnalyzer
+        for field, missing in (('status', 'unknown'), ('priority', None)):
+            codes = self._array(f'{field}.codes')
+            labels = list(self.dictionaries[field])
+            if (codes < 0).any():
+                # Share the label's code if the data also spells it out
+                if missing in labels:
+                    codes = np.where(codes < 0, labels.index(missing), codes)
+                else:
+                    codes = np.where(codes < 0, len(labels), codes)
+                    labels.append(missing)
+                # Renumber by first appearance, so ties fall as in the dict path
+                unique, first_row = np.unique(codes, return_index=True)
+                order = unique[np.argsort(first_row, kind='stable')].tolist()
+                order += sorted(set(range(len(labels))) - set(order))
+                remap = np.empty(len(labels), dtype=np.int32)
+                remap[order] = np.arange(len(labels), dtype=np.int32)
+                codes = remap[codes]
+                labels = [labels[code] for code in order]
+            columns[field] = codes
+            categories[field] = labels
+        flags = self._array('created_flags')
+        columns.update({
+            'device': device,
+            'device_type': type_of_device[device],
+            'brand': brand_of_device[device],
+            'has_email': self._array('has_email').view(bool),
+            'domain': self._array('domain.codes'),
+            'phone_pattern': self._array('phone_pattern.codes'),
+            'created_us': self._array('created_us'),
+            'created_offset': self._array('created_offset'),
+            'created_naive': (flags & 2).astype(bool),
+            'created_valid': (flags & 1).astype(bool),
+        })
+        return TicketFrame(columns, categories)
+
+    def result(self, device_classifier: Optional[DeviceClassifier] = None,
+               timestamp_parser: Optional[TimestampParser] = None) -> Dict[str, Any]:
+        """Return the analysis sections in the layout used by analyze_tickets"""
+        if np is not None:
+            return self.frame(device_classifier).result()
+        analyzer = TicketAnalyzer(device_classifier=device_classifier, timestamp_parser=timestamp_parser)
+        return analyzer.add_many(self.iter_tickets(_ANALYSIS_FIELDS)).result()
+
+
+# Words, numbers and contractions such as won't
+_SEARCH_TOKEN = re.compile(r"[0-9a-z]+(?:'[0-9a-z]+)*")
+# Quoted phrases or single words
+_SEARCH_QUERY = re.compile(r'"([^"]*)"|(\S+)')
+# Token positions are packed below the document number in one int64 key
+_POSITION_BITS = 24
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase search terms"""
+    return _SEARCH_TOKEN.findall(text.lower().replace('’', "'"))
+
+
+class _SearchSegment:
+    """Immutable postings for a batch of token occurrences, sorted by term
+
+    Occurrences are kept as (document << _POSITION_BITS | position) keys
+    grouped by term, which phrase matching probes with searchsorted; the
+    per-document term frequencies BM25 needs are derived from them once.
+    """
+
+    def __init__(self, term_ids: Any, docs: Any, positions: Any):
+        keys = (docs.astype(np.int64) << _POSITION_BITS) | positions
+        order = np.lexsort((keys, term_ids))
+        term_ids, self.keys = term_ids[order], keys[order]
+        self.terms, term_starts = np.unique(term_ids, return_index=True)
+        self.key_bounds = np.append(term_starts, len(self.keys))
+
+        # One posting per (term, document), with its term frequency
+        key_docs = self.keys >> _POSITION_BITS
+        first = np.ones(len(self.keys), dtype=bool)
+        first[1:] = (term_ids[1:] != term_ids[:-1]) | (key_docs[1:] != key_docs[:-1])
+        posting_starts = np.flatnonzero(first)
+        self.docs = key_docs[posting_starts].astype(np.int32)
+        self.tfs = np.diff(np.append(posting_starts, len(self.keys))).astype(np.int32)
+        self.posting_bounds = np.searchsorted(posting_starts, self.key_bounds)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _slot(self, term_id: int) -> Optional[int]:
+        slot = int(np.searchsorted(self.terms, term_id))
+        if slot < len(self.terms) and self.terms[slot] == term_id:
+            return slot
+        return None
+
+    def postings(self, term_id: int) -> Optional[Tuple[Any, Any]]:
+        """Return (documents, term frequencies) for a term, or None"""
+        slot = self._slot(term_id)
+        if slot is None:
+            return None
+        start, stop = self.posting_bounds[slot], self.posting_bounds[slot + 1]
+        return self.docs[start:stop], self.tfs[start:stop]
+
+    def keys_for(self, term_id: int) -> Any:
+        """Return the sorted occurrence keys of a term"""
+        slot = self._slot(term_id)
+        if slot is None:
+            return self.keys[:0]
+        return self.keys[self.key_bounds[slot]:self.key_bounds[slot + 1]]
+
+    def rows(self) -> Tuple[Any, Any, Any]:
+        """Return the (term, document, position) rows, for merging"""
+        term_ids = np.repeat(self.terms, np.diff(self.key_bounds))
+        return term_ids, self.keys >> _POSITION_BITS, self.keys & ((1 << _POSITION_BITS) - 1)
+
+
+class TicketSearchIndex(_IncrementalSync):
+    """Inverted index over ticket descriptions and note texts, ranked with BM25
+
+    New and changed tickets are tokenized into a small pending buffer that
+    is sealed into an immutable, sorted segment once it holds flush_rows
+    occurrences; more than max_segments segments are merged into one.
+    A changed ticket is indexed again under a new document number and its
+    old version is marked dead, so updates never rewrite segments; dead
+    documents are dropped when segments merge. Scoring and phrase matching
+    run with numpy over whole posting lists. Requires numpy.
+
+    Like IncrementalTicketAnalyzer, sync() and apply_changes() only index
+    tickets whose updatedAt changed.
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, flush_rows: int = 50_000, max_segments: int = 8):
+        if np is None:
+            raise ImportError("TicketSearchIndex requires numpy (pip install numpy)")
+        self.flush_rows = flush_rows
+        self.max_segments = max_segments
+        # Term -> term id
+        self.vocabulary = {}
+        # Document number -> ticket id; a ticket's number changes when it is re-indexed
+        self.doc_ids = []
+        # Ticket key -> (updatedAt, document number)
+        self.snapshot = {}
+        self.segments = []
+        self.live_count = 0
+        self.total_length = 0
+        self._lengths = np.zeros(1024, dtype=np.int32)
+        self._live = np.zeros(1024, dtype=bool)
+        self._pending = (array.array('i'), array.array('q'), array.array('i'))
+        self._pending_segment = None
+
+    def __len__(self) -> int:
+        return self.live_count
+
+    def _upsert(self, key: Any, ticket: Dict[str, Any], previous: Optional[tuple]) -> int:
+        # Indexed before the old version is retired, in case _index rejects it
+        doc = self._index(key, ticket)
+        if previous is not None:
+            self._retire(previous[1])
+        return doc
+
+    def _remove(self, key: Any, doc: int) -> None:
+        self._retire(doc)
+
+    def _changes_applied(self, counts: Dict[str, int]) -> None:
+        if len(self._pending[0]) >= self.flush_rows:
+            self._flush()
+        dead = len(self.doc_ids) - self.live_count
+        if dead > self.live_count and dead >= 1024:
+            # Mostly replaced or deleted documents; renumber before they dominate
+            self.merge()
+
+    @staticmethod
+    def _texts(ticket: Dict[str, Any]) -> Iterator[str]:
+        """Yield the searchable texts of a ticket: its description and note texts"""
+        description = ticket.get('description')
+        if isinstance(description, str):
+            yield description
+        for note in ticket.get('notes') or ():
+            text = note.get('text') if isinstance(note, dict) else None
+            if isinstance(text, str):
+                yield text
+
+    def _index(self, key: Any, ticket: Dict[str, Any]) -> int:
+        """Tokenize a ticket into the pending buffer under a new document number"""
+        # Checked before anything is touched, so a rejected ticket leaves the index as it was
+        texts = [tokenize(text) for text in self._texts(ticket)]
+        if sum(len(tokens) + 1 for tokens in texts) > 1 << _POSITION_BITS:
+            raise ValueError(f"Ticket {key!r} has too many words to index")
+
+        doc = len(self.doc_ids)
+        self.doc_ids.append(key)
+        if doc >= len(self._lengths):
+            self._lengths = np.concatenate([self._lengths, np.zeros_like(self._lengths)])
+            self._live = np.concatenate([self._live, np.zeros_like(self._live)])
+
+        vocabulary = self.vocabulary
+        term_ids, docs, positions = self._pending
+        position = length = 0
+        for tokens in texts:
+            ids = [vocabulary.setdefault(token, len(vocabulary)) for token in tokens]
+            term_ids.extend(ids)
+            docs.extend([doc] * len(ids))
+            positions.extend(range(position, position + len(ids)))
+            length += len(ids)
+            # Skip a position so phrases do not run from one text into the next
+            position += len(ids) + 1
+
+        self._lengths[doc] = length
+        self._live[doc] = True
+        self.live_count += 1
+        self.total_length += length
+        self._pending_segment = None
+        return doc
+
+    def _retire(self, doc: int) -> None:
+        """Mark a document dead; its postings go when its segment is merged"""
+        self._live[doc] = False
+        self.live_count -= 1
+        self.total_length -= int(self._lengths[doc])
+
+    def _flush(self) -> None:
+        """Seal the pending buffer into a segment, merging segments if there are too many"""
+        segment = self._pending_buffer_segment()
+        self._pending = (array.array('i'), array.array('q'), array.array('i'))
+        self._pending_segment = None
+        if segment is not None:
+            self.segments.append(segment)
+        if len(self.segments) > self.max_segments:
+            self.merge()
+
+    def merge(self) -> None:
+        """Merge every segment and the pending buffer into one, dropping dead documents
+
+        Live documents are renumbered 0..live_count-1, so document numbers
+        (and the per-search score arrays) stay proportional to the live
+        tickets however many updates have been indexed.
+        """
+        pending = self._pending_buffer_segment()
+        segments = self.segments + ([pending] if pending is not None else [])
+        self._pending = (array.array('i'), array.array('q'), array.array('i'))
+        self._pending_segment = None
+
+        count = len(self.doc_ids)
+        live_docs = np.flatnonzero(self._live[:count])
+        renumbered = np.full(count + 1, -1, dtype=np.int64)
+        renumbered[live_docs] = np.arange(len(live_docs))
+        if segments:
+            term_ids, docs, positions = (np.concatenate(column) for column in
+                                         zip(*(segment.rows() for segment in segments)))
+            alive = self._live[docs]
+            self.segments = ([_SearchSegment(term_ids[alive], renumbered[docs[alive]], positions[alive])]
+                             if alive.any() else [])
+
+        capacity = max(1024, 2 * len(live_docs))
+        lengths = np.zeros(capacity, dtype=np.int32)
+        lengths[:len(live_docs)] = self._lengths[live_docs]
+        self._lengths = lengths
+        self._live = np.zeros(capacity, dtype=bool)
+        self._live[:len(live_docs)] = True
+        doc_ids = self.doc_ids
+        self.doc_ids = [doc_ids[doc] for doc in live_docs.tolist()]
+        renumbered = renumbered.tolist()
+        self.snapshot = {key: (updated_at, renumbered[doc]) for key, (updated_at, doc) in self.snapshot.items()}
+
+    def _pending_buffer_segment(self) -> Optional['_SearchSegment']:
+        """Return the pending buffer as a segment, built once per change"""
+        if self._pending_segment is None and len(self._pending[0]):
+            term_ids, docs, positions = (np.frombuffer(column, dtype=dtype).copy() for column, dtype in
+                                         zip(self._pending, (np.int32, np.int64, np.int32)))
+            self._pending_segment = _SearchSegment(term_ids, docs, positions)
+        return self._pending_segment
+
+    def _parse_query(self, query: str) -> Tuple[List[List[str]], List[str]]:
+        """Split a query into quoted phrases and single words, as term lists"""
+        phrases, words = [], []
+        for phrase, word in _SEARCH_QUERY.findall(query):
+            tokens = tokenize(phrase if phrase else word)
+            if phrase and len(tokens) > 1:
+                phrases.append(tokens)
+            else:
+                words.extend(tokens)
+        return phrases, words
+
+    def search(self, query: str, limit: int = 10, match_all: bool = False) -> List[Dict[str, Any]]:
+        """Return up to limit {"id", "score"} matches for a query, best first
+
+        Words are ranked with BM25 and by default any of them may match;
+        with match_all=True every word must. Text in double quotes is a
+        phrase: its words must appear next to each other, in order, in the
+        description or in one note.
+        """
+        phrases, words = self._parse_query(query)
+        terms = list(dict.fromkeys(words + [token for phrase in phrases for token in phrase]))
+        if not terms or not self.live_count:
+            return []
+        vocabulary = self.vocabulary
+        required = set(words) if match_all else set()
+        for phrase in phrases:
+            required.update(phrase)
+        if any(term not in vocabulary for term in required):
+            return []
+
+        segments = self.segments + [segment for segment in (self._pending_buffer_segment(),)
+                                    if segment is not None]
+        count = len(self.doc_ids)
+        live = self._live[:count]
+        lengths = self._lengths[:count]
+        total = self.live_count
+        average_length = self.total_length / total or 1.0
+        scores = np.zeros(count)
+        # How many of the required terms each document contains
+        required_hits = np.zeros(count, dtype=np.int32) if required else None
+
+        for term in terms:
+            term_id = vocabulary.get(term)
+            if term_id is None:
+                continue
+            matches = [segment.postings(term_id) for segment in segments]
+            matches = [match for match in matches if match is not None]
+            docs = np.concatenate([docs for docs, _ in matches]) if matches else np.zeros(0, np.int32)
+            tfs = np.concatenate([tfs for _, tfs in matches]) if matches else np.zeros(0, np.int32)
+            if total < count:
+                # Skip postings of replaced and deleted tickets
+                alive = live[docs]
+                docs, tfs = docs[alive], tfs[alive]
+            if term in required:
+                required_hits[docs] += 1
+            if not len(docs):
+                continue
+            idf = math.log(1 + (total - len(docs) + 0.5) / (len(docs) + 0.5))
+            norm = self.K1 * (1 - self.B + self.B * lengths[docs] / average_length)
+            scores[docs] += idf * tfs * (self.K1 + 1) / (tfs + norm)
+
+        if required:
+            candidates = np.flatnonzero(required_hits == len(required))
+        else:
+            candidates = np.flatnonzero(scores)
+        for phrase in phrases:
+            contains = np.zeros(count, dtype=bool)
+            contains[self._phrase_docs(phrase, segments)] = True
+            candidates = candidates[contains[candidates]]
+        if not len(candidates):
+            return []
+
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        # Best score first; ties go to the earlier indexed ticket
+        candidates = candidates[np.lexsort((candidates, -scores[candidates]))]
+        return [{"id": self.doc_ids[doc], "score": round(float(scores[doc]), 4)} for doc in candidates]
+
+    def _phrase_docs(self, phrase: List[str], segments: List['_SearchSegment']) -> Any:
+        """Return the live documents containing the phrase"""
+        term_ids = [self.vocabulary[term] for term in phrase]
+        found = []
+        for segment in segments:
+            keys = segment.keys_for(term_ids[0])
+            for offset, term_id in enumerate(term_ids[1:], 1):
+                if not len(keys):
+                    break
+                following = segment.keys_for(term_id)
+                if not len(following):
+                    keys = keys[:0]
+                    break
+                wanted = keys + offset
+                slots = np.minimum(np.searchsorted(following, wanted), len(following) - 1)
+                keys = keys[following[slots] == wanted]
+            # Keys are sorted, so repeats of a document are adjacent
+            docs = keys >> _POSITION_BITS
+            found.append(docs[np.append(True, docs[1:] != docs[:-1])] if len(docs) else docs)
+        docs = np.concatenate(found) if found else np.zeros(0, np.int64)
+        return docs[self._live[docs]]
+
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def _connected_components(size: int, firsts: Any, seconds: Any) -> Any:
+    """Label rows 0..size-1 with the smallest row of their component, given edges"""
+    labels = np.arange(size)
+    while len(firsts):
+        low = np.minimum(labels[firsts], labels[seconds])
+        high = np.maximum(labels[firsts], labels[seconds])
+        joined = low != high
+        if not joined.any():
+            break
+        # Labels are roots here, so hooking one onto a smaller label keeps a forest
+        np.minimum.at(labels, high[joined], low[joined])
+        while True:
+            jumped = labels[labels]
+            if (jumped == labels).all():
+                break
+            labels = jumped
+    return labels
+
+
+class TicketDuplicateDetector(_IncrementalSync):
+    """Finds near-duplicate tickets with MinHash signatures and LSH banding
+
+    Each ticket becomes a set of features: word shingles of its
+    description and, with include_contact, its lowercased email and phone
+    digits, each repeated CONTACT_WEIGHT times so that a customer
+    resubmitting an issue matches while two customers reporting the same
+    symptom do not. Without contact fields the detector clusters repeat
+    issues instead. A num_perm-value MinHash signature estimates the
+    Jaccard similarity of two feature sets; its bands are hashed together
+    with the device name, and only tickets for the same device sharing a
+    band are compared, so grouping takes roughly linear time. Pairs whose
+    estimated similarity reaches threshold are joined into groups.
+
+    Signatures live in numpy arrays, one row per ticket. Like
+    IncrementalTicketAnalyzer, sync() and apply_changes() only sign tickets
+    whose updatedAt changed. Requires numpy.
+    """
+
+    CONTACT_WEIGHT = 4
+    # Tickets signed per numpy batch; small batches keep the num_perm x features scratch array in cache
+    BATCH_SIZE = 1024
+    # Band buckets up to this size are compared pair by pair; see _candidate_pairs
+    PAIR_WINDOW = 16
+
+    def __init__(self, num_perm: int = 128, bands: int = 32, threshold: float = 0.5,
+                 shingle_size: int = 2, include_contact: bool = True, seed: int = 1):
+        if np is None:
+            raise ImportError("TicketDuplicateDetector requires numpy (pip install numpy)")
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.include_contact = include_contact
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hash functions, one per permutation: (a * x + b) >> 32 modulo 2**64
+        self._a = rng.integers(0, 1 << 63, (num_perm, 1), dtype=np.uint64) * 2 + 1
+        self._b = rng.integers(0, 1 << 63, (num_perm, 1), dtype=np.uint64)
+        # Distinct hashes for the repeated copies of each contact feature
+        self._contact_salts = [int(salt) for salt in rng.integers(1, 1 << 32, self.CONTACT_WEIGHT)]
+        # Odd multipliers folding each band's values, and the device, into one hash
+        self._band_mix = rng.integers(0, 1 << 63, (bands, num_perm // bands), dtype=np.uint64) * 2 + 1
+        self._device_mix = rng.integers(0, 1 << 63, bands, dtype=np.uint64) * 2 + 1
+        # Ticket key -> (updatedAt, row); the row is None for tickets with nothing to compare
+        self.snapshot = {}
+        # Row -> ticket key and device name, None for free rows
+        self.row_ids = []
+        self.devices = []
+        self._free = []
+        # Ticket key -> ticket still to be signed by the running apply_changes()
+        self._unsigned = {}
+        self._signatures = np.zeros((1024, num_perm), dtype=np.uint32)
+        self._band_keys = np.zeros((1024, bands), dtype=np.uint64)
+        self._live = np.zeros(1024, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.row_ids) - len(self._free)
+
+    def _upsert(self, key: Any, ticket: Dict[str, Any], previous: Optional[tuple]) -> Optional[int]:
+        # Signed in batches once the whole delta is known; until then the old row is kept
+        self._unsigned[key] = ticket
+        return previous[1] if previous is not None else None
+
+    def _remove(self, key: Any, row: Optional[int]) -> None:
+        self._unsigned.pop(key, None)
+        if row is not None:
+            self._release(row)
+
+    def _changes_applied(self, counts: Dict[str, int]) -> None:
+        items = list(self._unsigned.items())
+        self._unsigned = {}
+        for start in range(0, len(items), self.BATCH_SIZE):
+            self._sign(items[start:start + self.BATCH_SIZE])
+
+    def _features(self, ticket: Dict[str, Any]) -> List[int]:
+        """Return the hashed feature set of a ticket"""
+        description = ticket.get('description')
+        tokens = tokenize(description) if isinstance(description, str) else []
+        size = self.shingle_size
+        crc32 = zlib.crc32
+        hashes = {crc32(' '.join(tokens[start:start + size]).encode())
+                  for start in range(max(len(tokens) - size, 0) + 1)} if tokens else set()
+        if self.include_contact:
+            contacts = []
+            email = ticket.get('email')
+            if isinstance(email, str) and email.strip():
+                contacts.append(f"email:{email.strip().lower()}")
+            phone = ticket.get('phone')
+            digits = _NON_DIGITS.sub('', phone)[-10:] if isinstance(phone, str) else ''
+            if digits:
+                contacts.append(f"phone:{digits}")
+            for contact in contacts:
+                contact_hash = crc32(contact.encode())
+                hashes.update(contact_hash ^ salt for salt in self._contact_salts)
+        return list(hashes)
+
+    @staticmethod
+    def _device_hash(ticket: Dict[str, Any]) -> int:
+        device = ticket.get('deviceName')
+        device = _WHITESPACE.sub(' ', device.strip().lower()) if isinstance(device, str) else ''
+        return zlib.crc32(device.encode())
+
+    def _sign(self, items: List[Tuple[Any, Dict[str, Any]]]) -> None:
+        """Compute signatures and band keys for a batch of (key, ticket) items"""
+        snapshot = self.snapshot
+        rows, feature_sets, devices = [], [], []
+        for key, ticket in items:
+            updated_at, row = snapshot[key]
+            features = self._features(ticket)
+            if not features:
+                # Nothing to compare on; an empty signature would match every other one
+                if row is not None:
+                    self._release(row)
+                    snapshot[key] = (updated_at, None)
+                continue
+            if row is None:
+                row = self._allocate(key)
+                snapshot[key] = (updated_at, row)
+            self.devices[row] = ticket.get('deviceName')
+            rows.append(row)
+            feature_sets.append(features)
+            devices.append(self._device_hash(ticket))
+        if not rows:
+            return
+
+        counts = np.fromiter(map(len, feature_sets), dtype=np.int64, count=len(feature_sets))
+        values = np.fromiter(itertools.chain.from_iterable(feature_sets), dtype=np.uint64,
+                             count=int(counts.sum()))
+        # Every permutation of every feature, then the minimum per ticket
+        hashed = values * self._a
+        hashed += self._b
+        hashed >>= np.uint64(32)
+        signatures = np.minimum.reduceat(hashed.astype(np.uint32),
+                                         np.append(0, np.cumsum(counts[:-1])), axis=1).T
+        band_values = signatures.reshape(len(rows), self.bands, -1) * self._band_mix
+        band_keys = (band_values.sum(axis=2, dtype=np.uint64) +
+                     np.array(devices, dtype=np.uint64)[:, None] * self._device_mix)
+
+        rows = np.array(rows)
+        self._signatures[rows] = signatures
+        self._band_keys[rows] = band_keys
+        self._live[rows] = True
+
+    def _allocate(self, key: Any) -> int:
+        """Return a free row for a ticket, growing the arrays when none is left"""
+        if self._free:
+            row = self._free.pop()
+            self.row_ids[row] = key
+            return row
+        row = len(self.row_ids)
+        self.row_ids.append(key)
+        self.devices.append(None)
+        if row >= len(self._live):
+            self._signatures = np.concatenate([self._signatures, np.zeros_like(self._signatures)])
+            self._band_keys = np.concatenate([self._band_keys, np.zeros_like(self._band_keys)])
+            self._live = np.concatenate([self._live, np.zeros_like(self._live)])
+        return row
+
+    def _release(self, row: int) -> None:
+        self._live[row] = False
+        self.row_ids[row] = None
+        self.devices[row] = None
+        self._free.append(row)
+
+    def _similarity(self, firsts: Any, seconds: Any) -> Any:
+        """Estimate the Jaccard similarity of row pairs from their signatures"""
+        return (self._signatures[firsts] == self._signatures[seconds]).mean(axis=1)
+
+    def _candidate_pairs(self) -> Tuple[Any, Any]:
+        """Return distinct (smaller, larger) row pairs that share a band bucket
+
+        Every pair is returned from buckets of up to PAIR_WINDOW rows. In a
+        larger bucket each row is only paired with the row before it and
+        with the bucket's first row: that keeps the bucket connected and the
+        pairs O(rows) per band, but a similar pair further apart is found
+        only through a chain of similar rows or through another band.
+        """
+        rows = np.flatnonzero(self._live[:len(self.row_ids)])
+        pairs = []
+        for band in range(self.bands):
+            order = np.argsort(self._band_keys[rows, band], kind='stable')
+            keys = self._band_keys[rows[order], band]
+            same = keys[1:] == keys[:-1]
+            if not same.any():
+                continue
+            members = np.flatnonzero(same) + 1
+            starts = np.append(True, ~same)
+            bucket_starts = np.maximum.accumulate(np.where(starts, np.arange(len(keys)), 0))
+            buckets = np.cumsum(starts) - 1
+            bucket_rows = rows[order]
+            pairs += [bucket_rows[bucket_starts[members]] << 32 | bucket_rows[members],
+                      bucket_rows[members - 1] << 32 | bucket_rows[members]]
+            members = members[np.bincount(buckets)[buckets[members]] <= self.PAIR_WINDOW]
+            for offset in range(2, self.PAIR_WINDOW):
+                members = members[members - offset >= bucket_starts[members]]
+                if not len(members):
+                    break
+                pairs.append(bucket_rows[members - offset] << 32 | bucket_rows[members])
+        if not pairs:
+            return np.zeros(0, np.int64), np.zeros(0, np.int64)
+        # Rows are sorted within a bucket, so each pair is already (smaller, larger)
+        pairs = np.unique(np.concatenate(pairs))
+        pairs = pairs[(pairs >> 32) != (pairs & 0xFFFFFFFF)]
+        return pairs >> 32, pairs & 0xFFFFFFFF
+
+    def groups(self, min_size: int = 2) -> List[Dict[str, Any]]:
+        """Return groups of near-duplicate tickets, largest first
+
+        Each group is {"ids": [...], "device": ...}, with ids in row order
+        and the device name of the first one. Rows follow the order tickets
+        were first signed, except that a deleted ticket's row is reused.
+        """
+        firsts, seconds = self._candidate_pairs()
+        similar = np.zeros(len(firsts), dtype=bool)
+        for start in range(0, len(firsts), 65536):
+            stop = start + 65536
+            similar[start:stop] = self._similarity(firsts[start:stop], seconds[start:stop]) >= self.threshold
+        labels = _connected_components(len(self.row_ids), firsts[similar], seconds[similar])
+
+        rows = np.flatnonzero(self._live[:len(self.row_ids)])
+        sizes = np.bincount(labels[rows], minlength=len(self.row_ids))
+        rows = rows[sizes[labels[rows]] >= max(min_size, 2)]
+        rows = rows[np.lexsort((rows, labels[rows]))]
+        grouped = []
+        for members in np.split(rows, np.flatnonzero(np.diff(labels[rows])) + 1):
+            if len(members):
+                grouped.append({"ids": [self.row_ids[row] for row in members.tolist()],
+                                "device": self.devices[members[0]]})
+        grouped.sort(key=lambda group: -len(group["ids"]))
+        return grouped
+
+    def related(self, ticket_id: Any, limit: int = 10,
+                threshold: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Return up to limit {"id", "similarity"} tickets similar to a signed ticket, most similar first"""
+        entry = self.snapshot.get(ticket_id)
+        if entry is None or entry[1] is None:
+            return []
+        row = entry[1]
+        count = len(self.row_ids)
+        shares_band = (self._band_keys[:count] == self._band_keys[row]).any(axis=1) & self._live[:count]
+        shares_band[row] = False
+        candidates = np.flatnonzero(shares_band)
+        similarity = (self._signatures[candidates] == self._signatures[row]).mean(axis=1)
+        keep = similarity >= (self.threshold if threshold is None else threshold)
+        candidates, similarity = candidates[keep], similarity[keep]
+        order = np.lexsort((candidates, -similarity))[:limit]
+        return [{"id": self.row_ids[candidate], "similarity": round(float(similarity[position]), 4)}
+                for position, candidate in zip(order.tolist(), candidates[order].tolist())]
+
+
+# Keep in step with SQLITE_SCHEMA in server.js
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tickets (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    phone TEXT,
+    email TEXT,
+    device_name TEXT,
+    description TEXT,
+    status TEXT,
+    priority TEXT,
+    assigned_to TEXT,
+    notes TEXT,
+    created_at TEXT,
+    updated_at TEXT,
+    phone_digits INTEGER
+);
+CREATE INDEX IF NOT EXISTS tickets_status ON tickets (status);
+CREATE INDEX IF NOT EXISTS tickets_priority ON tickets (priority);
+CREATE INDEX IF NOT EXISTS tickets_assigned_to ON tickets (assigned_to);
+CREATE INDEX IF NOT EXISTS tickets_created_at ON tickets (created_at);
+"""
+
+_SQLITE_COLUMNS = ('id', 'name', 'phone', 'email', 'device_name', 'description', 'status',
+                   'priority', 'assigned_to', 'notes', 'created_at', 'updated_at', 'phone_digits')
+
+
+def _sqlite_row(ticket: Dict[str, Any]) -> tuple:
+    """Map a ticket to a tickets-table row, as server.js does"""
+    phone = ticket.get('phone')
+    return (ticket.get('id'), ticket.get('name'), phone, ticket.get('email'),
+            ticket.get('deviceName'), ticket.get('description'), ticket.get('status'),
+            ticket.get('priority'), ticket.get('assignedTo'), json.dumps(ticket.get('notes') or []),
+            ticket.get('createdAt'), ticket.get('updatedAt'),
+            len(_NON_DIGITS.sub('', phone)) if phone else None)
+
+
+class SqliteTicketSource:
+    """Analyze a SQLite ticket table with SQL aggregates
+
+    Works on the database server.js keeps with TICKET_STORE=sqlite, or one
+    filled with import_tickets(). Every section is computed with GROUP BY
+    queries, so only one row per distinct status, device name, hour,
+    weekday, domain and phone length reaches Python. Groups are ordered by
+    their first row, so the output matches TicketAnalyzer on the same
+    tickets. The date range is read from the created_at index and assumes
+    the server's toISOString() format.
+    """
+
+    def __init__(self, db_path: str, device_classifier: Optional[DeviceClassifier] = None,
+                 timestamp_parser: Optional[TimestampParser] = None):
+        self.db_path = db_path
+        self.device_classifier = device_classifier or _DEFAULT_CLASSIFIER
+        self.timestamp_parser = timestamp_parser if timestamp_parser is not None else TimestampParser()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database and make sure the table and indexes exist"""
+        connection = sqlite3.connect(self.db_path)
+        connection.executescript(SQLITE_SCHEMA)
+        return connection
+
+    def import_tickets(self, tickets: Iterable[Dict[str, Any]], batch_size: int = 10_000) -> int:
+        """Insert or update tickets (e.g. from stream_tickets()); returns how many were written"""
+        columns = ', '.join(_SQLITE_COLUMNS)
+        placeholders = ', '.join('?' * len(_SQLITE_COLUMNS))
+        updates = ', '.join(f'{column} = excluded.{column}' for column in _SQLITE_COLUMNS[1:])
+        # ON CONFLICT keeps the rowid, and with it the ticket's position
+        statement = (f'INSERT INTO tickets ({columns}) VALUES ({placeholders}) '
+                     f'ON CONFLICT (id) DO UPDATE SET {updates}')
+
+        written = 0
+        connection = self._connect()
+        try:
+            with connection:
+                for chunk in _iter_chunks(tickets, batch_size):
+                    # TicketRecords are converted as they are, without fetching description and notes
+                    rows = (_sqlite_row(ticket.to_dict() if isinstance(ticket, TicketRecord) else ticket)
+                            for ticket in chunk)
+                    connection.executemany(statement, rows)
+                    written += len(chunk)
+        finally:
+            connection.close()
+        return written
+
+    @staticmethod
+    def _grouped(connection: sqlite3.Connection, query: str, key: Any = None) -> Counter:
+        """Run a (key, count) GROUP BY query ordered by first row into a Counter"""
+        counts = Counter()
+        for value, count in connection.execute(query):
+            if key is not None:
+                value = key(value)
+            counts[value] += count
+        return counts
+
+    def result(self) -> Dict[str, Any]:
+        """Return the analysis sections in the layout used by analyze_tickets"""
+        connection = self._connect()
+        try:
+            return self._result(connection)
+        finally:
+            connection.close()
+
+    def _result(self, connection: sqlite3.Connection) -> Dict[str, Any]:
+        """Build every section over one connection"""
+        grouped = self._grouped
+        total = connection.execute('SELECT COUNT(*) FROM tickets').fetchone()[0]
+
+        status_counts = grouped(connection, """
+            SELECT COALESCE(status, 'unknown'), COUNT(*) FROM tickets
+            GROUP BY 1 ORDER BY MIN(rowid)""")
+
+        device_counts = grouped(connection, """
+            SELECT device_name, COUNT(*) FROM tickets WHERE device_name != ''
+            GROUP BY device_name ORDER BY MIN(rowid)""", str.lower)
+        device_type_counts, brand_counts = Counter(), Counter()
+        for device, count in device_counts.items():
+            device_type, brand = self.device_classifier.classify(device)
+            if device_type:
+                device_type_counts[device_type] += count
+            if brand:
+                brand_counts[brand] += count
+
+        # Only fields a strict ISO parser would accept count as timestamps
+        valid = "created_at != '' AND julianday(created_at) IS NOT NULL"
+        hour_counts = grouped(connection, f"""
+            SELECT CAST(substr(created_at, 12, 2) AS INTEGER), COUNT(*) FROM tickets
+            WHERE {valid} GROUP BY 1 ORDER BY MIN(rowid)""")
+        # strftime('%w') counts from Sunday; weekday() from Monday
+        day_names = _weekday_names()
+        day_counts = grouped(connection, f"""
+            SELECT CAST(strftime('%w', substr(created_at, 1, 10)) AS INTEGER), COUNT(*) FROM tickets
+            WHERE {valid} GROUP BY 1 ORDER BY MIN(rowid)""", lambda day: day_names[(day + 6) % 7])
+
+        domain_counts = grouped(connection, """
+            WITH addresses AS (
+                SELECT rowid AS row, substr(email, instr(email, '@') + 1) AS rest
+                FROM tickets WHERE instr(email, '@') > 0
+            )
+            SELECT CASE WHEN instr(rest, '@') > 0 THEN substr(rest, 1, instr(rest, '@') - 1) ELSE rest END,
+                   COUNT(*)
+            FROM addresses GROUP BY 1 ORDER BY MIN(row)""", str.lower)
+        phone_pattern_counts = grouped(connection, """
+            SELECT phone_digits, COUNT(*) FROM tickets WHERE phone != ''
+            GROUP BY phone_digits ORDER BY MIN(rowid)""", lambda digits: _PHONE_PATTERNS.get(digits, 'Other'))
+        total_emails, total_phones = connection.execute(
+            "SELECT COUNT(CASE WHEN email != '' THEN 1 END), COUNT(CASE WHEN phone != '' THEN 1 END) "
+            "FROM tickets").fetchone()
+
+        time_analysis = {"error": "No valid timestamps found"}
+        total_timestamps = sum(hour_counts.values())
+        if total_timestamps:
+            # The created_at index answers both in O(log n)
+            earliest, latest = (
+                connection.execute(f"SELECT created_at FROM tickets WHERE {valid} "
+                                   f"ORDER BY created_at {direction} LIMIT 1").fetchone()[0]
+                for direction in ('ASC', 'DESC'))
+            time_analysis = {
+                "total_analyzed": total_timestamps,
+                "busiest_hours": dict(hour_counts.most_common(5)),
+                "busiest_days": dict(day_counts),
+                "date_range": {
+                    "earliest": timestamp_datetime(self.timestamp_parser.parse(earliest)).isoformat(),
+                    "latest": timestamp_datetime(self.timestamp_parser.parse(latest)).isoformat()
+                }
+            }
+
+        return {
+            "total_tickets": total,
+            "status_distribution": {
+                "counts": dict(status_counts),
+                "percentages": {status: round((count/total)*100, 1)
+                                for status, count in status_counts.items()}
+            },
+            "device_analysis": {
+                "total_devices": sum(device_counts.values()),
+                "device_types": dict(device_type_counts),
+                "brands": dict(brand_counts),
+                "most_common_devices": dict(device_counts.most_common(5))
+            },
+            "time_analysis": time_analysis,
+            "contact_analysis": {
+                "total_emails": total_emails,
+                "email_domains": dict(domain_counts.most_common(10)),
+                "total_phones": total_phones,
+                "phone_patterns": dict(phone_pattern_counts)
+            },
+            "summary": {}
+        }
+
+
+class JournalReader:
+    """Read and follow the append-only journal that server.js writes
+
+    The server keeps a compacted snapshot (tickets.json) plus one JSON line
+    per mutation in tickets.journal: {"op": "put", "ticket": {...}} or
+    {"op": "delete", "id": ...}. load() rebuilds the current ticket list
+    from both; read_changes() then returns only lines appended since, and
+    notices when compaction swaps in a new journal file.
+    """
+
+    def __init__(self, journal_path: str, snapshot_path: Optional[str] = None):
+        self.journal_path = journal_path
+        self.snapshot_path = snapshot_path or os.path.join(os.path.dirname(journal_path), 'tickets.json')
+        self.compacting_path = journal_path + '.compacting'
+        self._file = None
+        # Bytes of a line the server has not finished writing
+        self._partial = b''
+
+    def close(self) -> None:
+        """Close the journal file"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._partial = b''
+
+    def load(self) -> List[Dict[str, Any]]:
+        """Return the current tickets and start following the journal from its end"""
+        while True:
+            before = self._stat(self.snapshot_path)
+            try:
+                with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                    tickets = json.load(f)
+            except FileNotFoundError:
+                tickets = []
+
+            by_id = {ticket.get('id'): ticket for ticket in tickets}
+            try:
+                with open(self.compacting_path, 'rb') as f:
+                    self._replay(self._parse_lines(f.read().split(b'\n')), by_id)
+            except FileNotFoundError:
+                pass
+            self.close()
+            self._replay(self._read_lines(), by_id)
+
+            # A compaction that finished mid-load may have folded entries we
+            # skipped into a newer snapshot; start over in that case
+            if self._stat(self.snapshot_path) == before:
+                return list(by_id.values())
+
+    def read_changes(self) -> Tuple[List[Dict[str, Any]], List[Any]]:
+        """Return (upserted tickets, deleted ids) appended since the last call"""
+        entries = self._read_lines()
+        if self._file is not None:
+            current = os.fstat(self._file.fileno()).st_ino
+            # Compaction renames the journal and starts a new one; the old
+            # file is complete once the server has removed it, so drain it
+            # and switch over
+            if self._stat(self.journal_path) not in (None, current) and \
+                    self._stat(self.compacting_path) != current:
+                entries.extend(self._read_lines())
+                self.close()
+                entries.extend(self._read_lines())
+
+        upserts, removed_ids = [], []
+        for entry in entries:
+            if entry.get('op') == 'put':
+                upserts.append(entry['ticket'])
+            elif entry.get('op') == 'delete':
+                removed_ids.append(entry['id'])
+        return upserts, removed_ids
+
+    def follow(self, poll_interval: float = 0.5) -> Iterator[Tuple[List[Dict[str, Any]], List[Any]]]:
+        """Yield (upserts, removed_ids) batches as the server appends them"""
+        while True:
+            upserts, removed_ids = self.read_changes()
+            if upserts or removed_ids:
+                yield upserts, removed_ids
+            else:
+                time.sleep(poll_interval)
+
+    @staticmethod
+    def _stat(path: str) -> Optional[int]:
+        """Return the inode of a path, or None if it does not exist"""
+        try:
+            return os.stat(path).st_ino
+        except FileNotFoundError:
+            return None
+
+    def _read_lines(self) -> List[Dict[str, Any]]:
+        """Read the complete journal lines appended since the last read
+
+        The file is read as bytes and only whole lines are decoded, since a
+        read can stop inside a multi-byte character the server is writing.
+        """
+        if self._file is None:
+            try:
+                self._file = open(self.journal_path, 'rb')
+            except FileNotFoundError:
+                return []
+        lines = (self._partial + self._file.read()).split(b'\n')
+        # The last piece is empty or a line the server has not finished writing
+        self._partial = lines.pop()
+        return self._parse_lines(lines)
+
+    @staticmethod
+    def _parse_lines(lines: List[bytes]) -> List[Dict[str, Any]]:
+        """Decode UTF-8 journal lines, skipping blank and unreadable ones"""
+        entries = []
+        for line in lines:
+            if not line:
+                continue
+            try:
+                entries.append(json.loads(line.decode('utf-8')))
+            except ValueError as e:
+                print(f"Skipping unreadable journal line: {e}")
+        return entries
+
+    @staticmethod
+    def _replay(entries: List[Dict[str, Any]], by_id: Dict[Any, Dict[str, Any]]) -> None:
+        """Apply journal entries to tickets keyed by id"""
+        for entry in entries:
+            if entry.get('op') == 'put':
+                by_id[entry['ticket'].get('id')] = entry['ticket']
+            elif entry.get('op') == 'delete':
+                by_id.pop(entry['id'], None)
+
+
+# What one more item adds to a list's own size (one pointer)
+_LIST_SLOT_BYTES = 8
+
+
+def _approx_size(value: Any, samples: int = 32, depth: int = 4) -> int:
+    """Estimate the memory held by a JSON-like value, in bytes
+
+    Containers longer than `samples` are estimated from evenly spaced
+    items, so sizing a large ticket list costs O(samples), not O(n).
+    """
+    size = sys.getsizeof(value)
+    if depth == 0:
+        return size
+    if isinstance(value, dict):
+        # Keys are left out: decoded JSON objects share their key strings
+        items = list(itertools.islice(value.values(), samples))
+        measured = sum(_approx_size(item, samples, depth - 1) for item in items)
+    elif isinstance(value, (list, tuple)):
+        step = max(1, len(value) // samples)
+        items = value[::step][:samples]
+        measured = sum(_approx_size(item, samples, depth - 1) for item in items)
+    else:
+        return size
+    return size + (measured * len(value) // len(items) if items else 0)
+
+
+class TTLCache:
+    """Bounded cache with per-entry TTL, LRU eviction and a memory budget
+
+    Keys are tuples whose first item names the kind of entry (for
+    TicketProcessor: 'collection', 'ticket', 'query', 'analysis'); hits
+    and misses are counted per kind. When either max_entries or max_bytes
+    (estimated with _approx_size unless given) is exceeded, the least
+    recently used entries are evicted; a value larger than the whole
+    budget is not stored. An expired entry is a miss for get() but is
+    kept until evicted, so peek() can still hand it back for revalidation.
+
+    Entries of pinned_kinds are never evicted and are left out of both
+    limits (their size is reported as pinned_bytes); the TTL still
+    governs them. TicketProcessor pins its ticket list, which the other
+    entries are derived from and which can outgrow any budget.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 256 * 1024 * 1024,
+                 ttl: float = 300.0, pinned_kinds: Iterable[str] = ()):
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError("max_entries and max_bytes must be at least 1")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.pinned_kinds = frozenset(pinned_kinds)
+        self.bytes = 0
+        self.pinned_bytes = 0
+        self._pinned_entries = 0
+        # key -> [value, expires_at, size], least recently used first
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = Counter()
+        self.misses = Counter()
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, key: tuple) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def _evict(self) -> None:
+        """Drop least recently used unpinned entries until both limits hold"""
+        while (len(self._entries) - self._pinned_entries > self.max_entries
+               or self.bytes > self.max_bytes):
+            key = next(key for key in self._entries if key[0] not in self.pinned_kinds)
+            self.bytes -= self._entries.pop(key)[2]
+            self.evictions += 1
+
+    def get(self, key: tuple, default: Any = None) -> Any:
+        """Return a fresh cached value, or default on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= time.monotonic():
+                if entry is not None:
+                    self.expirations += 1
+                self.misses[key[0]] += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits[key[0]] += 1
+            return entry[0]
+
+    def peek(self, key: tuple, default: Any = None) -> Any:
+        """Return a cached value even if expired, without touching stats or LRU order"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return default if entry is None else entry[0]
+
+    def set(self, key: tuple, value: Any, ttl: Optional[float] = None,
+            size: Optional[int] = None) -> bool:
+        """Store a value; returns False if it is larger than the whole budget"""
+        size = _approx_size(value) if size is None else size
+        pinned = key[0] in self.pinned_kinds
+        with self._lock:
+            self.pop(key)
+            if size > self.max_bytes and not pinned:
+                return False
+            expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+            self._entries[key] = [value, expires_at, size]
+            if pinned:
+                self.pinned_bytes += size
+                self._pinned_entries += 1
+            else:
+                self.bytes += size
+                self._evict()
+            return True
+
+    def touch(self, key: tuple, ttl: Optional[float] = None) -> None:
+        """Mark an entry fresh again for another ttl seconds"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[1] = time.monotonic() + (self.ttl if ttl is None else ttl)
+                self._entries.move_to_end(key)
+
+    def expire(self, key: tuple) -> None:
+        """Mark an entry stale; peek() still returns it"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[1] = 0.0
+
+    def resize(self, key: tuple, delta: int) -> None:
+        """Re-account an entry whose value grew (or shrank) in place by delta bytes
+
+        The entry becomes the most recently used, and others are evicted as
+        set() does if the budget is now exceeded; an unpinned entry that has
+        outgrown the whole budget is dropped.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            size = max(entry[2] + delta, 0)
+            if key[0] in self.pinned_kinds:
+                self.pinned_bytes += size - entry[2]
+                entry[2] = size
+                return
+            if size > self.max_bytes:
+                self.pop(key)
+                return
+            self.bytes += size - entry[2]
+            entry[2] = size
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def pop(self, key: tuple, default: Any = None) -> Any:
+        """Remove an entry and return its value"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return default
+            if key[0] in self.pinned_kinds:
+                self.pinned_bytes -= entry[2]
+                self._pinned_entries -= 1
+            else:
+                self.bytes -= entry[2]
+            return entry[0]
+
+    def discard_kind(self, kind: str) -> None:
+        """Remove every entry of one kind"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == kind]:
+                self.pop(key)
+
+    def clear(self) -> None:
+        """Remove every entry (statistics are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+            self.pinned_bytes = 0
+            self._pinned_entries = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counts (overall and per kind), evictions and memory use"""
+        kinds = sorted(set(self.hits) | set(self.misses))
+        return {
+            "hits": sum(self.hits.values()),
+            "misses": sum(self.misses.values()),
+            "expired": self.expirations,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "pinned_bytes": self.pinned_bytes,
+            "by_kind": {kind: {"hits": self.hits[kind], "misses": self.misses[kind]} for kind in kinds},
+        }
+
+
+def _new_session(retries: int = 3, backoff_factor: float = 0.5,
+                 pool_size: int = 10) -> requests.Session:
+    """Return a keep-alive session that retries failed GETs with backoff"""
+    retry = Retry(total=retries, backoff_factor=backoff_factor,
+                  status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=frozenset(['GET', 'HEAD']), raise_on_status=False)
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def render_text_report(analysis: Dict[str, Any]) -> str:
+    """Render an analyze_tickets() result as the plain-text report"""
+    report_lines = [
+        "=" * 50,
+        "TICKET SYSTEM ANALYSIS REPORT",
+        "=" * 50,
+        f"Generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+        "",
+        f"📊 OVERVIEW",
+        f"Total Tickets: {analysis['total_tickets']}",
+        "",
+        f"📈 STATUS DISTRIBUTION",
+    ]
+    
+    # Status distribution
+    status_dist = analysis.get('status_distribution', {})
+    for status, count in status_dist.get('counts', {}).items():
+        percentage = status_dist.get('percentages', {}).get(status, 0)
+        report_lines.append(f"  {status.title()}: {count} ({percentage}%)")
+    
+    report_lines.extend([
+        "",
+        f"💻 DEVICE ANALYSIS",
+    ])
+    
+    # Device analysis
+    device_analysis = analysis.get('device_analysis', {})
+    device_types = device_analysis.get('device_types', {})
+    for device_type, count in device_types.items():
+        report_lines.append(f"  {device_type}: {count}")
+    
+    # Summary insights
+    summary = analysis.get('summary', {})
+    if summary:
+        report_lines.extend([
+            "",
+            f"🔍 KEY INSIGHTS",
+            f"Most common status: {summary.get('most_common_status', 'N/A')}",
+            f"Most common device: {summary.get('most_common_device_type', 'N/A')}",
+            f"Peak activity hour: {summary.get('peak_hour', 'N/A')}",
+        ])
+    
+    return "\n".join(report_lines)
+
+
+def render_markdown_report(analysis: Dict[str, Any]) -> str:
+    """Render an analyze_tickets() result as a Markdown report"""
+    lines = [
+        "# Ticket System Analysis Report",
+        "",
+        f"Generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+        "",
+        f"**Total tickets:** {analysis['total_tickets']}",
+        "",
+        "## Status Distribution",
+        "",
+        "| Status | Count | Share |",
+        "| --- | ---: | ---: |",
+    ]
+    status_dist = analysis.get('status_distribution', {})
+    for status, count in status_dist.get('counts', {}).items():
+        percentage = status_dist.get('percentages', {}).get(status, 0)
+        lines.append(f"| {status.title()} | {count} | {percentage}% |")
+    
+    lines.extend(["", "## Device Analysis", "", "| Device type | Count |", "| --- | ---: |"])
+    for device_type, count in analysis.get('device_analysis', {}).get('device_types', {}).items():
+        lines.append(f"| {device_type} | {count} |")
+    
+    summary = analysis.get('summary', {})
+    if summary:
+        lines.extend([
+            "",
+            "## Key Insights",
+            "",
+            f"- Most common status: {summary.get('most_common_status', 'N/A')}",
+            f"- Most common device: {summary.get('most_common_device_type', 'N/A')}",
+            f"- Peak activity hour: {summary.get('peak_hour', 'N/A')}",
+        ])
+    return "\n".join(lines)
+
+
+def render_json_report(analysis: Dict[str, Any]) -> str:
+    """Render an analyze_tickets() result as JSON"""
+    return json.dumps(analysis, indent=2, default=str)
+
+
+# Report formats accepted by TicketProcessor.generate_report
+REPORT_RENDERERS = {
+    'text': render_text_report,
+    'markdown': render_markdown_report,
+    'json': render_json_report,
+}
+
+
+def _dataset_fingerprint(tickets: List[Dict[str, Any]]) -> str:
+    """Hash every ticket's id and updatedAt into a short fingerprint
+
+    The server bumps updatedAt on every change, so two fetches of the same
+    tickets share a fingerprint even when their ETags differ (for example
+    after a server restart).
+    """
+    digest = hashlib.blake2b(str(len(tickets)).encode(), digest_size=16)
+    for chunk in _iter_chunks(tickets, 10_000):
+        digest.update('\x1e'.join(f"{ticket.get('id')}\x1f{ticket.get('updatedAt')}"
+                                   for ticket in chunk).encode('utf-8', 'surrogatepass'))
+        digest.update(b'\x1d')
+    return digest.hexdigest()
+
+
+class ProcessorMetrics:
+    """Per-stage timers and counters collected by a TicketProcessor
+
+    stage(name) times a block of work: its calls, wall-clock seconds and
+    process CPU seconds and, with trace_memory=True, the peak memory
+    tracemalloc saw allocated above the block's starting point. Stages
+    nest, and an outer stage's numbers include its inner ones. tracemalloc
+    runs only while a stage is open, unless it was already running.
+    count() adds to named counters such as bytes_fetched.
+
+    TicketProcessor records fetch, fetch_stats, decode, analyze, summary and render.
+    The analysis sections are built together in one pass, so "analyze" is
+    a single fused stage with no per-section breakdown.
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        # Stage name -> {"calls", "wall_seconds", "cpu_seconds"[, "peak_memory_bytes"]}
+        self.stages = {}
+        self.counters = Counter()
+        self._lock = threading.Lock()
+        # Per thread: [starting memory, peak so far] of each open stage, innermost last
+        self._local = threading.local()
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += amount
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as one call of the named stage"""
+        marks = None
+        if self.trace_memory:
+            marks = self._local.__dict__.setdefault('marks', [])
+            if not marks:
+                self._local.started_tracing = not tracemalloc.is_tracing()
+                if self._local.started_tracing:
+                    tracemalloc.start()
+            current, peak = tracemalloc.get_traced_memory()
+            if marks:
+                # The peak is about to be reset, so hand it to the enclosing stage first
+                marks[-1][1] = max(marks[-1][1], peak)
+            tracemalloc.reset_peak()
+            marks.append([current, current])
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            peak_memory = None
+            if marks is not None:
+                start, peak = marks.pop()
+                peak = max(peak, tracemalloc.get_traced_memory()[1])
+                peak_memory = max(peak - start, 0)
+                if marks:
+                    marks[-1][1] = max(marks[-1][1], peak)
+                elif self._local.started_tracing:
+                    tracemalloc.stop()
+            with self._lock:
+                stats = self.stages.get(name)
+                if stats is None:
+                    stats = self.stages[name] = {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0}
+                stats["calls"] += 1
+                stats["wall_seconds"] += wall
+                stats["cpu_seconds"] += cpu
+                if peak_memory is not None:
+                    stats["peak_memory_bytes"] = max(stats.get("peak_memory_bytes", 0), peak_memory)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return a copy of the stage timings and counters"""
+        with self._lock:
+            return {"stages": {name: dict(stats) for name, stats in self.stages.items()},
+                    "counters": dict(self.counters)}
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stages.clear()
+            self.counters.clear()
+
+
+def _profiled(stage: str):
+    """Run a TicketProcessor method as a stage of its metrics"""
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.stage(stage):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def _prometheus_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for value in labels.values())
+    return '{' + ','.join(f'{key}="{value}"' for key, value in zip(labels, escaped)) + '}'
+
+
+def render_prometheus(metrics: Dict[str, Any], prefix: str = 'ticket_processor') -> str:
+    """Render a TicketProcessor.metrics_report() in the Prometheus text exposition format"""
+    lines = []
+
+    def family(name: str, kind: str, help_text: str, samples: List[Tuple[Dict[str, Any], Any]]) -> None:
+        if not samples:
+            return
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} {kind}")
+        for labels, value in samples:
+            lines.append(f"{prefix}_{name}{_prometheus_labels(labels)} {value}")
+
+    stages = sorted(metrics.get("stages", {}).items())
+    family("stage_calls_total", "counter", "Times each processing stage ran",
+           [({"stage": name}, stats["calls"]) for name, stats in stages])
+    family("stage_wall_seconds_total", "counter", "Wall-clock time spent in each processing stage",
+           [({"stage": name}, stats["wall_seconds"]) for name, stats in stages])
+    family("stage_cpu_seconds_total", "counter", "Process CPU time spent in each processing stage",
+           [({"stage": name}, stats["cpu_seconds"]) for name, stats in stages])
+    family("stage_peak_memory_bytes", "gauge", "Largest tracemalloc peak above the starting point of a stage call",
+           [({"stage": name}, stats["peak_memory_bytes"]) for name, stats in stages
+            if "peak_memory_bytes" in stats])
+    for name, value in sorted(metrics.get("counters", {}).items()):
+        family(f"{name}_total", "counter", f"Total {name.replace('_', ' ')}", [({}, value)])
+
+    cache = metrics.get("cache")
+    if cache:
+        kinds = sorted(cache["by_kind"].items())
+        family("cache_hits_total", "counter", "Cache lookups answered, by entry kind",
+               [({"kind": kind}, counts["hits"]) for kind, counts in kinds])
+        family("cache_misses_total", "counter", "Cache lookups that missed, by entry kind",
+               [({"kind": kind}, counts["misses"]) for kind, counts in kinds])
+        family("cache_hit_ratio", "gauge", "Share of cache lookups answered, by entry kind",
+               [({"kind": kind}, counts["hit_rate"]) for kind, counts in kinds])
+        family("cache_evictions_total", "counter", "Cache entries evicted for space", [({}, cache["evictions"])])
+        family("cache_entries", "gauge", "Entries held in the cache", [({}, cache["entries"])])
+        family("cache_bytes", "gauge", "Estimated memory held by the cache", [({}, cache["bytes"])])
+        family("cache_pinned_bytes", "gauge", "Estimated memory held by pinned cache entries, outside the budget",
+               [({}, cache.get("pinned_bytes", 0))])
+    return '\n'.join(lines) + '\n'
+
+
+def render_profile(metrics: Dict[str, Any]) -> str:
+    """Render a TicketProcessor.metrics_report() as a plain-text table"""
+    lines = ["⏱️ Profile", "=" * 30,
+             f"{'Stage':<28}{'Calls':>7}{'Wall s':>10}{'CPU s':>10}{'Peak MiB':>10}"]
+    stages = sorted(metrics.get("stages", {}).items(), key=lambda item: -item[1]["wall_seconds"])
+    for name, stats in stages:
+        peak = stats.get("peak_memory_bytes")
+        lines.append(f"{name:<28}{stats['calls']:>7}{stats['wall_seconds']:>10.3f}{stats['cpu_seconds']:>10.3f}"
+                     f"{'-' if peak is None else f'{peak / 2**20:.1f}':>10}")
+    counters = metrics.get("counters", {})
+    if counters:
+        lines.append("")
+        lines.extend(f"{name.replace('_', ' ').capitalize()}: {value:,}" for name, value in sorted(counters.items()))
+    cache = metrics.get("cache")
+    if cache and cache["by_kind"]:
+        lines.append("")
+        lines.extend(f"Cache hit rate ({kind}): {counts['hit_rate']:.0%} of {counts['hits'] + counts['misses']}"
+                     for kind, counts in sorted(cache["by_kind"].items()))
+    return '\n'.join(lines)
+
 
 class TicketProcessor:
     """Main class for processing ticket data"""
     
-    def __init__(self, api_base_url: str = "http://localhost:3000/api"):
+    # iter_ticket_pages filter names and the /api/tickets parameters they map to
+    TICKET_FILTERS = {
+        'status': 'status',
+        'priority': 'priority',
+        'assigned_to': 'assignedTo',
+        'created_from': 'createdFrom',
+        'created_to': 'createdTo',
+        'updated_from': 'updatedFrom',
+        'updated_to': 'updatedTo',
+    }
+    
+    # How long fetched tickets are served without asking the API again
+    CACHE_TTL = datetime.timedelta(minutes=5)
+    # Cache key of the full ticket list; single tickets, filtered queries and
+    # analyses are cached under ('ticket', id), ('query', ...) and ('analysis', ...)
+    COLLECTION_KEY = ('collection',)
+    # Bumped whenever the on-disk snapshot layout changes
+    DISK_CACHE_FORMAT = 1
+    # Keys kept per top-k sketch by analyze_tickets(approximate=True)
+    SKETCH_CAPACITY = 1024
+    
+    def __init__(self, api_base_url: str = "http://localhost:3000/api",
+                 cache_file: Optional[str] = None,
+                 device_classifier: Optional[DeviceClassifier] = None,
+                 timeout: float = 10.0, retries: int = 3, backoff_factor: float = 0.5,
+                 cache_max_entries: int = 1024, cache_max_bytes: int = 256 * 1024 * 1024,
+                 compact: bool = False, trace_memory: bool = False):
         self.api_base_url = api_base_url
-        self.tickets_cache = []
+        # Keep fetched tickets as TicketRecords rather than dicts
+        self.compact = compact
+        self.cache_file = cache_file
+        # Stage timings and counters; trace_memory adds tracemalloc peaks per stage
+        self.metrics = ProcessorMetrics(trace_memory)
+        # One pooled session per processor, so requests reuse connections
+        self.session = _new_session(retries, backoff_factor)
+        self.session.hooks['response'].append(self._count_response)
+        self.timeout = timeout
+        # Why the last fetch_tickets() call returned nothing, if it failed
+        self.last_error = None
+        self.device_classifier = device_classifier or _DEFAULT_CLASSIFIER
+        # Shared by every analysis so each timestamp string is parsed once
+        self.timestamp_parser = TimestampParser()
+        # Fetched tickets, single tickets, queries and analyses, within a memory budget
+        # The ticket list is pinned: everything else is derived from it, and
+        # losing it would also lose the validators for a conditional re-fetch
+        self.cache = TTLCache(cache_max_entries, cache_max_bytes, self.CACHE_TTL.total_seconds(),
+                              pinned_kinds=(self.COLLECTION_KEY[0],))
+        # When the ticket list was last downloaded or confirmed unchanged
         self.last_fetch = None
+        # Incremented whenever tickets_cache is replaced with new data
+        self.data_version = 0
+        # Validators from the last full response, sent back on refresh
+        self.etag = None
+        self.last_modified = None
+        self.incremental_analyzer = None
+        self._incremental_version = None
+        self._frame = None
+        self._frame_version = None
+        self._time_series = None
+        self._time_series_version = None
+        self._search_index = None
+        self._search_index_version = None
+        # include_contact -> [TicketDuplicateDetector, data_version it reflects]
+        self._duplicate_detectors = {}
+        self._fingerprint_value = None
+        self._fingerprint_version = None
+        # Position in the server's change feed that tickets_cache reflects
+        self.change_id = None
+        self._positions = None
+        self._positions_version = None
+        # Last /api/stats payload and its ETag, revalidated on each fetch_stats()
+        self._stats = None
+        self._stats_etag = None
+        if cache_file:
+            self._load_disk_cache()
+    
+    @property
+    def tickets_cache(self) -> List[Dict[str, Any]]:
+        """The last fetched ticket list, even if stale; empty once evicted"""
+        return self.cache.peek(self.COLLECTION_KEY, [])
+    
+    @tickets_cache.setter
+    def tickets_cache(self, tickets: List[Dict[str, Any]]) -> None:
+        self.cache.set(self.COLLECTION_KEY, tickets)
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Return the cache's hit/miss counts, evictions and memory use"""
+        return self.cache.stats()
+    
+    def metrics_report(self) -> Dict[str, Any]:
+        """Return the stage timings and counters, with the cache's hit rates
+
+        See ProcessorMetrics; render_prometheus() and render_profile()
+        format the result.
+        """
+        report = self.metrics.as_dict()
+        cache = self.cache_stats()
+        lookups = cache["hits"] + cache["misses"]
+        cache["hit_rate"] = round(cache["hits"] / lookups, 4) if lookups else 0.0
+        for counts in cache["by_kind"].values():
+            lookups = counts["hits"] + counts["misses"]
+            counts["hit_rate"] = round(counts["hits"] / lookups, 4) if lookups else 0.0
+        report["cache"] = cache
+        return report
+    
+    def _count_response(self, response: requests.Response, *args: Any, **kwargs: Any) -> None:
+        """Session hook counting API requests and the bytes they downloaded"""
+        self.metrics.count('http_requests')
+        # Streamed bodies are counted as they are read (see stream_tickets)
+        if not kwargs.get('stream'):
+            self.metrics.count('bytes_fetched', len(response.content))
+    
+    def _load_disk_cache(self) -> None:
+        """Restore tickets and validators from the on-disk snapshot, if usable"""
+        try:
+            with open(self.cache_file, 'rb') as f:
+                snapshot = marshal.load(f)
+                # The file's mtime records when the snapshot was last confirmed fresh
+                fetched_at = os.fstat(f.fileno()).st_mtime
+        except FileNotFoundError:
+            return
+        except (OSError, EOFError, ValueError, TypeError) as e:
+            print(f"Ignoring unreadable ticket cache {self.cache_file}: {e}")
+            return
+        
+        if (not isinstance(snapshot, dict) or
+                snapshot.get('format') != self.DISK_CACHE_FORMAT or
+                snapshot.get('api_base_url') != self.api_base_url or
+                snapshot.get('compact', False) != self.compact):
+            return
+        
+        # The snapshot is fresh for what is left of CACHE_TTL since it was written
+        age = time.time() - fetched_at
+        if not self.cache.set(self.COLLECTION_KEY, self._compact_tickets(snapshot['tickets']),
+                              ttl=self.CACHE_TTL.total_seconds() - age):
+            return
+        self.etag = snapshot.get('etag')
+        self.last_modified = snapshot.get('last_modified')
+        self.last_fetch = datetime.datetime.fromtimestamp(fetched_at)
+        self.data_version += 1
+    
+    def _save_disk_cache(self) -> None:
+        """Write tickets and validators to the on-disk snapshot"""
+        snapshot = {
+            'format': self.DISK_CACHE_FORMAT,
+            'api_base_url': self.api_base_url,
+            'etag': self.etag,
+            'last_modified': self.last_modified,
+            # marshal only takes built-in types; compact snapshots omit description and notes
+            'compact': self.compact,
+            'tickets': ([ticket.to_dict() for ticket in self.tickets_cache] if self.compact
+                        else self.tickets_cache),
+        }
+        # marshal loads far faster than JSON; write to a temp file so readers
+        # never see a half-written snapshot
+        temp_file = f"{self.cache_file}.tmp"
+        try:
+            with open(temp_file, 'wb') as f:
+                marshal.dump(snapshot, f)
+            os.replace(temp_file, self.cache_file)
+        except (OSError, ValueError) as e:
+            print(f"Error saving ticket cache: {e}")
+    
+    def _touch_disk_cache(self) -> None:
+        """Mark the on-disk snapshot as freshly revalidated"""
+        try:
+            os.utime(self.cache_file)
+        except OSError as e:
+            print(f"Error updating ticket cache: {e}")
     
     def fetch_tickets(self, force_refresh: bool = False) -> List[Dict[str, Any]]:
-        """Fetch tickets from the Node.js API"""
+        """Fetch tickets from the Node.js API
+
+        Refreshes are conditional (If-None-Match/If-Modified-Since), so an
+        unchanged collection costs a 304 and no download or JSON decode.
+        """
         try:
-            # Use cache if recent (within 5 minutes) and not forcing refresh
-            if (not force_refresh and 
-                self.last_fetch and 
-                (datetime.datetime.now() - self.last_fetch).seconds < 300):
-                return self.tickets_cache
+            # Use cache if recent (within CACHE_TTL) and not forcing refresh
+            if not force_refresh:
+                cached = self.cache.get(self.COLLECTION_KEY)
+                if cached is not None:
+                    return cached
             
-            response = requests.get(f"{self.api_base_url}/tickets")
-            response.raise_for_status()
+            # Validators are only useful while the list they describe is still cached
+            headers = {}
+            if self.COLLECTION_KEY in self.cache:
+                if self.etag:
+                    headers['If-None-Match'] = self.etag
+                if self.last_modified:
+                    headers['If-Modified-Since'] = self.last_modified
             
-            data = response.json()
-            if data.get('success'):
-                self.tickets_cache = data.get('data', [])
+            self.last_error = None
+            with self.metrics.stage('fetch'):
+                response = self.session.get(f"{self.api_base_url}/tickets", headers=headers,
+                                            timeout=self.timeout)
+            if response.status_code == 304:
                 self.last_fetch = datetime.datetime.now()
+                self.cache.touch(self.COLLECTION_KEY)
+                self.change_id = response.headers.get('X-Change-Id', self.change_id)
+                if self.cache_file:
+                    self._touch_disk_cache()
                 return self.tickets_cache
+            response.raise_for_status()
+            
+            with self.metrics.stage('decode'):
+                data = response.json()
+                tickets = self._compact_tickets(data.get('data', [])) if data.get('success') else None
+            if tickets is not None:
+                self.metrics.count('tickets_fetched', len(tickets))
+                # Not kept if it is larger than the whole cache budget
+                self.tickets_cache = tickets
+                self.change_id = response.headers.get('X-Change-Id')
+                self.last_fetch = datetime.datetime.now()
+                self.data_version += 1
+                self.etag = response.headers.get('ETag')
+                self.last_modified = response.headers.get('Last-Modified')
+                if self.cache_file:
+                    self._save_disk_cache()
+                return tickets
             else:
-                print(f"API Error: {data.get('message', 'Unknown error')}")
+                self.last_error = f"API Error: {data.get('message', 'Unknown error')}"
+                print(self.last_error)
                 return []
                 
         except requests.exceptions.RequestException as e:
-            print(f"Network error fetching tickets: {e}")
+            self.last_error = f"Network error fetching tickets: {e}"
+            print(self.last_error)
             return []
         except json.JSONDecodeError as e:
-            print(f"JSON decode error: {e}")
+            self.last_error = f"JSON decode error: {e}"
+            print(self.last_error)
             return []
     
-    def analyze_tickets(self) -> Dict[str, Any]:
-        """Analyze ticket data and return insights"""
-        tickets = self.fetch_tickets()
+    def fetch_stats(self) -> Optional[Dict[str, Any]]:
+        """Fetch the server's live ticket counters from /api/stats
+
+        Returns the counters (total, statuses, priorities, deviceTypes,
+        hours), or None if the server has no stats endpoint or cannot be
+        reached. Unchanged counters cost a 304.
+        """
+        headers = {'If-None-Match': self._stats_etag} if self._stats_etag else {}
+        try:
+            self.last_error = None
+            with self.metrics.stage('fetch_stats'):
+                response = self.session.get(f"{self.api_base_url}/stats", headers=headers,
+                                            timeout=self.timeout)
+            if response.status_code == 304:
+                return self._stats
+            if response.status_code == 404:
+                self.last_error = "API Error: server does not provide /stats"
+                return None
+            response.raise_for_status()
+            
+            data = response.json()
+            if not data.get('success'):
+                self.last_error = f"API Error: {data.get('message', 'Unknown error')}"
+                print(self.last_error)
+                return None
+            self._stats = data.get('data', {})
+            self._stats_etag = response.headers.get('ETag')
+            return self._stats
+        except requests.exceptions.RequestException as e:
+            self.last_error = f"Network error fetching stats: {e}"
+            print(self.last_error)
+            return None
+        except json.JSONDecodeError as e:
+            self.last_error = f"JSON decode error: {e}"
+            print(self.last_error)
+            return None
+    
+    def fetch_ticket(self, ticket_id: str, force_refresh: bool = False) -> Optional[Dict[str, Any]]:
+        """Fetch one ticket, from the cache when possible
+
+        A fresh cached ticket list answers without a request; otherwise
+        GET /tickets/<id> is cached under the ticket's own key. Returns None
+        if the ticket does not exist or cannot be fetched.
+        """
+        key = ('ticket', ticket_id)
+        if not force_refresh:
+            ticket = self.cache.get(key)
+            if ticket is not None:
+                return ticket
+            if self.cache.get(self.COLLECTION_KEY) is not None:
+                position = self._ticket_positions().get(ticket_id)
+                if position is not None:
+                    return self.tickets_cache[position]
+        
+        ticket = self._request_ticket(ticket_id)
+        if ticket is not None:
+            self.cache.set(key, ticket)
+        return ticket
+    
+    def _request_ticket(self, ticket_id: str) -> Optional[Dict[str, Any]]:
+        """GET /tickets/<id> as a full ticket dict; also loads TicketRecord details"""
+        try:
+            self.last_error = None
+            response = self.session.get(f"{self.api_base_url}/tickets/{ticket_id}", timeout=self.timeout)
+            data = response.json()
+            if response.status_code == 200 and data.get('success'):
+                return data.get('data')
+            self.last_error = f"API Error: {data.get('message', response.status_code)}"
+        except requests.exceptions.RequestException as e:
+            self.last_error = f"Network error fetching ticket: {e}"
+        except json.JSONDecodeError as e:
+            self.last_error = f"JSON decode error: {e}"
+        print(self.last_error)
+        return None
+    
+    def _compact_tickets(self, tickets: List[Dict[str, Any]]) -> List[Any]:
+        """With compact=True, replace ticket dicts with TicketRecords in place"""
+        if self.compact:
+            # Replacing one at a time lets each dict be freed as soon as it is converted
+            loader = self._request_ticket
+            for index, ticket in enumerate(tickets):
+                if isinstance(ticket, dict):
+                    tickets[index] = TicketRecord(ticket, loader)
+        return tickets
+    
+    def query_tickets(self, page_size: int = 500, **filters: Any) -> List[Dict[str, Any]]:
+        """Return the tickets matching iter_ticket_pages filters, cached per query"""
+        key = ('query',) + tuple(sorted(self._ticket_query(filters).items()))
+        tickets = self.cache.get(key)
+        if tickets is None:
+            tickets = self._compact_tickets(list(self.iter_tickets(page_size, **filters)))
+            # A partial result from a failed walk is not worth keeping
+            if self.last_error is None:
+                self.cache.set(key, tickets)
+        return tickets
+    
+    def _ticket_positions(self) -> Dict[Any, int]:
+        """Map ticket ids to their index in tickets_cache, rebuilt when the data changes"""
+        if self._positions is None or self._positions_version != self.data_version:
+            self._positions = {ticket.get('id'): index for index, ticket in enumerate(self.tickets_cache)}
+            self._positions_version = self.data_version
+        return self._positions
+    
+    def login(self, username: str, password: str) -> bool:
+        """Log in to the API; the session cookie authorizes bulk writes"""
+        try:
+            self.last_error = None
+            response = self.session.post(f"{self.api_base_url}/auth/login",
+                                         json={"username": username, "password": password},
+                                         timeout=self.timeout)
+            data = response.json()
+            if response.status_code == 200 and data.get('success'):
+                return True
+            self.last_error = f"Login failed: {data.get('message', response.status_code)}"
+        except requests.exceptions.RequestException as e:
+            self.last_error = f"Network error logging in: {e}"
+        except json.JSONDecodeError as e:
+            self.last_error = f"JSON decode error: {e}"
+        print(self.last_error)
+        return False
+    
+    # Tickets per bulk request; the server accepts at most 1000
+    BULK_CHUNK_SIZE = 500
+    
+    def bulk_create(self, tickets: Iterable[Dict[str, Any]], chunk_size: int = BULK_CHUNK_SIZE,
+                    max_workers: int = 4) -> List[Dict[str, Any]]:
+        """Create many tickets through POST /tickets/bulk
+
+        The input is split into chunks of chunk_size, sent max_workers at a
+        time; the server validates and persists each chunk as a unit. Needs
+        a logged-in session (see login). Returns the created tickets in
+        input order; tickets from failed chunks are missing and the first
+        failure is kept in last_error.
+        """
+        return self._send_bulk('POST', 'tickets', tickets, chunk_size, max_workers)
+    
+    def bulk_update(self, updates: Iterable[Dict[str, Any]], chunk_size: int = BULK_CHUNK_SIZE,
+                    max_workers: int = 4) -> List[Dict[str, Any]]:
+        """Apply many PATCH-style updates through PATCH /tickets/bulk
+
+        Each update is a dict with the ticket's "id" and any of status,
+        assignedTo, priority, note and author. Chunking, concurrency and
+        error handling are as in bulk_create. Returns the updated tickets.
+        """
+        return self._send_bulk('PATCH', 'updates', updates, chunk_size, max_workers)
+    
+    def _send_bulk(self, method: str, key: str, items: Iterable[Dict[str, Any]],
+                   chunk_size: int, max_workers: int) -> List[Dict[str, Any]]:
+        """Send items to /tickets/bulk in concurrent chunks; return the results in order"""
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        
+        def send(chunk: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+            try:
+                response = self.session.request(method, f"{self.api_base_url}/tickets/bulk",
+                                                json={key: chunk}, timeout=self.timeout)
+                data = response.json()
+            except requests.exceptions.RequestException as e:
+                return [], f"Network error in bulk request: {e}"
+            except json.JSONDecodeError as e:
+                return [], f"JSON decode error: {e}"
+            if not data.get('success'):
+                return [], f"API Error: {data.get('message', response.status_code)} {data.get('errors', '')}".rstrip()
+            return data.get('data', []), None
+        
+        self.last_error = None
+        results = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # map() yields in submission order, so results follow the input
+            for data, error in executor.map(send, _iter_chunks(items, chunk_size)):
+                results.extend(data)
+                if error and not self.last_error:
+                    self.last_error = error
+                    print(error)
+        
+        # Cached tickets and queries are now behind the server; revalidate on the next fetch
+        self.cache.expire(self.COLLECTION_KEY)
+        self.cache.discard_kind('ticket')
+        self.cache.discard_kind('query')
+        return results
+    
+    def stream_tickets(self, source: Optional[str] = None,
+                       chunk_size: int = 64 * 1024) -> Iterator[Dict[str, Any]]:
+        """Yield tickets one at a time without loading the whole payload
+
+        Decodes the /api/tickets response as it arrives, or a local
+        tickets.json-style file when `source` is a path. Peak memory is
+        bounded by the chunk size, not the number of tickets.
+        
+        If the stream fails part way the generator just ends, so callers
+        must check last_error to tell a cut-off stream from a complete one.
+        """
+        self.last_error = None
+        try:
+            if source is not None:
+                with open(source, 'r', encoding='utf-8') as f:
+                    yield from iter_json_array(iter(lambda: f.read(chunk_size), ''))
+                return
+            
+            envelope = {}
+            with self.session.get(f"{self.api_base_url}/tickets", stream=True,
+                                  timeout=self.timeout) as response:
+                response.raise_for_status()
+                chunks = _decode_utf8(self._count_bytes(response.iter_content(chunk_size=chunk_size)))
+                yield from iter_json_array(chunks, key='data', envelope=envelope)
+            
+            if not envelope.get('success'):
+                self.last_error = f"API Error: {envelope.get('message', 'Unknown error')}"
+                print(self.last_error)
+                
+        except requests.exceptions.RequestException as e:
+            self.last_error = f"Network error streaming tickets: {e}"
+            print(self.last_error)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            self.last_error = f"JSON decode error: {e}"
+            print(self.last_error)
+        except OSError as e:
+            self.last_error = f"Error reading tickets file: {e}"
+            print(self.last_error)
+    
+    def _count_bytes(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Pass a streamed body through, counting its bytes as fetched"""
+        for chunk in chunks:
+            self.metrics.count('bytes_fetched', len(chunk))
+            yield chunk
+    
+    def _ticket_query(self, filters: Dict[str, Any]) -> Dict[str, str]:
+        """Translate iter_ticket_pages filters into /api/tickets query parameters"""
+        params = {}
+        for name, value in filters.items():
+            if value is None:
+                continue
+            if name not in self.TICKET_FILTERS:
+                raise ValueError(f"Unknown ticket filter: {name}")
+            if isinstance(value, (list, tuple, set)):
+                value = ','.join(value)
+            elif isinstance(value, datetime.datetime):
+                value = value.isoformat()
+            params[self.TICKET_FILTERS[name]] = value
+        return params
+    
+    def _fetch_page(self, session: requests.Session, params: Dict[str, str]) -> Dict[str, Any]:
+        """Fetch one page of /api/tickets"""
+        response = session.get(f"{self.api_base_url}/tickets", params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+    
+    def iter_ticket_pages(self, page_size: int = 500, prefetch: bool = True,
+                          **filters: Any) -> Iterator[List[Dict[str, Any]]]:
+        """Yield pages of tickets from the API, filtered on the server
+
+        Filters: status, priority (a value or a list), assigned_to ('' for
+        unassigned), created_from/created_to and updated_from/updated_to
+        (ISO strings or datetimes; "from" is inclusive, "to" exclusive).
+        With prefetch=True the next page is downloaded while the caller
+        processes the current one.
+        """
+        params = self._ticket_query(filters)
+        params['limit'] = str(page_size)
         
+        session = self.session
+        self.last_error = None
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            try:
+                page = self._fetch_page(session, params)
+                while True:
+                    if not page.get('success'):
+                        self.last_error = f"API Error: {page.get('message', 'Unknown error')}"
+                        print(self.last_error)
+                        return
+                    
+                    cursor = page.get('nextCursor')
+                    pending = None
+                    if cursor and prefetch:
+                        pending = executor.submit(self._fetch_page, session, dict(params, cursor=cursor))
+                    
+                    yield page.get('data', [])
+                    
+                    if not cursor:
+                        return
+                    page = pending.result() if pending else self._fetch_page(session, dict(params, cursor=cursor))
+                    
+            except requests.exceptions.RequestException as e:
+                self.last_error = f"Network error fetching ticket page: {e}"
+                print(self.last_error)
+            except json.JSONDecodeError as e:
+                self.last_error = f"JSON decode error: {e}"
+                print(self.last_error)
+    
+    def iter_tickets(self, page_size: int = 500, prefetch: bool = True,
+                     **filters: Any) -> Iterator[Dict[str, Any]]:
+        """Yield tickets one at a time, walking the API pages lazily"""
+        for page in self.iter_ticket_pages(page_size, prefetch, **filters):
+            yield from page
+    
+    def export_snapshot(self, path: str) -> int:
+        """Write the fetched tickets to a binary snapshot file (see write_snapshot)
+
+        Compact processors write their TicketRecords without description
+        and notes rather than fetching them. Returns the number of tickets written, or 0 if none could be fetched.
+        """
+        tickets = self.fetch_tickets()
         if not tickets:
+            return 0
+        try:
+            return write_snapshot(tickets, path, self.timestamp_parser)
+        except OSError as e:
+            self.last_error = f"Error writing ticket snapshot: {e}"
+            print(self.last_error)
+            return 0
+    
+    def ticket_frame(self) -> TicketFrame:
+        """Return a TicketFrame over the fetched tickets, rebuilt only when they change"""
+        tickets = self.fetch_tickets()
+        if self._frame is None or self._frame_version != self.data_version:
+            self._frame = TicketFrame.from_tickets(tickets, self.device_classifier, self.timestamp_parser)
+            self._frame_version = self.data_version
+        return self._frame
+    
+    def time_series(self) -> TicketTimeSeries:
+        """Return hour/day/week rollups of the fetched tickets, kept in step with them
+
+        Only tickets added, changed or removed since the last call are
+        re-bucketed, and change-feed events are folded in as they arrive.
+        """
+        tickets = self.fetch_tickets()
+        if self._time_series is None:
+            self._time_series = TicketTimeSeries(self.timestamp_parser)
+        if self._time_series_version != self.data_version:
+            self._time_series.sync(tickets)
+            self._time_series_version = self.data_version
+        return self._time_series
+    
+    def search_index(self) -> TicketSearchIndex:
+        """Return a full-text index of ticket descriptions and notes, kept in step with the fetched tickets
+
+        Only tickets added, changed or removed since the last call are
+        re-indexed, and change-feed events are folded in as they arrive.
+        """
+        if self._search_index is None:
+            self._search_index = TicketSearchIndex()
+        if self._search_index_version != self.data_version:
+            tickets = self._tickets_with_text()
+            if tickets is None:
+                return self._search_index
+            self._search_index.sync(tickets)
+            self._search_index_version = self.data_version
+        return self._search_index
+    
+    def _tickets_with_text(self) -> Optional[List[Dict[str, Any]]]:
+        """Return the fetched tickets including their descriptions and notes
+
+        Compact processors read them from the paged ticket listing, since
+        their records leave the text out, and get None if the listing fails:
+        syncing a partial listing would drop every ticket it missed.
+        """
+        tickets = self.fetch_tickets()
+        if self.compact:
+            tickets = list(self.iter_tickets())
+            if self.last_error:
+                return None
+        return tickets
+    
+    def search_tickets(self, query: str, limit: int = 10, match_all: bool = False) -> List[Dict[str, Any]]:
+        """Search ticket descriptions and notes (see TicketSearchIndex.search)
+
+        Returns up to limit {"id", "score", "ticket"} matches, best first.
+        """
+        matches = self.search_index().search(query, limit, match_all)
+        tickets = self.tickets_cache
+        positions = self._ticket_positions()
+        for match in matches:
+            position = positions.get(match["id"])
+            match["ticket"] = tickets[position] if position is not None else None
+        return matches
+    
+    def duplicate_detector(self, include_contact: bool = True) -> TicketDuplicateDetector:
+        """Return a near-duplicate detector over the fetched tickets, kept in step with them
+
+        With include_contact=False tickets are compared on their descriptions
+        alone, which clusters repeat issues per device instead of finding
+        resubmissions. Only tickets added, changed or removed since the last
+        call are signed again, and change-feed events are folded in as they arrive.
+        """
+        entry = self._duplicate_detectors.get(include_contact)
+        if entry is None:
+            entry = self._duplicate_detectors[include_contact] = [
+                TicketDuplicateDetector(include_contact=include_contact), None]
+        if entry[1] != self.data_version:
+            tickets = self._tickets_with_text()
+            if tickets is not None:
+                entry[0].sync(tickets)
+                entry[1] = self.data_version
+        return entry[0]
+    
+    def find_duplicates(self, include_contact: bool = True, min_size: int = 2) -> List[Dict[str, Any]]:
+        """Return groups of near-duplicate tickets, largest first (see TicketDuplicateDetector.groups)"""
+        return self.duplicate_detector(include_contact).groups(min_size)
+    
+    def analyze_tickets(self, incremental: bool = False, stream: bool = False,
+                        columnar: bool = False, workers: Optional[int] = None,
+                        chunk_size: int = 50_000, source: Optional[str] = None,
+                        database: Optional[str] = None, summary_only: bool = False,
+                        approximate: bool = False, snapshot: Optional[str] = None) -> Dict[str, Any]:
+        """Analyze ticket data and return insights
+
+        With incremental=True the running aggregates from the previous call
+        are kept and only tickets added, changed (by updatedAt) or removed
+        since then are re-counted.
+
+        With stream=True tickets are decoded from the API one at a time and
+        folded straight into the analysis; the cache is not used or filled.
+
+        With columnar=True the sections are computed with numpy over a
+        TicketFrame, which is kept until the fetched tickets change.
+        
+        With workers set, tickets are split into chunks of chunk_size and
+        analyzed on that many processes (see analyze_parallel); the merged
+        result is identical to the serial one.
+        
+        With source set, tickets are streamed from that tickets.json-style
+        file instead of the API.
+        
+        With database set, the analysis runs as SQL aggregates over that
+        SQLite file (see SqliteTicketSource) and no tickets are loaded.
+        
+        With snapshot set, the analysis reads that binary snapshot file
+        (see write_snapshot and TicketSnapshot) through a memory map,
+        without decoding tickets or calling the API.
+        
+        With summary_only=True only the sections the server counts live are
+        returned (status and priority distributions, device types, busiest
+        hours and the summary), read from /api/stats without downloading
+        any tickets. Servers without /api/stats get the full analysis.
+        
+        With approximate=True the top devices and email domains come from
+        bounded-memory sketches of SKETCH_CAPACITY keys and distinct emails
+        and phones are estimated (see TicketAnalyzer); the result carries an
+        "approximation" section with the error bounds. It works with the
+        serial, stream, source and parallel modes.
+        """
+        if summary_only:
+            if (incremental or stream or columnar or workers is not None or source or database is not None
+                    or approximate or snapshot is not None):
+                raise ValueError("Summary-only analysis reads server counters; it cannot be combined with other modes")
+            stats = self.fetch_stats()
+            if stats is not None:
+                return self._analyze_stats(stats)
+        
+        if snapshot is not None:
+            if (incremental or stream or columnar or workers is not None or source or database is not None
+                    or approximate):
+                raise ValueError("Snapshot analysis reads the snapshot's columns; it cannot be combined with other modes")
+            try:
+                with TicketSnapshot(snapshot) as reader, self.metrics.stage('analyze'):
+                    analysis = reader.result(self.device_classifier, self.timestamp_parser)
+            except (OSError, ValueError) as e:
+                self.last_error = f"Error reading ticket snapshot: {e}"
+                print(self.last_error)
+                return {"error": "No tickets available for analysis"}
+            if not analysis["total_tickets"]:
+                return {"error": "No tickets available for analysis"}
+            self.metrics.count('tickets_analyzed', analysis["total_tickets"])
+            analysis["summary"] = self._generate_summary(analysis, [])
+            return analysis
+        
+        if database is not None:
+            if incremental or stream or columnar or workers is not None or source or approximate:
+                raise ValueError("Database analysis runs in SQLite; it cannot be combined with other modes")
+            with self.metrics.stage('analyze'):
+                analysis = SqliteTicketSource(database, self.device_classifier, self.timestamp_parser).result()
+            if not analysis["total_tickets"]:
+                return {"error": "No tickets available for analysis"}
+            self.metrics.count('tickets_analyzed', analysis["total_tickets"])
+            analysis["summary"] = self._generate_summary(analysis, [])
+            return analysis
+        
+        if incremental and (stream or columnar or source):
+            raise ValueError("Incremental analysis needs the fetched ticket list; "
+                             "it cannot be combined with stream=True, columnar=True or source")
+        if workers is not None and (incremental or columnar):
+            raise ValueError("Parallel analysis cannot be combined with incremental=True or columnar=True")
+        if approximate and (incremental or columnar):
+            raise ValueError("Approximate analysis uses mergeable sketches; "
+                             "it cannot be combined with incremental=True or columnar=True")
+        
+        sketch_capacity = self.SKETCH_CAPACITY if approximate else None
+        analysis_key = None
+        if stream or source:
+            tickets = self.stream_tickets(source)
+        else:
+            tickets = self.fetch_tickets()
+            if not tickets:
+                return {"error": "No tickets available for analysis"}
+            # Analyses are reused for as long as the fetched tickets are the same,
+            # even across re-downloads (see _dataset_fingerprint)
+            mode = ('incremental' if incremental else 'columnar' if columnar else
+                    'parallel' if workers is not None else 'serial')
+            if approximate:
+                mode += '-approximate'
+            analysis_key = ('analysis', mode, self._fingerprint(tickets))
+            cached = self.cache.get(analysis_key)
+            if cached is not None:
+                return copy.deepcopy(cached)
+        
+        # Streamed tickets are downloaded and decoded as this stage consumes them
+        with self.metrics.stage('analyze'):
+            if incremental:
+                analysis = self._analyze_incrementally(tickets)
+            elif columnar:
+                if stream or source:
+                    frame = TicketFrame.from_tickets(tickets, self.device_classifier, self.timestamp_parser)
+                else:
+                    frame = self.ticket_frame()
+                analysis = frame.result()
+            elif workers is not None:
+                analysis = analyze_parallel(tickets, workers, chunk_size, self.device_classifier,
+                                            self.timestamp_parser, sketch_capacity).result()
+            else:
+                # All sections are built in one pass over the tickets
+                analysis = self._new_analyzer(sketch_capacity).add_many(tickets).result()
+        
+        if (stream or source) and self.last_error:
+            # A stream cut off part way would otherwise pass for a smaller dataset
+            return {"error": f"Ticket stream failed: {self.last_error}"}
+        if not analysis["total_tickets"]:
+            return {"error": "No tickets available for analysis"}
+        self.metrics.count('tickets_analyzed', analysis["total_tickets"])
+        
+        # Generate summary insights
+        analysis["summary"] = self._generate_summary(analysis, tickets)
+        
+        if analysis_key is not None:
+            # Callers may modify what they get back, so the cache keeps its own copy
+            self.cache.set(analysis_key, copy.deepcopy(analysis))
+        return analysis
+    
+    def _fingerprint(self, tickets: List[Dict[str, Any]]) -> str:
+        """Return the fetched tickets' fingerprint, computed once per data_version"""
+        if self._fingerprint_version != self.data_version:
+            self._fingerprint_value = _dataset_fingerprint(tickets)
+            self._fingerprint_version = self.data_version
+        return self._fingerprint_value
+    
+    def _analyze_stats(self, stats: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the summary sections from /api/stats counters"""
+        total = stats.get('total', 0)
+        if not total:
             return {"error": "No tickets available for analysis"}
         
+        status_counts = stats.get('statuses', {})
+        hour_counts = Counter({int(hour): count for hour, count in stats.get('hours', {}).items()})
         analysis = {
-            "total_tickets": len(tickets),
-            "status_distribution": self._analyze_status_distribution(tickets),
-            "device_analysis": self._analyze_devices(tickets),
-            "time_analysis": self._analyze_time_patterns(tickets),
-            "contact_analysis": self._analyze_contact_info(tickets),
-            "summary": {}
+            "total_tickets": total,
+            "status_distribution": {
+                "counts": status_counts,
+                "percentages": {status: round((count/total)*100, 1)
+                              for status, count in status_counts.items()}
+            },
+            "priority_distribution": {"counts": stats.get('priorities', {})},
+            "device_analysis": {"device_types": stats.get('deviceTypes', {})},
+            "time_analysis": ({"total_analyzed": sum(hour_counts.values()),
+                               "busiest_hours": dict(hour_counts.most_common(5))}
+                              if hour_counts else {"error": "No valid timestamps found"}),
         }
+        analysis["summary"] = self._generate_summary(analysis, [])
+        return analysis
+    
+    def _new_analyzer(self, sketch_capacity: Optional[int] = None) -> TicketAnalyzer:
+        """Return an empty analyzer using this processor's classifier and parser"""
+        return TicketAnalyzer(device_classifier=self.device_classifier,
+                              timestamp_parser=self.timestamp_parser,
+                              sketch_capacity=sketch_capacity)
+    
+    def _analyze_incrementally(self, tickets: List[Dict]) -> Dict[str, Any]:
+        """Sync the running aggregates with the fetched tickets"""
+        if self.incremental_analyzer is None:
+            self.incremental_analyzer = IncrementalTicketAnalyzer(self.device_classifier, self.timestamp_parser)
         
-        # Generate summary insights
-        analysis["summary"] = self._generate_summary(analysis, tickets)
+        # Cache hits and 304 responses hand back the list we already synced with
+        if self._incremental_version != self.data_version:
+            self.incremental_analyzer.sync(tickets)
+            self._incremental_version = self.data_version
+        
+        return self.incremental_analyzer.result()
+    
+    def follow_journal(self, journal_path: str, poll_interval: float = 0.5) -> Iterator[Dict[str, Any]]:
+        """Yield an up-to-date analysis each time the server's journal changes
+
+        Reads tickets.json and tickets.journal directly (see JournalReader)
+        instead of polling the API, and folds each batch of changes into an
+        IncrementalTicketAnalyzer. The first analysis covers the current data.
+        """
+        reader = JournalReader(journal_path)
+        analyzer = IncrementalTicketAnalyzer(self.device_classifier, self.timestamp_parser)
+        try:
+            analyzer.sync(reader.load())
+            changes = reader.follow(poll_interval)
+            while True:
+                analysis = analyzer.result()
+                analysis["summary"] = self._generate_summary(analysis, [])
+                yield analysis
+                analyzer.apply_changes(*next(changes))
+        finally:
+            reader.close()
+    
+    def follow_changes(self, reconnect_delay: float = 1.0,
+                       read_timeout: float = 60.0) -> Iterator[Dict[str, Any]]:
+        """Yield an up-to-date analysis each time a ticket changes on the server
+
+        Subscribes to the /api/changes event stream instead of re-fetching.
+        Each created/updated/deleted event is applied to tickets_cache and
+        to the incremental aggregates (as used by analyze_tickets with
+        incremental=True), so both stay live while the generator is
+        consumed. A dropped connection is re-opened after reconnect_delay
+        and resumes after the last applied event; if the server can no
+        longer replay the gap it sends a reset and the tickets are
+        re-fetched. The first analysis covers the current data.
+        """
+        self._analyze_incrementally(self.fetch_tickets(force_refresh=True))
+        yield self._live_analysis()
         
+        while True:
+            headers = {'Accept': 'text/event-stream'}
+            if self.change_id:
+                headers['Last-Event-ID'] = self.change_id
+            try:
+                # The server sends a heartbeat well within read_timeout
+                with self.session.get(f"{self.api_base_url}/changes", headers=headers, stream=True,
+                                      timeout=(self.timeout, read_timeout)) as response:
+                    response.raise_for_status()
+                    # chunk_size=None hands over each event as soon as it arrives
+                    lines = _split_lines(_decode_utf8(self._count_bytes(response.iter_content(chunk_size=None))))
+                    for event_id, event, data in iter_sse_events(lines):
+                        if event == 'reset':
+                            tickets = self.fetch_tickets(force_refresh=True)
+                            if self.last_error:
+                                break
+                            self._analyze_incrementally(tickets)
+                        elif event in ('created', 'updated', 'deleted'):
+                            self._apply_change(event, json.loads(data)['ticket'])
+                            self.change_id = event_id
+                        else:
+                            continue
+                        self.last_fetch = datetime.datetime.now()
+                        self.cache.touch(self.COLLECTION_KEY)
+                        yield self._live_analysis()
+            except (requests.exceptions.RequestException, json.JSONDecodeError, KeyError) as e:
+                self.last_error = f"Change feed interrupted: {e}"
+                print(self.last_error)
+            time.sleep(reconnect_delay)
+    
+    def _apply_change(self, event: str, ticket: Dict[str, Any]) -> None:
+        """Apply one change-feed event to tickets_cache and the running aggregates"""
+        # The search index and duplicate detectors need the text that compact records leave out
+        full_ticket = ticket
+        ticket = self._compact_tickets([ticket])[0]
+        ticket_id = ticket.get('id')
+        # An evicted ticket list is left alone; the aggregates still follow the feed
+        if self.COLLECTION_KEY in self.cache:
+            tickets = self.tickets_cache
+            position = self._ticket_positions().get(ticket_id)
+            # Sized one ticket at a time; re-measuring the whole list per event costs more
+            delta = 0
+            if event == 'deleted':
+                if position is not None:
+                    delta = -_approx_size(tickets[position]) - _LIST_SLOT_BYTES
+                    # Move the last ticket into the hole rather than shifting every
+                    # later one; the list is back in creation order after a full fetch
+                    last = tickets.pop()
+                    del self._positions[ticket_id]
+                    if position < len(tickets):
+                        tickets[position] = last
+                        self._positions[last.get('id')] = position
+            elif position is None:
+                delta = _approx_size(ticket) + _LIST_SLOT_BYTES
+                self._positions[ticket_id] = len(tickets)
+                tickets.append(ticket)
+            else:
+                delta = _approx_size(ticket) - _approx_size(tickets[position])
+                tickets[position] = ticket
+            # The list changed in place, so its budgeted size has to follow
+            self.cache.resize(self.COLLECTION_KEY, delta)
+        self.cache.pop(('ticket', ticket_id))
+        self.cache.discard_kind('query')
+        
+        # Fold the delta into aggregates that were in step, instead of re-syncing them
+        in_step = self.incremental_analyzer is not None and self._incremental_version == self.data_version
+        series_in_step = self._time_series is not None and self._time_series_version == self.data_version
+        index_in_step = self._search_index is not None and self._search_index_version == self.data_version
+        detectors_in_step = [entry for entry in self._duplicate_detectors.values()
+                             if entry[1] == self.data_version]
+        positions_valid = self._positions is not None and self._positions_version == self.data_version
+        self.data_version += 1
+        if positions_valid:
+            self._positions_version = self.data_version
+        if in_step:
+            if event == 'deleted':
+                self.incremental_analyzer.apply_changes(removed_ids=[ticket_id])
+            else:
+                self.incremental_analyzer.apply_changes([ticket])
+            self._incremental_version = self.data_version
+        if series_in_step:
+            if event == 'deleted':
+                self._time_series.apply_changes(removed_ids=[ticket_id])
+            else:
+                self._time_series.apply_changes([ticket])
+            self._time_series_version = self.data_version
+        if index_in_step:
+            if event == 'deleted':
+                self._search_index.apply_changes(removed_ids=[ticket_id])
+            else:
+                self._search_index.apply_changes([full_ticket])
+            self._search_index_version = self.data_version
+        for entry in detectors_in_step:
+            if event == 'deleted':
+                entry[0].apply_changes(removed_ids=[ticket_id])
+            else:
+                entry[0].apply_changes([full_ticket])
+            entry[1] = self.data_version
+    
+    def _live_analysis(self) -> Dict[str, Any]:
+        """Return the running incremental analysis, without fetching"""
+        if self.incremental_analyzer is None or self._incremental_version != self.data_version:
+            self._analyze_incrementally(self.tickets_cache)
+        analysis = self.incremental_analyzer.result()
+        if not analysis["total_tickets"]:
+            return {"error": "No tickets available for analysis"}
+        analysis["summary"] = self._generate_summary(analysis, [])
         return analysis
     
     def _analyze_status_distribution(self, tickets: List[Dict]) -> Dict[str, Any]:
@@ -96,26 +4328,11 @@ class TicketProcessor:
         brands = []
         
         for device in devices:
-            # Common device type patterns
-            if any(term in device for term in ['iphone', 'ios']):
-                device_types.append('iPhone')
-                brands.append('Apple')
-            elif any(term in device for term in ['android', 'samsung', 'galaxy']):
-                device_types.append('Android')
-                if 'samsung' in device:
-                    brands.append('Samsung')
-            elif any(term in device for term in ['laptop', 'dell', 'hp', 'lenovo', 'macbook']):
-                device_types.append('Laptop')
-                if 'dell' in device:
-                    brands.append('Dell')
-                elif 'hp' in device:
-                    brands.append('HP')
-                elif 'lenovo' in device:
-                    brands.append('Lenovo')
-                elif 'macbook' in device:
-                    brands.append('Apple')
-            elif any(term in device for term in ['desktop', 'pc']):
-                device_types.append('Desktop')
+            device_type, brand = self.device_classifier.classify(device)
+            if device_type:
+                device_types.append(device_type)
+            if brand:
+                brands.append(brand)
         
         return {
             "total_devices": len(devices),
@@ -126,31 +4343,32 @@ class TicketProcessor:
     
     def _analyze_time_patterns(self, tickets: List[Dict]) -> Dict[str, Any]:
         """Analyze time-based patterns"""
+        parse = self.timestamp_parser.parse
         timestamps = []
         for ticket in tickets:
-            try:
-                created_at = ticket.get('createdAt')
-                if created_at:
-                    # Parse ISO timestamp
-                    dt = datetime.datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                    timestamps.append(dt)
-            except (ValueError, TypeError):
-                continue
+            created_at = ticket.get('createdAt')
+            if created_at:
+                # Parse ISO timestamp (cached per string)
+                parsed = parse(created_at)
+                if parsed is not None:
+                    timestamps.append(parsed)
         
         if not timestamps:
             return {"error": "No valid timestamps found"}
         
         # Analyze patterns
-        hours = [dt.hour for dt in timestamps]
-        days_of_week = [dt.strftime('%A') for dt in timestamps]
+        day_names = _weekday_names()
+        hours = [parsed.hour for parsed in timestamps]
+        days_of_week = [day_names[parsed.weekday] for parsed in timestamps]
+        by_instant = operator.attrgetter('epoch_us')
         
         return {
             "total_analyzed": len(timestamps),
             "busiest_hours": dict(Counter(hours).most_common(5)),
             "busiest_days": dict(Counter(days_of_week)),
             "date_range": {
-                "earliest": min(timestamps).isoformat(),
-                "latest": max(timestamps).isoformat()
+                "earliest": timestamp_datetime(min(timestamps, key=by_instant)).isoformat(),
+                "latest": timestamp_datetime(max(timestamps, key=by_instant)).isoformat()
             }
         }
     
@@ -169,14 +4387,7 @@ class TicketProcessor:
         # Phone number pattern analysis
         phone_patterns = []
         for phone in phones:
-            # Simple pattern detection
-            digits_only = re.sub(r'\D', '', phone)
-            if len(digits_only) == 10:
-                phone_patterns.append('US-10-digit')
-            elif len(digits_only) == 11:
-                phone_patterns.append('US-11-digit')
-            else:
-                phone_patterns.append('Other')
+            phone_patterns.append(_classify_phone(phone))
         
         return {
             "total_emails": len(emails),
@@ -185,6 +4396,7 @@ class TicketProcessor:
             "phone_patterns": dict(Counter(phone_patterns))
         }
     
+    @_profiled('summary')
     def _generate_summary(self, analysis: Dict, tickets: List[Dict]) -> Dict[str, Any]:
         """Generate summary insights"""
         summary = {}
@@ -211,54 +4423,27 @@ class TicketProcessor:
         
         return summary
     
-    def generate_report(self, output_file: Optional[str] = None) -> str:
-        """Generate a comprehensive report"""
-        analysis = self.analyze_tickets()
+    def generate_report(self, output_file: Optional[str] = None, summary_only: bool = False,
+                        analysis: Optional[Dict[str, Any]] = None, report_format: str = 'text') -> str:
+        """Generate a comprehensive report
+
+        Pass the result of analyze_tickets() as `analysis` to render it
+        without analyzing again; several formats of one dataset then cost
+        one analysis. report_format is one of REPORT_RENDERERS ('text',
+        'markdown', 'json'). Every section of the report is available from
+        /api/stats, so with summary_only=True no tickets are downloaded.
+        """
+        renderer = REPORT_RENDERERS.get(report_format)
+        if renderer is None:
+            raise ValueError(f"Unknown report format: {report_format}")
+        if analysis is None:
+            analysis = self.analyze_tickets(summary_only=summary_only)
         
         if "error" in analysis:
             return f"Report generation failed: {analysis['error']}"
         
-        report_lines = [
-            "=" * 50,
-            "TICKET SYSTEM ANALYSIS REPORT",
-            "=" * 50,
-            f"Generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-            "",
-            f"📊 OVERVIEW",
-            f"Total Tickets: {analysis['total_tickets']}",
-            "",
-            f"📈 STATUS DISTRIBUTION",
-        ]
-        
-        # Status distribution
-        status_dist = analysis.get('status_distribution', {})
-        for status, count in status_dist.get('counts', {}).items():
-            percentage = status_dist.get('percentages', {}).get(status, 0)
-            report_lines.append(f"  {status.title()}: {count} ({percentage}%)")
-        
-        report_lines.extend([
-            "",
-            f"💻 DEVICE ANALYSIS",
-        ])
-        
-        # Device analysis
-        device_analysis = analysis.get('device_analysis', {})
-        device_types = device_analysis.get('device_types', {})
-        for device_type, count in device_types.items():
-            report_lines.append(f"  {device_type}: {count}")
-        
-        # Summary insights
-        summary = analysis.get('summary', {})
-        if summary:
-            report_lines.extend([
-                "",
-                f"🔍 KEY INSIGHTS",
-                f"Most common status: {summary.get('most_common_status', 'N/A')}",
-                f"Most common device: {summary.get('most_common_device_type', 'N/A')}",
-                f"Peak activity hour: {summary.get('peak_hour', 'N/A')}",
-            ])
-        
-        report_text = "\n".join(report_lines)
+        with self.metrics.stage('render'):
+            report_text = renderer(analysis)
         
         if output_file:
             try:
@@ -271,23 +4456,169 @@ class TicketProcessor:
         return report_text
 
 
+class TicketFleet:
+    """Fetch and analyze tickets from several ticket-server instances at once
+
+    Each instance gets its own TicketProcessor (with its own pooled session,
+    retries and conditional-request cache). Fetches run concurrently, at
+    most max_concurrency at a time, so a fleet-wide refresh takes about as
+    long as the slowest host. host_timeouts overrides the timeout for
+    individual API base URLs.
+    """
+
+    def __init__(self, api_base_urls: List[str], max_concurrency: int = 8,
+                 timeout: float = 10.0, host_timeouts: Optional[Dict[str, float]] = None,
+                 retries: int = 3, backoff_factor: float = 0.5,
+                 device_classifier: Optional[DeviceClassifier] = None):
+        if not api_base_urls:
+            raise ValueError("TicketFleet needs at least one API base URL")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        host_timeouts = host_timeouts or {}
+        self.max_concurrency = max_concurrency
+        self.device_classifier = device_classifier or _DEFAULT_CLASSIFIER
+        self.processors = {
+            url: TicketProcessor(url, device_classifier=self.device_classifier,
+                                 timeout=host_timeouts.get(url, timeout),
+                                 retries=retries, backoff_factor=backoff_factor)
+            for url in api_base_urls
+        }
+
+    def fetch_all(self, force_refresh: bool = False) -> Dict[str, List[Dict[str, Any]]]:
+        """Fetch every instance's tickets concurrently, keyed by API base URL"""
+        workers = min(self.max_concurrency, len(self.processors))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {url: executor.submit(processor.fetch_tickets, force_refresh)
+                       for url, processor in self.processors.items()}
+            return {url: future.result() for url, future in futures.items()}
+
+    def analyze_tickets(self, force_refresh: bool = False) -> Dict[str, Any]:
+        """Analyze the tickets of every instance as one merged data set
+
+        The result has the analyze_tickets() layout plus a "hosts" section
+        with each instance's ticket count and fetch error, if any.
+        """
+        fetched = self.fetch_all(force_refresh)
+        merged = TicketAnalyzer(device_classifier=self.device_classifier)
+        hosts = {}
+        # Merge in the configured order so the output does not depend on
+        # which host answered first
+        for url, tickets in fetched.items():
+            processor = self.processors[url]
+            merged.merge(processor._new_analyzer().add_many(tickets))
+            hosts[url] = {"tickets": len(tickets), "error": processor.last_error}
+
+        if not merged.total_tickets:
+            return {"error": "No tickets available for analysis", "hosts": hosts}
+
+        analysis = merged.result()
+        first = next(iter(self.processors.values()))
+        analysis["summary"] = first._generate_summary(analysis, [])
+        analysis["hosts"] = hosts
+        return analysis
+
+
 def main():
     """Main function for command-line usage"""
-    processor = TicketProcessor()
+    parser = argparse.ArgumentParser(description="Analyze tickets from the ticket management API")
+    parser.add_argument("--api-url", default="http://localhost:3000/api",
+                        help="base URL of the ticket API")
+    parser.add_argument("--cache-file",
+                        help="persist fetched tickets here and revalidate them on later runs")
+    parser.add_argument("--summary-only", action="store_true",
+                        help="build the report from the server's live counters without fetching tickets")
+    parser.add_argument("--format", choices=sorted(REPORT_RENDERERS), default="text",
+                        help="report format (default: text)")
+    parser.add_argument("--approximate", action="store_true",
+                        help="count top devices, email domains and distinct customers "
+                             "with bounded-memory sketches")
+    parser.add_argument("--snapshot", metavar="PATH",
+                        help="analyze this binary snapshot offline instead of fetching tickets")
+    parser.add_argument("--export-snapshot", metavar="PATH",
+                        help="also write the fetched tickets to this binary snapshot")
+    parser.add_argument("--convert", nargs=2, metavar=("TICKETS_JSON", "SNAPSHOT"),
+                        help="convert a tickets.json file into a binary snapshot and exit")
+    parser.add_argument("--search", metavar="QUERY",
+                        help='list the tickets whose description or notes best match QUERY '
+                             '(quote phrases, e.g. \'"blue screen"\') and exit')
+    parser.add_argument("--duplicates", choices=["customer", "device"],
+                        help="list groups of near-duplicate tickets and exit: resubmissions by one "
+                             "customer, or repeat issues per device")
+    parser.add_argument("--profile", action="store_true",
+                        help="print per-stage wall/CPU times, counters and cache hit rates at the end")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="like --profile, also tracking each stage's peak memory (tracemalloc; slower)")
+    parser.add_argument("--prometheus", metavar="PATH",
+                        help="write the run's metrics to this file in the Prometheus text format")
+    args = parser.parse_args()
+    
+    processor = TicketProcessor(args.api_url, cache_file=args.cache_file,
+                                trace_memory=args.profile_memory)
     
     print("🎫 Ticket Data Processor")
     print("=" * 30)
     
+    _run_command(processor, args)
+    
+    if args.profile or args.profile_memory:
+        print("\n" + render_profile(processor.metrics_report()))
+    if args.prometheus:
+        try:
+            with open(args.prometheus, 'w', encoding='utf-8') as f:
+                f.write(render_prometheus(processor.metrics_report()))
+        except OSError as e:
+            print(f"Error saving metrics: {e}")
+
+
+def _run_command(processor: TicketProcessor, args: argparse.Namespace) -> None:
+    """Carry out what main()'s arguments ask for"""
+    report_file = "ticket_report." + {"text": "txt", "markdown": "md", "json": "json"}[args.format]
+    
+    if args.convert:
+        count = convert_tickets_json(*args.convert, timestamp_parser=processor.timestamp_parser)
+        print(f"Wrote {count} tickets to {args.convert[1]}")
+        return
+    
+    if args.snapshot:
+        analysis = processor.analyze_tickets(snapshot=args.snapshot)
+        report = processor.generate_report(report_file, analysis=analysis, report_format=args.format)
+        print("\n" + report)
+        return
+    
+    if args.summary_only:
+        report = processor.generate_report(report_file, summary_only=True, report_format=args.format)
+        print("\n" + report)
+        return
+    
     # Fetch and analyze tickets
     tickets = processor.fetch_tickets(force_refresh=True)
     print(f"Fetched {len(tickets)} tickets")
+    if tickets and args.export_snapshot:
+        print(f"Wrote {processor.export_snapshot(args.export_snapshot)} tickets to {args.export_snapshot}")
+    
+    if tickets and args.search:
+        matches = processor.search_tickets(args.search)
+        print(f"{len(matches)} best matches for {args.search}")
+        for match in matches:
+            ticket = match["ticket"] or {}
+            print(f"  {match['score']:7.3f}  {match['id']}  {ticket.get('deviceName', '')}: "
+                  f"{(ticket.get('description') or '')[:60]}")
+        return
+    
+    if tickets and args.duplicates:
+        groups = processor.find_duplicates(include_contact=args.duplicates == "customer")
+        print(f"{len(groups)} groups of near-duplicate tickets")
+        for group in groups[:20]:
+            print(f"  {len(group['ids']):>4} × {group['device']}: {', '.join(map(str, group['ids'][:5]))}"
+                  f"{' ...' if len(group['ids']) > 5 else ''}")
+        return
     
     if tickets:
         # Generate analysis
-        analysis = processor.analyze_tickets()
+        analysis = processor.analyze_tickets(approximate=args.approximate)
         
-        # Generate and display report
-        report = processor.generate_report("ticket_report.txt")
+        # Render the analysis above instead of analyzing again
+        report = processor.generate_report(report_file, analysis=analysis, report_format=args.format)
         print("\n" + report)
     else:
         print("No tickets found or unable to connect to API")